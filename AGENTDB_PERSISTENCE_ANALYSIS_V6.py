@@ -21,6 +21,9 @@ import time
 import psutil
 from datetime import datetime
 
+from v6_log_store import V6LogStore, closed_segments, default_store_dir, open_segment, segment_source
+from v6_log_stream import ExecutionAggregator, iter_records, parse_records
+
 class AgentDBPersistenceAnalyzer:
     """Analisador crítico da estratégia de persistência AgentDB V6"""
 
@@ -169,23 +172,25 @@ class AgentDBPersistenceAnalyzer:
             "data_volatility": "Média (context changes)"
         }
 
-        # Simulação de uso real baseado em logs
-        with open("/home/arturdr/Claude/.claude/logs/v6_executions.jsonl", "r") as f:
-            logs = f.readlines()
+        # Uso real baseado em logs: partes já compactadas via store colunar (somente leitura,
+        # o relatório não compacta nada); segmentos ainda não compactados + arquivo ativo
+        # lidos em streaming com agregados em memória constante
+        log_path = "/home/arturdr/Claude/.claude/logs/v6_executions.jsonl"
+        vector_keywords = ["vector", "embedding", "search", "similarity", "find similar"]
 
-        vector_search_tasks = 0
-        total_tasks = len(logs)
+        store = V6LogStore(default_store_dir(log_path))
+        total_tasks = store.count()
+        vector_search_tasks = store.count(task_contains=vector_keywords)
 
-        # Simular detecção de tasks que precisariam vector search
-        vector_keywords = ["vector", "embedding", "search", "similarity", "find similar"]
-        for log in logs:
-            try:
-                data = json.loads(log.strip())
-                task = data.get("task", "").lower()
-                if any(keyword in task for keyword in vector_keywords):
-                    vector_search_tasks += 1
-            except:
-                continue
+        done = store.compacted_sources()
+        active = ExecutionAggregator(keywords={"vector": vector_keywords})
+        for segment in closed_segments(log_path):
+            if segment_source(segment) not in done:
+                with open_segment(segment) as f:
+                    active.consume(parse_records(f))
+        active.consume(iter_records(log_path))
+        total_tasks += active.total
+        vector_search_tasks += active.keyword_hits["vector"]
 
         actual_usage_rate = (vector_search_tasks / total_tasks * 100) if total_tasks > 0 else 0
 
@@ -199,6 +204,10 @@ class AgentDBPersistenceAnalyzer:
         print(f"   📋 Total tasks analisadas: {total_tasks}")
         print(f"   🔍 Tasks com vector search: {vector_search_tasks}")
         print(f"   📊 Taxa de uso real: {actual_usage_rate:.1f}%")
+        if active.total:
+            latency = active.latency.summary()
+            print(f"   ⚡ Não compactado: {active.total} tasks | sucesso {active.successes / active.total:.1%} | "
+                  f"p50 {latency['p50']:.1f}ms | p95 {latency['p95']:.1f}ms")
 
         return actual_usage_rate
 
@@ -442,6 +442,7 @@ def create_context7_replacement(docling_mcp=None, redis_mcp=None):
                 except Exception as e:
                     validation_results["tests_failed"] += 1
                     print(f"   ❌ Test failed: {task} - {e}")
+            v6_optimized.close()
 
             print(f"✅ Validation completed: {validation_results['tests_passed']}/{len(test_tasks)} tests passed")
 
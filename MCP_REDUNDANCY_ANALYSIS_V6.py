@@ -15,6 +15,13 @@ import subprocess
 from datetime import datetime
 from typing import Dict, List, Tuple, Any
 
+from v6_log_stream import aggregate_logs
+
+EXECUTION_LOGS = [
+    "/home/arturdr/Claude/.claude/logs/v6_complete_mcp.jsonl",
+    "/home/arturdr/Claude/.claude/logs/v6_lazy_mcp.jsonl",
+]
+
 class MCPRedundancyAnalyzer:
     def __init__(self):
         self.mcp_registry = {}
@@ -277,6 +284,7 @@ class MCPRedundancyAnalyzer:
                     if mcp not in performance_results:
                         performance_results[mcp] = []
                     performance_results[mcp].append(exec_time)
+            v6_system.close()
 
             # Calculate averages
             for mcp, times in performance_results.items():
@@ -289,6 +297,28 @@ class MCPRedundancyAnalyzer:
 
         return performance_results
 
+    def analyze_execution_logs(self, log_paths: List[str] = EXECUTION_LOGS):
+        """Real MCP usage from execution logs, streamed (rotated segments included) in constant memory"""
+        print("\n📜 ANALYZING EXECUTION LOGS...")
+
+        history = aggregate_logs(log_paths)
+        if not history["total"]:
+            print("📝 No execution logs found")
+            return history
+
+        history["never_used"] = sorted(mcp for mcp in self.mcp_registry if mcp not in history["mcp_usage"])
+        print(f"📋 {history['total']} executions | success {history['success_rate']:.1%} | "
+              f"p95 {history['latency_ms']['p95']:.0f}ms | {history['malformed']} malformed lines skipped")
+        for mcp, count in history["mcp_usage"].items():
+            print(f"   🔌 {mcp}: {count} uses ({count / history['total']:.1%} of tasks)")
+        for strategy, entry in history["strategies"].items():
+            print(f"   🎯 {strategy}: {entry['count']} tasks, {entry['success_rate']:.1%} success, "
+                  f"p95 {entry['p95_ms']:.0f}ms")
+        if history["never_used"]:
+            print(f"   💤 Never used: {', '.join(history['never_used'])}")
+
+        return history
+
     def identify_redundancies(self):
         """Identify specific redundancies and recommendations"""
         print("\n🎯 IDENTIFYING REDUNDANCIES...")
@@ -422,10 +452,13 @@ class MCPRedundancyAnalyzer:
         # 3. Performance testing
         performance_results = self.test_mcp_performance()
 
-        # 4. Redundancy identification
+        # 4. Real usage from execution logs
+        execution_history = self.analyze_execution_logs()
+
+        # 5. Redundancy identification
         redundancies, recommendations = self.identify_redundancies()
 
-        # 5. Optimized configuration
+        # 6. Optimized configuration
         optimized_config = self.generate_optimized_config()
 
         # Generate final report
@@ -440,6 +473,7 @@ class MCPRedundancyAnalyzer:
                 "category_breakdown": category_memory
             },
             "performance_results": performance_results,
+            "execution_history": execution_history,
             "redundancies": redundancies,
             "recommendations": recommendations,
             "optimized_configuration": optimized_config
@@ -463,6 +497,14 @@ class MCPRedundancyAnalyzer:
         print(f"   Categories: {report['categories_found']}")
         print(f"   Analysis Time: {report['analysis_duration']:.1f}s")
 
+        history = report['execution_history']
+        if history['total']:
+            print(f"\n📜 EXECUTION HISTORY:")
+            print(f"   Executions: {history['total']} ({history['success_rate']:.1%} success)")
+            print(f"   Most used MCPs: {', '.join(list(history['mcp_usage'])[:5])}")
+            if history['never_used']:
+                print(f"   Never used: {', '.join(history['never_used'])}")
+
         print(f"\n⚠️  CRITICAL REDUNDANCIES FOUND:")
         for redundancy in report['redundancies']:
             print(f"   🔴 {redundancy['type']}: {', '.join(redundancy['mcps'])}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+🛰️ V6 CLIENT - Thin CLI for the V6 daemon
+==========================================
+Stdlib only (socket + json) so startup stays small | tasks from argv or stdin
+"""
+
+import json
+import os
+import socket
+import sys
+
+DEFAULT_SOCKET_PATH = os.getenv("V6D_SOCKET", ".claude/v6d.sock")
+
+
+class V6Client:
+    """Persistent connection to the daemon; request() is one write + one line read"""
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(socket_path)
+        self.reader = self.sock.makefile("rb")
+
+    def request(self, payload):
+        self.sock.sendall(json.dumps(payload).encode() + b"\n")
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("v6 daemon closed the connection")
+        return json.loads(line)
+
+    def execute(self, task, engine="complete"):
+        return self.request({"op": "execute", "engine": engine, "task": task})
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+def _usage():
+    print("usage: v6_client.py [--socket PATH] [--engine NAME] [--route] "
+          "(TASK... | - | --stats | --ping | --shutdown)", file=sys.stderr)
+    return 2
+
+
+def main(argv):
+    socket_path, engine, op = DEFAULT_SOCKET_PATH, "complete", "execute"
+    words = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--socket":
+            socket_path = next(args, socket_path)
+        elif arg == "--engine":
+            engine = next(args, engine)
+        elif arg in ("--stats", "--ping", "--shutdown", "--route"):
+            op = arg[2:]
+        elif arg in ("-h", "--help"):
+            return _usage()
+        else:
+            words.append(arg)
+
+    try:
+        client = V6Client(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"❌ No v6 daemon on {socket_path} (start it with: python3 v6_daemon.py)", file=sys.stderr)
+        return 1
+
+    try:
+        if op in ("stats", "ping", "shutdown"):
+            print(json.dumps(client.request({"op": op})))
+            return 0
+
+        # "-" → one task per stdin line over the same connection, JSONL out
+        tasks = (line.strip() for line in sys.stdin) if words == ["-"] else [" ".join(words)]
+        failures = 0
+        for task in tasks:
+            if not task:
+                continue
+            response = client.request({"op": op, "engine": engine, "task": task})
+            failures += not response.get("ok")
+            sys.stdout.write(json.dumps(response, default=str) + "\n")
+            sys.stdout.flush()
+        return 1 if failures else 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
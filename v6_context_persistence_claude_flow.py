@@ -4,6 +4,8 @@
 =================================================================
 Camada de persistência de contexto usando Claude Flow MCP SQLite já integrado
 Performance: Cross-session memory + TTL + Namespacing + 0 setup
+Busca FTS5/BM25: V6ContextPersistence(enable_fts=True) ou --fts (migra o memory.db;
+só se todos os writers do banco têm FTS5). Sem isso: LIKE por termo da query
 """
 
 import json
@@ -11,15 +13,19 @@ import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 
+from v6_sqlite_engine import DEFAULT_DB_PATH, get_engine
+from v6_write_behind import get_write_behind
+
 class V6ContextPersistence:
     """
     🧠 CAMADA DE PERSISTÊNCIA V6 - Claude Flow SQLite Integration
     Usa o SQLite já integrado ao Claude Flow MCP para persistência cross-session
     """
 
-    def __init__(self):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, write_behind: bool = False,
+                 enable_fts: bool = False):
         print("🧠 V6 Context Persistence - Claude Flow SQLite Integration")
-        print("💾 Usando SQLite nativo do Claude Flow MCP")
+        print("💾 Usando SQLite nativo do Claude Flow MCP (in-process, pool + WAL)")
         print("🔄 Cross-session persistence: ATIVADO")
         print("📚 Namespaces: swarm_sessions, knowledge_base, cache")
 
@@ -41,6 +47,38 @@ class V6ContextPersistence:
             "error_patterns": 1209600     # 14 dias
         }
 
+        # Engine compartilhada: conexões longas em vez de python3 -c por operação
+        self.engine = get_engine(db_path)
+
+        # FTS5 é opt-in: os triggers afetam todo writer do banco (ver V6SQLiteEngine.enable_fts)
+        if enable_fts and not self.engine.fts_enabled:
+            self.engine.enable_fts()
+        print(f"🔍 Busca de conhecimento: {'FTS5 (BM25)' if self.engine.fts_enabled else 'LIKE por termo'}")
+
+        # Write-behind: sessões, aprendizados e cache vão para a fila (flush em lote)
+        self.writer = get_write_behind(self.engine) if write_behind else None
+        if self.writer:
+            print("⏳ Write-behind: ATIVADO (sessões, aprendizados, cache)")
+
+    def _store_deferred(self, key: str, value: Any, namespace: str, ttl: int) -> bool:
+        """Store via write-behind quando ativo, senão síncrono"""
+        if self.writer:
+            return self.writer.enqueue_store(key, value, namespace=namespace, ttl=ttl)
+        return self.engine.store(key, value, namespace=namespace, ttl=ttl)
+
+    def _retrieve_value(self, key: str, namespace: str) -> Optional[str]:
+        """Valor JSON da entrada, vendo primeiro o que ainda está na fila"""
+        if self.writer:
+            pending = self.writer.pending_value(key, namespace)
+            if pending is not None:
+                return pending
+        entry = self.engine.retrieve(key, namespace=namespace)
+        return entry["value"] if entry is not None else None
+
+    def flush(self) -> int:
+        """Força o flush das escritas pendentes (no-op sem write-behind)"""
+        return self.writer.flush() if self.writer else 0
+
     def save_session_context(self, session_id: str, context_data: Dict, ttl_hours: int = 24) -> bool:
         """
         💾 Salvar contexto completo da sessão V6
@@ -61,35 +99,13 @@ class V6ContextPersistence:
                 "success_rate": context_data.get("success_rate", 0.0)
             }
 
-            # Usar Claude Flow SQLite MCP
-            import subprocess
-            cmd = [
-                "python3", "-c",
-                f"""
-import json
-from claude_flow_mcp import memory_usage
-
-result = memory_usage(
-    action="store",
-    key="session_{session_id}",
-    value=json.dumps({json.dumps(context_payload)}),
-    namespace="swarm_sessions",
-    ttl={ttl_hours * 3600}
-)
-print(result)
-                """
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            success = result.returncode == 0
+            # Usar Claude Flow SQLite (memory_entries) direto
+            self._store_deferred(f"session_{session_id}", context_payload,
+                                 namespace="swarm_sessions", ttl=ttl_hours * 3600)
 
-            if success:
-                print(f"✅ Sessão {session_id} persistida com sucesso")
-                print(f"📊 {context_data.get('agents_count', 0)} agents, {context_data.get('tasks_count', 0)} tasks")
-                return True
-            else:
-                print(f"❌ Erro ao persistir sessão: {result.stderr}")
-                return False
+            print(f"✅ Sessão {session_id} persistida com sucesso")
+            print(f"📊 {context_data.get('agents_count', 0)} agents, {context_data.get('tasks_count', 0)} tasks")
+            return True
 
         except Exception as e:
             print(f"❌ Exceção ao salvar contexto: {e}")
@@ -101,26 +117,10 @@ print(result)
         Retorna o contexto completo se encontrado
         """
         try:
-            import subprocess
-            cmd = [
-                "python3", "-c",
-                f"""
-import json
-from claude_flow_mcp import memory_usage
-
-result = memory_usage(
-    action="retrieve",
-    key="session_{session_id}",
-    namespace="swarm_sessions"
-)
-print(json.dumps(result) if result else "null")
-                """
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            value = self._retrieve_value(f"session_{session_id}", "swarm_sessions")
 
-            if result.returncode == 0 and result.stdout.strip() != "null":
-                context_data = json.loads(result.stdout.strip())
+            if value is not None:
+                context_data = json.loads(value)
                 print(f"✅ Contexto da sessão {session_id} recuperado")
                 return context_data
             else:
@@ -148,26 +148,9 @@ print(json.dumps(result) if result else "null")
                 "performance_impact": learning_data.get("impact", "positive")
             }
 
-            import subprocess
-            cmd = [
-                "python3", "-c",
-                f"""
-import json
-from claude_flow_mcp import memory_usage
-
-result = memory_usage(
-    action="store",
-    key="agent_{agent_name}_{category}_{int(time.time())}",
-    value=json.dumps({json.dumps(learning_payload)}),
-    namespace="agent_memory",
-    ttl={self.DEFAULT_TTL["agent_memory"]}
-)
-print(result)
-                """
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            return result.returncode == 0
+            return self._store_deferred(f"agent_{agent_name}_{category}_{int(time.time())}",
+                                        learning_payload, namespace="agent_memory",
+                                        ttl=self.DEFAULT_TTL["agent_memory"])
 
         except Exception as e:
             print(f"❌ Erro ao salvar aprendizado do agente: {e}")
@@ -179,38 +162,11 @@ print(result)
         Usado para evolução e adaptação contínua
         """
         try:
-            import subprocess
-            cmd = [
-                "python3", "-c",
-                f"""
-import json
-from claude_flow_mcp import memory_usage
-
-result = memory_usage(
-    action="list",
-    namespace="agent_memory"
-)
-print(json.dumps(result) if result else "null")
-                """
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            self.flush()
 
-            if result.returncode == 0 and result.stdout.strip() != "null":
-                memory_data = json.loads(result.stdout.strip())
-
-                # Filtrar aprendizados do agente específico
-                agent_learnings = []
-                if memory_data.get("success") and memory_data.get("entries"):
-                    for entry in memory_data["entries"]:
-                        if agent_name in entry.get("key", ""):
-                            agent_learnings.append(entry)
-
-                # Ordenar por timestamp (mais recentes primeiro) e limitar
-                agent_learnings.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-                return agent_learnings[:limit]
-
-            return []
+            # Range scan pelo prefixo agent_{nome}_ (mais recentes primeiro)
+            return self.engine.list_prefix(f"agent_{agent_name}_", namespace="agent_memory",
+                                           limit=limit)
 
         except Exception as e:
             print(f"❌ Erro ao recuperar aprendizados: {e}")
@@ -234,26 +190,8 @@ print(json.dumps(result) if result else "null")
                 "last_used": None
             }
 
-            import subprocess
-            cmd = [
-                "python3", "-c",
-                f"""
-import json
-from claude_flow_mcp import memory_usage
-
-result = memory_usage(
-    action="store",
-    key="{pattern_key}",
-    value=json.dumps({json.dumps(knowledge_payload)}),
-    namespace="knowledge_base",
-    ttl={self.DEFAULT_TTL["knowledge_base"]}
-)
-print(result)
-                """
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            success = result.returncode == 0
+            success = self.engine.store(pattern_key, knowledge_payload, namespace="knowledge_base",
+                                        ttl=self.DEFAULT_TTL["knowledge_base"])
 
             if success:
                 print(f"✅ Padrão '{pattern_key}' salvo na knowledge base")
@@ -271,33 +209,10 @@ print(result)
         Retorna aprendizados e best practices aplicáveis
         """
         try:
-            import subprocess
-            cmd = [
-                "python3", "-c",
-                f"""
-import json
-from claude_flow_mcp import memory_search
-
-result = memory_search(
-    query="{query}",
-    namespace="knowledge_base",
-    limit={limit}
-)
-print(json.dumps(result) if result else "null")
-                """
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
-
-            if result.returncode == 0 and result.stdout.strip() != "null":
-                search_data = json.loads(result.stdout.strip())
-
-                if search_data.get("success"):
-                    matches = search_data.get("matches", [])
-                    print(f"🔍 Encontrados {len(matches)} padrões para '{query}'")
-                    return matches
-
-            return []
+            matches = self.engine.search(query, namespace="knowledge_base", limit=limit)
+            if matches:
+                print(f"🔍 Encontrados {len(matches)} padrões para '{query}'")
+            return matches
 
         except Exception as e:
             print(f"❌ Erro na busca de conhecimento: {e}")
@@ -320,26 +235,8 @@ print(json.dumps(result) if result else "null")
                 "confidence": result_data.get("confidence", 0.0)
             }
 
-            import subprocess
-            cmd = [
-                "python3", "-c",
-                f"""
-import json
-from claude_flow_mcp import memory_usage
-
-result = memory_usage(
-    action="store",
-    key="perf_{cache_key}",
-    value=json.dumps({json.dumps(cache_payload)}),
-    namespace="performance_cache",
-    ttl={ttl_hours * 3600}
-)
-print(result)
-                """
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            return result.returncode == 0
+            return self._store_deferred(f"perf_{cache_key}", cache_payload,
+                                        namespace="performance_cache", ttl=ttl_hours * 3600)
 
         except Exception as e:
             print(f"❌ Erro ao fazer cache de performance: {e}")
@@ -351,31 +248,12 @@ print(result)
         Evita processamento duplicado
         """
         try:
-            import subprocess
-            cmd = [
-                "python3", "-c",
-                f"""
-import json
-from claude_flow_mcp import memory_usage
-
-result = memory_usage(
-    action="retrieve",
-    key="perf_{cache_key}",
-    namespace="performance_cache"
-)
-print(json.dumps(result) if result else "null")
-                """
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            cache_value = self._retrieve_value(f"perf_{cache_key}", "performance_cache")
 
-            if result.returncode == 0 and result.stdout.strip() != "null":
-                cache_data = json.loads(result.stdout.strip())
-
-                if cache_data.get("found"):
-                    cached_result = json.loads(cache_data["value"])
-                    print(f"⚡ Cache hit para '{cache_key}' - evitando reprocessamento")
-                    return cached_result
+            if cache_value is not None:
+                cached_result = json.loads(cache_value)
+                print(f"⚡ Cache hit para '{cache_key}' - evitando reprocessamento")
+                return cached_result
 
             return None
 
@@ -399,32 +277,19 @@ print(json.dumps(result) if result else "null")
             }
 
             # Coletar estatísticas de cada namespace
+            self.flush()
             for namespace, description in self.NAMESPACES.items():
-                import subprocess
-                cmd = [
-                    "python3", "-c",
-                    f"""
-import json
-from claude_flow_mcp import memory_usage
-
-result = memory_usage(
-    action="list",
-    namespace="{namespace}"
-)
-print(json.dumps(result) if result else "null")
-                    """
-                ]
-
-                result = subprocess.run(cmd, capture_output=True, text=True)
-
-                if result.returncode == 0 and result.stdout.strip() != "null":
-                    namespace_data = json.loads(result.stdout.strip())
-                    stats["namespaces_stats"][namespace] = {
-                        "description": description,
-                        "entries_count": namespace_data.get("count", 0),
-                        "storage_type": namespace_data.get("storage_type", "sqlite")
-                    }
-                    stats["total_entries"] += namespace_data.get("count", 0)
+                entries_count = self.engine.count(namespace)
+                stats["namespaces_stats"][namespace] = {
+                    "description": description,
+                    "entries_count": entries_count,
+                    "storage_type": "sqlite"
+                }
+                stats["total_entries"] += entries_count
+
+            stats["engine_operations"] = dict(self.engine.stats)
+            if self.writer:
+                stats["write_behind"] = dict(self.writer.stats)
 
             return stats
 
@@ -446,9 +311,9 @@ print(json.dumps(result) if result else "null")
 
             print("🧹 Iniciando cleanup de entradas expiradas...")
 
-            # Claude Flow SQLite com TTL automático não precisa cleanup manual
-            # O SQLite cuida da expiração automaticamente
-            print("✅ Claude Flow SQLite com TTL automático - cleanup não necessário")
+            # Leituras já ignoram expires_at vencido; aqui liberamos o espaço de fato
+            cleanup_stats["cleaned_entries"] = self.engine.purge_expired()
+            print(f"✅ {cleanup_stats['cleaned_entries']} entradas expiradas removidas")
 
             return cleanup_stats
 
@@ -464,8 +329,10 @@ class V6WithPersistence:
     Integra o sistema V6 atual com persistência inteligente
     """
 
-    def __init__(self):
-        self.persistence = V6ContextPersistence()
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, write_behind: bool = True,
+                 enable_fts: bool = False):
+        self.persistence = V6ContextPersistence(db_path, write_behind=write_behind,
+                                                enable_fts=enable_fts)
         print("🚀 V6 Complete + Context Persistence INTEGRATED")
         print("🧠 Claude Flow SQLite: Cross-session memory ATIVADO")
         print("💾 Performance Cache: ATIVADO")
@@ -533,12 +400,14 @@ class V6WithPersistence:
 
 
 if __name__ == "__main__":
+    import sys
+
     print("🧠 V6 CONTEXT PERSISTENCE LAYER - CLAUDE FLOW SQLITE")
     print("🚀 Testando integração com SQLite nativo do Claude Flow MCP")
     print("")
 
     # Teste básico de persistência
-    persistence = V6ContextPersistence()
+    persistence = V6ContextPersistence(enable_fts="--fts" in sys.argv)
 
     # Teste de salvamento
     test_context = {
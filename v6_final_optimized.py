@@ -7,10 +7,12 @@
 
 import sys
 import time
-import os
-import json
 from datetime import datetime
 
+from v6_router import get_router
+from v6_jsonl_logger import get_logger
+from v6_metrics import TASK_MS, TASKS
+
 # LAZY psutil (só carrega se precisa)
 try:
     import psutil
@@ -48,32 +50,25 @@ class V6Enterprise:
         exec_time = (time.time() - start) * 1000
         success = confidence > 0.90
         self.successes += success
+        TASK_MS.labels("enterprise", "").observe(exec_time)
+        TASKS.labels("enterprise", "", "success" if success else "failure").inc()
 
         print(f"⏱️  {exec_time:.0f}ms | Success: {'✅' if success else '❌'}")
         self.log_execution(task, confidence, exec_time, success)
+        return {"task": task, "confidence": confidence, "agents": agents,
+                "time_ms": exec_time, "success": success}
 
     def fixed_decider(self, task):
-        """Fixed Mode Decider otimizado (0.01s)"""
-        task_lower = task.lower()
-        scores = {
-            "error": 0.98, "deploy": 0.95, "setup": 0.92,
-            "pesquis": 0.90, "code": 0.88, "api": 0.87
-        }
-        score = 0.85
-        for k, v in scores.items():
-            if k in task_lower: score = max(score, v)
-        return score
+        """Fixed Mode Decider otimizado (regras: v6_router.ROUTING_RULES["enterprise"])"""
+        return get_router().route_enterprise(task)
 
     def log_execution(self, task, conf, time_ms, success):
         """Auto-logs otimizados"""
-        os.makedirs(".claude/logs", exist_ok=True)
-        log = {
+        get_logger(".claude/logs/v6_executions.jsonl").log({
             "timestamp": datetime.now().isoformat(),
             "task": task, "confidence": conf,
             "time_ms": time_ms, "success": success
-        }
-        with open(".claude/logs/v6_executions.jsonl", "a") as f:
-            f.write(json.dumps(log) + "\n")
+        })
 
 if __name__ == "__main__":
     v6 = V6Enterprise()
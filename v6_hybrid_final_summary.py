@@ -93,22 +93,14 @@ class V6HybridSummary:
 
         print(f"\n📈 V6 EXECUTION LOGS ANALYSIS:")
 
-        try:
-            with open("/home/arturdr/Claude/.claude/logs/v6_executions.jsonl", 'r') as f:
-                logs = [json.loads(line) for line in f]
-
-            total_tasks = len(logs)
-            avg_confidence = sum(log['confidence'] for log in logs) / total_tasks
-            avg_time = sum(log['time_ms'] for log in logs) / total_tasks
-            success_rate = sum(1 for log in logs if log['success']) / total_tasks * 100
-
-            print(f"      📊 Total Tasks: {total_tasks}")
-            print(f"      🎯 Avg Confidence: {avg_confidence:.1f}%")
-            print(f"      ⏱️  Avg Time: {avg_time:.1f}ms")
-            print(f"      ✅ Success Rate: {success_rate:.1f}%")
-            print(f"      📈 V6 Consistency: {avg_time > 65 and avg_time < 75}")
-
-        except FileNotFoundError:
+        logs = aggregate_logs(["/home/arturdr/Claude/.claude/logs/v6_executions.jsonl"])
+        if logs["total"]:
+            print(f"      📊 Total Tasks: {logs['total']}")
+            print(f"      🎯 Avg Confidence: {logs['avg_confidence']:.1f}%")
+            print(f"      ⏱️  Avg Time: {logs['latency_ms']['mean']:.1f}ms")
+            print(f"      ✅ Success Rate: {logs['success_rate'] * 100:.1f}%")
+            print(f"      📈 V6 Consistency: {logs['latency_ms']['mean'] > 65 and logs['latency_ms']['mean'] < 75}")
+        else:
             print("      📝 No execution logs found")
 
         # V6 Architecture Benefits
@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+📝 V6 JSONL LOGGER - Log de execuções em background com rotação
+===============================================================
+1 handle aberto por arquivo | Fila + thread escritora | Flush a cada N registros ou T ms
+Rotação por tamanho ou por dia | Segmentos fechados comprimidos (gzip/zstd)
+O hot path só enfileira o dict: json.dumps e write acontecem na thread de background
+Vários processos no mesmo arquivo (daemon + CLI): escrita e rotação sob flock em <arquivo>.lock
+"""
+
+import atexit
+import gzip
+import json
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Optional
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False  # Windows: sem lock entre processos, só a checagem de inode
+
+COMPRESSORS = ("gzip", "zstd")
+
+
+class V6JSONLLogger:
+    """
+    📝 Logger JSONL compartilhado (um por arquivo, via get_logger)
+    Um único writer grava os lotes em ordem FIFO; rotate="size" fecha o segmento ao
+    passar de max_bytes, rotate="daily" na virada do dia. Segmentos fechados viram
+    <nome>.<carimbo>.jsonl(.gz|.zst) ao lado do arquivo ativo.
+    Outros processos podem escrever no mesmo arquivo: cada lote é gravado sob flock
+    exclusivo em <arquivo>.lock, depois de reabrir o handle se o inode mudou (alguém
+    rotacionou), e o tamanho para a rotação vem do disco, não de um contador local.
+    background=False (ou depois do close) grava de forma síncrona, sem thread.
+    A fila guarda no máximo max_queue registros: se os flushes seguem falhando, os novos
+    são descartados e contados em stats["dropped"] em vez de crescer sem limite.
+    """
+
+    def __init__(self, path: str, flush_every: int = 256, flush_interval_ms: int = 100,
+                 rotate: Optional[str] = "size", max_bytes: int = 64 * 1024 * 1024,
+                 compress: Optional[str] = "gzip", background: bool = True,
+                 max_queue: int = 100_000):
+        if rotate not in (None, "size", "daily"):
+            raise ValueError(f"rotate inválido: {rotate!r} (None, 'size' ou 'daily')")
+        if compress not in (None,) + COMPRESSORS:
+            raise ValueError(f"compress inválido: {compress!r} (None, 'gzip' ou 'zstd')")
+        if compress == "zstd" and not HAS_ZSTD:
+            raise ImportError("compress='zstd' requer zstandard (pip install zstandard)")
+
+        self.path = os.path.abspath(path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval_ms / 1000
+        self.rotate = rotate
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.max_queue = max_queue
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._file = None
+        self._lock_fd = None
+        self._size = 0
+        self._day = None
+        self._warned_late = False
+        self._warned_full = False
+        self.stats = {"written": 0, "batches": 0, "rotations": 0, "reopens": 0, "late": 0,
+                      "errors": 0, "dropped": 0}
+
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run, name="v6-jsonl-logger", daemon=True)
+            self._thread.start()
+
+    def log(self, record: Dict):
+        """Enfileira um registro; não toca no disco (quem chama não deve mutar o dict depois)"""
+        if len(self._queue) >= self.max_queue:
+            self._drop()
+            return
+        if self._closed or self._thread is None:
+            self._write_now(record)
+            return
+        self._queue.append(record)
+        # Só quem completa o lote acorda o writer; o resto espera o timer de flush_interval
+        if len(self._queue) == self.flush_every:
+            with self._cond:
+                self._cond.notify()
+
+    def _write_now(self, record: Dict):
+        """Sem thread (background=False, ou task atrasada depois do close_all): grava já"""
+        if self._closed:
+            self.stats["late"] += 1
+            if not self._warned_late:
+                self._warned_late = True
+                print(f"⚠️  Log {self.path} recebeu registros depois do close - gravando de forma síncrona")
+        self._queue.append(record)
+        try:
+            self.flush()
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"❌ Gravação síncrona do log {self.path} falhou: {e}")
+        if self._closed:
+            self._release_handles()
+
+    def _drop(self):
+        self.stats["dropped"] += 1
+        if not self._warned_full:
+            self._warned_full = True
+            print(f"⚠️  Fila do log {self.path} cheia ({self.max_queue} registros, flush falhando?) - "
+                  f"descartando novos registros (ver stats['dropped'])")
+
+    def pending_count(self) -> int:
+        return len(self._queue)
+
+    @contextmanager
+    def _file_lock(self):
+        """flock exclusivo em <arquivo>.lock: um processo por vez grava ou rotaciona"""
+        if not HAS_FCNTL:
+            yield
+            return
+        if self._lock_fd is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _sync_handle(self):
+        """(sob o flock) Reabre se outro processo rotacionou/removeu o arquivo; tamanho real do disco"""
+        if self._file is not None:
+            try:
+                current = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current != os.fstat(self._file.fileno()).st_ino:
+                self._file.close()
+                self._file = None
+                self.stats["reopens"] += 1
+        if self._file is None:
+            self._open()
+        else:
+            self._size = os.fstat(self._file.fileno()).st_size
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._size = self._file.tell()
+        # Arquivo que já existia pertence ao dia em que foi escrito por último
+        mtime = os.path.getmtime(self.path) if self._size else time.time()
+        self._day = date.fromtimestamp(mtime)
+
+    def _segment_path(self, stamp: str) -> str:
+        base, ext = os.path.splitext(self.path)
+        candidate, n = f"{base}.{stamp}{ext}", 1
+        while any(os.path.exists(candidate + suffix) for suffix in ("", ".gz", ".zst")):
+            n += 1
+            candidate = f"{base}.{stamp}-{n}{ext}"
+        return candidate
+
+    def _rotate(self, stamp: str) -> str:
+        """(sob o flock) Renomeia o arquivo ativo para um segmento e abre um novo; a compressão fica para depois do lock"""
+        self._file.close()
+        self._file = None
+        segment = self._segment_path(stamp)
+        os.replace(self.path, segment)
+        self.stats["rotations"] += 1
+        self._open()
+        return segment
+
+    def _compress(self, segment: str):
+        if self.compress == "gzip":
+            target = segment + ".gz"
+            with open(segment, "rb") as src, gzip.open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+        else:
+            target = segment + ".zst"
+            with open(segment, "rb") as src, open(target, "wb") as dst:
+                zstandard.ZstdCompressor().copy_stream(src, dst)
+        os.remove(segment)
+
+    def _maybe_rotate(self, incoming: int) -> Optional[str]:
+        segment = None
+        if self.rotate == "daily":
+            today = date.today()
+            if today != self._day and self._size:
+                segment = self._rotate(self._day.isoformat())
+            self._day = today
+        elif self.rotate == "size" and self._size and self._size + incoming > self.max_bytes:
+            segment = self._rotate(datetime.now().strftime("%Y%m%d-%H%M%S"))
+        return segment
+
+    def flush(self) -> int:
+        """Grava tudo que está na fila agora (bloqueante); retorna registros gravados"""
+        written = 0
+        with self._write_lock:
+            while self._queue:
+                batch = [self._queue.popleft() for _ in range(len(self._queue))]
+                lines = []
+                for record in batch:
+                    try:
+                        lines.append(json.dumps(record, default=str) + "\n")
+                    except (TypeError, ValueError):
+                        self.stats["errors"] += 1
+                data = "".join(lines)
+                segment = None
+                try:
+                    with self._file_lock():
+                        self._sync_handle()
+                        segment = self._maybe_rotate(len(data))
+                        self._file.write(data)
+                        self._file.flush()
+                except Exception:
+                    # Devolve o lote na frente da fila, na mesma ordem, para a próxima tentativa
+                    self._queue.extendleft(reversed(batch))
+                    raise
+                finally:
+                    # Segmento já renomeado e fora do caminho dos outros processos: comprime sem o lock
+                    if segment and self.compress:
+                        self._compress(segment)
+                self._size += len(data.encode("utf-8")) if not data.isascii() else len(data)
+                written += len(lines)
+                self.stats["written"] += len(lines)
+                self.stats["batches"] += 1
+        return written
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._queue) < self.flush_every and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+
+            try:
+                self.flush()
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"❌ Flush do log {self.path} falhou (nova tentativa em seguida): {e}")
+                time.sleep(self.flush_interval)
+
+            if closed:
+                return
+
+    def close(self):
+        """Flush final, parada da thread e handle fechado (close_all faz isso no exit)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        self._release_handles()
+
+    def _release_handles(self):
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+
+_loggers: Dict[str, V6JSONLLogger] = {}
+_loggers_lock = threading.Lock()
+_shutting_down = False
+
+
+def get_logger(path: str, **options) -> V6JSONLLogger:
+    """
+    Logger compartilhado do arquivo (options só valem na primeira chamada por path)
+    Depois do close_all (atexit) devolve loggers síncronos: sem thread nova no shutdown
+    """
+    key = os.path.abspath(path)
+    logger = _loggers.get(key)
+    if logger is None:
+        with _loggers_lock:
+            logger = _loggers.get(key)
+            if logger is None:
+                if _shutting_down:
+                    options = {**options, "background": False}
+                logger = _loggers[key] = V6JSONLLogger(key, **options)
+    return logger
+
+
+@atexit.register
+def close_all():
+    """Drena todos os loggers (o processo não sai com registros na fila)"""
+    global _shutting_down
+    with _loggers_lock:
+        _shutting_down = True
+        loggers = list(_loggers.values())
+        _loggers.clear()
+    for logger in loggers:
+        logger.close()
+
+
+def benchmark_logging(records: int = 100_000) -> Dict:
+    """Custo por registro no hot path: open/append/close por task vs fila do logger"""
+    import tempfile
+
+    record = {"timestamp": datetime.now().isoformat(), "task": "research error 522 on cloudflare",
+              "confidence": 0.98, "time_ms": 12.5, "success": True, "mcps_used": 1, "needed_mcps": ["tavily"],
+              "strategy": "research_error", "active_mcps": ["tavily", "redis"]}
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_path = os.path.join(tmp, "logs", "sync.jsonl")
+        start = time.perf_counter()
+        for _ in range(records):
+            os.makedirs(os.path.dirname(sync_path), exist_ok=True)
+            with open(sync_path, "a") as f:
+                f.write(json.dumps(dict(record)) + "\n")
+        sync_s = time.perf_counter() - start
+
+        logger = V6JSONLLogger(os.path.join(tmp, "logs", "queued.jsonl"), max_bytes=8 * 1024 * 1024,
+                               max_queue=records)
+        start = time.perf_counter()
+        for _ in range(records):
+            logger.log(dict(record))
+        enqueue_s = time.perf_counter() - start
+        logger.close()
+        drained_s = time.perf_counter() - start
+        segments = sorted(os.listdir(os.path.join(tmp, "logs")))
+
+    return {"records": records, "sync_us": sync_s / records * 1e6,
+            "enqueue_us": enqueue_s / records * 1e6, "drained_s": drained_s,
+            "written": logger.stats["written"], "batches": logger.stats["batches"],
+            "rotations": logger.stats["rotations"], "segments": segments}
+
+
+if __name__ == "__main__":
+    print("📝 V6 JSONL LOGGER - BENCHMARK (100k registros)")
+    result = benchmark_logging()
+    print(f"\n🐢 open/append por task: {result['sync_us']:>8.1f}µs/registro")
+    print(f"⚡ Enfileirar:           {result['enqueue_us']:>8.1f}µs/registro")
+    print(f"💾 Até o disco:          {result['drained_s']:.3f}s em {result['batches']} lotes")
+    print(f"🔄 Rotações: {result['rotations']} | segmentos: {result['segments']}")
+    print(f"✅ Registros gravados: {result['written']:,}")
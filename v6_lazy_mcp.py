@@ -7,10 +7,12 @@
 
 import sys
 import time
-import os
-import json
 from datetime import datetime
 
+from v6_router import get_router
+from v6_jsonl_logger import get_logger
+from v6_metrics import MCP_LOAD_MS, MCP_LOADS, MCP_USES, TASK_MS, TASKS
+
 # LAZY MCP SYSTEM - Only loads when needed
 class LazyMCPManager:
     def __init__(self):
@@ -21,12 +23,16 @@ class LazyMCPManager:
         """Lazy load MCP only when needed"""
         if mcp_name not in self.loaded_mcps:
             print(f"🔥 ACTIVATING MCP: {mcp_name.upper()} (on-demand)")
+            start = time.perf_counter()
             self.loaded_mcps[mcp_name] = self._load_mcp(mcp_name)
+            MCP_LOAD_MS.labels(mcp_name).observe((time.perf_counter() - start) * 1000)
+            MCP_LOADS.labels(mcp_name, "load").inc()
             print(f"✅ {mcp_name.upper()} MCP loaded and ready!")
         else:
             print(f"⚡ {mcp_name.upper()} MCP already active (instant access)")
 
         self.mcp_stats[mcp_name] += 1
+        MCP_USES.labels(mcp_name).inc()
         return self.loaded_mcps[mcp_name]
 
     def _load_mcp(self, mcp_name):
@@ -161,38 +167,19 @@ class V6EnterpriseLazyMCP:
         exec_time = (time.time() - start) * 1000
         success = confidence > 0.90
         self.successes += success
+        TASK_MS.labels("lazy", strategy).observe(exec_time)
+        TASKS.labels("lazy", strategy, "success" if success else "failure").inc()
 
         # Display comprehensive results
         self.display_results(task, confidence, agents, exec_time, success,
                            mcp_results, strategy)
 
-    def analyze_task_with_mcps(self, task):
-        """Enhanced analysis with MCP requirements"""
-        task_lower = task.lower()
-
-        # Base confidence scoring
-        if any(word in task_lower for word in ['error', '522', 'timeout', 'fail']):
-            confidence = 0.98
-            strategy = "error-solving"
-            needed_mcps = ["tavily"] if any(word in task_lower for word in ['error', '522']) else []
-        elif any(word in task_lower for word in ['pesquis', 'research', 'analyze', 'trends']):
-            confidence = 0.95
-            strategy = "research"
-            needed_mcps = ["tavily"]
-        elif any(word in task_lower for word in ['document', 'pdf', 'process']):
-            confidence = 0.92
-            strategy = "document-processing"
-            needed_mcps = ["docling"]
-        elif any(word in task_lower for word in ['deploy', 'setup', 'infrastructure']):
-            confidence = 0.94
-            strategy = "deployment"
-            needed_mcps = ["claude_flow"]
-        else:
-            confidence = 0.88
-            strategy = "general"
-            needed_mcps = []
+        return {"task": task, "strategy": strategy, "confidence": confidence, "agents": agents,
+                "time_ms": exec_time, "success": success, "mcp_results": mcp_results}
 
-        return confidence, strategy, needed_mcps
+    def analyze_task_with_mcps(self, task):
+        """Enhanced analysis with MCP requirements (rules: v6_router.ROUTING_RULES["lazy"])"""
+        return get_router().route_lazy(task)
 
     def execute_mcp_task(self, mcp, task, strategy):
         """Execute specific MCP task based on strategy"""
@@ -232,7 +219,6 @@ class V6EnterpriseLazyMCP:
 
     def log_execution(self, task, conf, time_ms, success, mcps_used, strategy):
         """Enhanced logging with MCP info"""
-        os.makedirs(".claude/logs", exist_ok=True)
         log = {
             "timestamp": datetime.now().isoformat(),
             "task": task,
@@ -243,8 +229,7 @@ class V6EnterpriseLazyMCP:
             "strategy": strategy,
             "active_mcps": self.mcp_manager.get_active_mcps()
         }
-        with open(".claude/logs/v6_lazy_mcp.jsonl", "a") as f:
-            f.write(json.dumps(log) + "\n")
+        get_logger(".claude/logs/v6_lazy_mcp.jsonl").log(log)
 
 if __name__ == "__main__":
     print("🚀 V6 ENTERPRISE LAZY-MCP INITIALIZING...")
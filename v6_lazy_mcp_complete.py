@@ -9,11 +9,60 @@ import sys
 import time
 import os
 import json
+import uuid
+import atexit
+import threading
+import gc
+import hashlib
+import types
+import asyncio
+from concurrent.futures import Future
+from contextlib import contextmanager
 from datetime import datetime
 
+from v6_agentdb_ann import DEFAULT_INDEX_PATH, IVFFlatIndex, hash_embedding
+from v6_mcp_executor import V6MCPFanOutExecutor
+from v6_mcp_prewarm import DEFAULT_LOG_PATH, MCPPrewarmer, MCPTransitionPredictor
+from v6_jsonl_logger import get_logger
+from v6_metrics import (MCP_EVICTIONS, MCP_LOAD_MS, MCP_LOADED, MCP_LOADS, MCP_MEMORY_BYTES,
+                        MCP_USES, TASK_MS, TASKS)
+from v6_router import get_router
+from v6_router_model import DEFAULT_MODEL_PATH, load_learned_router
+
+# AgentDB only writes the task into the persisted index when the task asks for it
+AGENTDB_WRITE_WORDS = frozenset(("store", "save", "index", "insert", "upsert", "ingest", "remember", "embed"))
+
 # LAZY MCP SYSTEM - Real MCPs discovered in archive
+def measure_mcp_bytes(mcp, limit=200_000):
+    """Measured footprint of a loaded MCP: its own memory_bytes() hook, else a deep sizeof walk"""
+    if hasattr(mcp, "memory_bytes"):
+        return int(mcp.memory_bytes())
+    shared = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+    seen = set()
+    pending = [mcp]
+    total = 0
+    while pending and len(seen) < limit:
+        obj = pending.pop()
+        if id(obj) in seen or isinstance(obj, shared):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj, 0)  # ndarrays that own their buffer include it here
+        if hasattr(obj, "__dict__"):
+            pending.append(vars(obj))
+        pending.extend(gc.get_referents(obj))
+    return total
+
 class CompleteLazyMCPManager:
-    def __init__(self):
+    """
+    Lazy MCP loader with eviction: per-MCP idle timeout, a global memory
+    budget over measured footprints, LRU or LFU victim selection, and
+    close hooks so evicted clients release their resources.
+    MCPs leased by a running task (get_mcp(lease=True) / lease()) are never
+    evicted; victims are detached under the lock and closed after releasing it.
+    """
+
+    def __init__(self, idle_timeout=300.0, memory_budget_mb=256, policy="lru",
+                 idle_timeouts=None, remeasure_interval=30.0):
         self.loaded_mcps = {}
         self.mcp_stats = {
             "tavily": 0, "redis": 0, "docling": 0,
@@ -21,6 +70,30 @@ class CompleteLazyMCPManager:
             "flow_nexus": 0, "ruv_swarm": 0, "agentdb": 0,
             "coolify": 0
         }
+        # Eviction policy
+        self.idle_timeout = idle_timeout
+        self.idle_timeouts = dict(idle_timeouts or {})  # per-MCP overrides
+        self.memory_budget_bytes = None if memory_budget_mb is None else int(memory_budget_mb * 1024 * 1024)
+        self.policy = policy
+        self.remeasure_interval = remeasure_interval
+        self.last_used = {}      # name -> monotonic time of last get_mcp
+        self.uses = {}           # name -> get_mcp calls since this load (LFU)
+        self.mcp_bytes = {}      # name -> measured bytes
+        self._measured_at = {}
+        self._ever_loaded = set()
+        self.close_hooks = []    # callables (name, mcp) run after an MCP is unloaded
+        self.eviction_stats = {"loads": 0, "reloads": 0, "evictions_idle": 0,
+                               "evictions_memory": 0, "close_errors": 0}
+        # Predictive prewarm: loads done ahead of time, credited when a task first uses them
+        self.load_ms = {}        # name -> last measured cold-load time
+        self.prewarmed = {}      # name -> load ms, until its first get_mcp
+        self.prewarm_stats = {"loads": 0, "hits": 0, "wasted": 0, "latency_removed_ms": 0.0}
+        self._lock = threading.RLock()  # guards the dicts/counters; never held while constructing
+        self._loading = {}               # name -> Future of the load in progress
+        self._leases = {}                # name -> callers currently using it (not evictable)
+        self._closing = {}               # name -> Event set once the evicted instance is closed
+        self.concurrency_stats = {"load_waiters": 0, "load_errors": 0}
+        self._reaper = None
         print("🔥 COMPLETE LAZY-MCP SYSTEM INITIALIZED")
         print("📊 Available MCPs: 10+ real servers")
         print("💾 Memory: 0MB (idle)")
@@ -28,18 +101,258 @@ class CompleteLazyMCPManager:
     def get_active_mcps(self):
         return list(self.loaded_mcps.keys())
 
-    def get_mcp(self, mcp_name, task_context=""):
-        """Lazy load REAL MCP only when needed"""
-        if mcp_name not in self.loaded_mcps:
-            print(f"🚀 ACTIVATING REAL MCP: {mcp_name.upper()}")
-            print(f"📡 Loading from archive...")
-            self.loaded_mcps[mcp_name] = self._load_real_mcp(mcp_name)
-            print(f"✅ {mcp_name.upper()} REAL MCP loaded!")
-        else:
-            print(f"⚡ {mcp_name.upper()} MCP cached (instant access)")
+    def get_mcp(self, mcp_name, task_context="", lease=False):
+        """
+        Lazy load REAL MCP only when needed (thread-safe)
+        Exactly one caller constructs a missing MCP; concurrent callers wait
+        on the same load future instead of building a second instance.
+        lease=True pins the MCP against eviction until release(mcp_name).
+        """
+        self.evict_idle()
+        while True:
+            mcp, future, owner = self._claim(mcp_name)
+            if mcp is not None:
+                print(f"⚡ {mcp_name.upper()} MCP cached (instant access)")
+            else:
+                if owner:
+                    self._run_load(mcp_name, future)
+                mcp = future.result()
+            if self._checkout(mcp_name, mcp, lease):
+                return mcp
+            # Evicted between the load and the checkout: load it again
+
+    def release(self, mcp_name):
+        """Drop a lease taken with get_mcp(lease=True); budget evictions it held back run now"""
+        with self._lock:
+            remaining = self._leases.get(mcp_name, 0) - 1
+            if remaining > 0:
+                self._leases[mcp_name] = remaining
+                return
+            self._leases.pop(mcp_name, None)
+            victims = self._enforce_budget()
+        self._close_detached(victims)
+
+    @contextmanager
+    def lease(self, mcp_name, task_context=""):
+        """with manager.lease("agentdb") as mcp: ... → not evictable inside the block"""
+        mcp = self.get_mcp(mcp_name, task_context, lease=True)
+        try:
+            yield mcp
+        finally:
+            self.release(mcp_name)
+
+    def _claim(self, mcp_name):
+        """(mcp, None, False) if loaded; else the load future and whether this caller must run it"""
+        with self._lock:
+            mcp = self.loaded_mcps.get(mcp_name)
+            if mcp is not None:
+                return mcp, None, False
+            future = self._loading.get(mcp_name)
+            if future is not None:
+                self.concurrency_stats["load_waiters"] += 1
+                return None, future, False
+            future = self._loading[mcp_name] = Future()
+            return None, future, True
+
+    def _run_load(self, mcp_name, future, prewarm=False):
+        """Construct the MCP outside the manager lock, then publish it and resolve the future"""
+        with self._lock:
+            reload = mcp_name in self._ever_loaded
+            closing = self._closing.get(mcp_name)
+        if closing is not None:
+            closing.wait()  # the evicted instance flushes its state before the new one reads it
+        print(f"🚀 {'RE-' if reload else ''}ACTIVATING REAL MCP: {mcp_name.upper()}")
+        print(f"📡 Loading from archive...")
+        start = time.perf_counter()
+        try:
+            mcp = self._load_real_mcp(mcp_name)
+        except BaseException as e:
+            with self._lock:
+                self._loading.pop(mcp_name, None)
+                self.concurrency_stats["load_errors"] += 1
+            future.set_exception(e)
+            raise
+        load_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            self.loaded_mcps[mcp_name] = mcp
+            self.load_ms[mcp_name] = load_ms
+            self._ever_loaded.add(mcp_name)
+            self.eviction_stats["loads"] += 1
+            self.eviction_stats["reloads"] += reload
+            self.uses[mcp_name] = 0
+            self.last_used[mcp_name] = time.monotonic()
+            self._measure(mcp_name)
+            if prewarm:
+                self.prewarmed[mcp_name] = load_ms
+                self.prewarm_stats["loads"] += 1
+            self._loading.pop(mcp_name, None)
+            MCP_LOADED.set(len(self.loaded_mcps))
+        MCP_LOADS.labels(mcp_name, "prewarm" if prewarm else "reload" if reload else "load").inc()
+        MCP_LOAD_MS.labels(mcp_name).observe(load_ms)
+        future.set_result(mcp)
+        print(f"✅ {mcp_name.upper()} REAL MCP loaded!")
+        return mcp
+
+    def _checkout(self, mcp_name, mcp, lease=False):
+        """Per-use bookkeeping, atomically under the manager lock; False if mcp was evicted meanwhile"""
+        with self._lock:
+            if self.loaded_mcps.get(mcp_name) is not mcp:
+                return False
+            if lease:
+                self._leases[mcp_name] = self._leases.get(mcp_name, 0) + 1
+            saved_ms = self.prewarmed.pop(mcp_name, None)
+            if saved_ms is not None:
+                self.prewarm_stats["hits"] += 1
+                self.prewarm_stats["latency_removed_ms"] += saved_ms
+            self.last_used[mcp_name] = time.monotonic()
+            self.uses[mcp_name] = self.uses.get(mcp_name, 0) + 1
+            self.mcp_stats[mcp_name] = self.mcp_stats.get(mcp_name, 0) + 1
+            victims = self._enforce_budget(keep=mcp_name)
+        self._close_detached(victims)
+        MCP_USES.labels(mcp_name).inc()
+        return True
+
+    def prewarm(self, mcp_name):
+        """Load an MCP ahead of need (background); no activation is counted until a task uses it"""
+        mcp, future, owner = self._claim(mcp_name)
+        if not owner:
+            return False
+        self._run_load(mcp_name, future, prewarm=True)
+        with self._lock:
+            victims = self._enforce_budget(keep=mcp_name)
+        self._close_detached(victims)
+        return True
+
+    def get_prewarm_stats(self):
+        return {**self.prewarm_stats, "pending": list(self.prewarmed)}
+
+    def _measure(self, mcp_name):
+        self.mcp_bytes[mcp_name] = measure_mcp_bytes(self.loaded_mcps[mcp_name])
+        self._measured_at[mcp_name] = time.monotonic()
+
+    def memory_usage_bytes(self):
+        """Sum of measured MCP footprints (stale measurements refreshed)"""
+        with self._lock:
+            now = time.monotonic()
+            for name in self.loaded_mcps:
+                if now - self._measured_at.get(name, 0) >= self.remeasure_interval:
+                    self._measure(name)
+            total = sum(self.mcp_bytes.get(name, 0) for name in self.loaded_mcps)
+        MCP_MEMORY_BYTES.set(total)
+        return total
+
+    def memory_usage_mb(self):
+        return self.memory_usage_bytes() / 1024 / 1024
+
+    def _idle_limit(self, mcp_name):
+        return self.idle_timeouts.get(mcp_name, self.idle_timeout)
+
+    def evict_idle(self):
+        """Unload every unleased MCP idle for longer than its timeout; returns the names evicted"""
+        with self._lock:
+            now = time.monotonic()
+            idle = [name for name in self.loaded_mcps
+                    if self._idle_limit(name) is not None and not self._leases.get(name)
+                    and now - self.last_used.get(name, now) > self._idle_limit(name)]
+            victims = [self._detach(name, "idle") for name in idle]
+        self._close_detached(victims)
+        return idle
+
+    def _enforce_budget(self, keep=None):
+        """
+        Detach LRU/LFU victims until measured usage fits the memory budget (caller holds
+        the lock and closes the returned victims after releasing it). Leased
+        MCPs are skipped; if only those are left the budget waits for their release().
+        """
+        if self.memory_budget_bytes is None:
+            return []
+        victims = []
+        usage = self.memory_usage_bytes()  # measured once; each victim's bytes come off the total
+        while usage > self.memory_budget_bytes:
+            candidates = [name for name in self.loaded_mcps if name != keep and not self._leases.get(name)]
+            if not candidates:
+                break
+            if self.policy == "lfu":
+                victim = min(candidates, key=lambda name: (self.uses.get(name, 0), self.last_used.get(name, 0)))
+            else:
+                victim = min(candidates, key=lambda name: self.last_used.get(name, 0))
+            usage -= self.mcp_bytes.get(victim, 0)
+            victims.append(self._detach(victim, "memory"))
+        if victims:
+            MCP_MEMORY_BYTES.set(usage)
+        return victims
+
+    def _detach(self, mcp_name, reason):
+        """Remove an MCP from the manager (lock held); returns (name, mcp, closed event) for _close_detached"""
+        mcp = self.loaded_mcps.pop(mcp_name)
+        self.mcp_bytes.pop(mcp_name, None)
+        self.uses.pop(mcp_name, None)
+        if self.prewarmed.pop(mcp_name, None) is not None:
+            self.prewarm_stats["wasted"] += 1
+        if reason in ("idle", "memory"):
+            self.eviction_stats[f"evictions_{reason}"] += 1
+        closed = self._closing[mcp_name] = threading.Event()
+        MCP_LOADED.set(len(self.loaded_mcps))
+        MCP_EVICTIONS.labels(mcp_name, reason).inc()
+        print(f"💤 Unloading {mcp_name.upper()} MCP ({reason})")
+        return mcp_name, mcp, closed
+
+    def _close_detached(self, detached):
+        """Run close() and the close hooks of detached MCPs - never under the manager lock (disk I/O)"""
+        for mcp_name, mcp, closed in detached:
+            closers = [mcp.close] if hasattr(mcp, "close") else []
+            closers += [lambda hook=hook: hook(mcp_name, mcp) for hook in self.close_hooks]
+            for close in closers:
+                try:
+                    close()
+                except Exception as e:
+                    with self._lock:
+                        self.eviction_stats["close_errors"] += 1
+                    print(f"❌ Close hook failed for {mcp_name}: {e}")
+            with self._lock:
+                if self._closing.get(mcp_name) is closed:
+                    del self._closing[mcp_name]
+            closed.set()
+
+    def unload(self, mcp_name, reason="manual"):
+        """Remove an MCP and run its close() plus the registered close hooks (leases are not checked)"""
+        with self._lock:
+            if mcp_name not in self.loaded_mcps:
+                return False
+            detached = self._detach(mcp_name, reason)
+        self._close_detached([detached])
+        return True
+
+    def close_all(self):
+        for name in list(self.loaded_mcps):
+            self.unload(name, reason="shutdown")
+        self.stop_reaper()
 
-        self.mcp_stats[mcp_name] += 1
-        return self.loaded_mcps[mcp_name]
+    def start_reaper(self, interval=30.0):
+        """Background idle eviction for long-running processes (no get_mcp traffic needed)"""
+        if self._reaper is not None:
+            return
+        stop = threading.Event()
+
+        def reap():
+            while not stop.wait(interval):
+                self.evict_idle()
+
+        self._reaper = (stop, threading.Thread(target=reap, name="v6-mcp-reaper", daemon=True))
+        self._reaper[1].start()
+
+    def stop_reaper(self):
+        if self._reaper is not None:
+            self._reaper[0].set()
+            self._reaper = None
+
+    def get_eviction_stats(self):
+        return {**self.eviction_stats, "loaded": self.get_active_mcps(),
+                "memory_mb": round(self.memory_usage_mb(), 3),
+                "budget_mb": (self.memory_budget_bytes / 1024 / 1024
+                              if self.memory_budget_bytes is not None else None),
+                "policy": self.policy}
 
     def _load_real_mcp(self, mcp_name):
         """Load REAL MCP from discovered archive"""
@@ -64,6 +377,32 @@ class CompleteLazyMCPManager:
         else:
             return GenericMCP(mcp_name)
 
+class AsyncCompleteLazyMCPManager:
+    """
+    asyncio-native front-end over the same manager state: coroutines waiting
+    for a load await its future without tying up a thread, and the blocking
+    MCP constructor runs once in the loop's executor
+    """
+
+    def __init__(self, manager=None, **kwargs):
+        self.manager = manager or CompleteLazyMCPManager(**kwargs)
+
+    async def get_mcp(self, mcp_name, task_context="", lease=False):
+        manager = self.manager
+        await asyncio.get_running_loop().run_in_executor(None, manager.evict_idle)
+        while True:
+            mcp, future, owner = manager._claim(mcp_name)
+            if mcp is None:
+                if owner:
+                    await asyncio.get_running_loop().run_in_executor(
+                        None, manager._run_load, mcp_name, future)
+                mcp = await asyncio.wrap_future(future)
+            if manager._checkout(mcp_name, mcp, lease):
+                return mcp
+
+    def __getattr__(self, name):
+        return getattr(self.manager, name)
+
 # REAL MCP IMPLEMENTATIONS (based on archive analysis)
 class RealTavilyMCP:
     def __init__(self):
@@ -195,6 +534,9 @@ class RealRedisMCP:
         print(f"💾 Redis SET: '{key}' = '{value}' (TTL: {ttl}s)")
         return True
 
+    def close(self):
+        self.cache_store.clear()
+
     def get_stats(self):
         return {
             "hits": self.cache_hits,
@@ -276,26 +618,91 @@ class RealFlowNexusMCP:
         return deployment
 
 class RealAgentDBMCP:
-    def __init__(self):
+    def __init__(self, index_path=DEFAULT_INDEX_PATH, max_vectors=50_000):
         self.name = "AgentDB Vector Database"
         self.vectors_stored = 0
-
-    def store_vector(self, data, metadata=None):
+        self.vectors_evicted = 0
+        self.max_vectors = max_vectors  # persisted index is capped: oldest vectors go first
+        # Local IVF-Flat ANN engine, persisted to .swarm/ (saved on exit)
+        self.index = IVFFlatIndex.load_or_create(index_path)
+        atexit.register(self.flush)
+
+    def _embed(self, data):
+        if hasattr(data, "shape") or (isinstance(data, (list, tuple)) and data
+                                      and isinstance(data[0], (int, float))):
+            return data
+        return hash_embedding(data, self.index.dims)
+
+    def store_vector(self, data, metadata=None, vector_id=None):
         self.vectors_stored += 1
         print(f"🗄️  REAL AgentDB: Storing vector...")
-        time.sleep(0.2)
 
         vector = {
-            "id": f"vec_{self.vectors_stored}",
-            "dimensions": 1536,
+            "id": vector_id or f"vec_{uuid.uuid4().hex[:12]}",
+            "dimensions": self.index.dims,
             "data_hash": hash(str(data)),
             "metadata": metadata or {},
             "stored_at": datetime.now().isoformat()
         }
+        self.index.add([vector["id"]], self._embed(data), [vector["metadata"]])
+        self._evict_over_cap()
 
-        print(f"✅ Vector stored: {vector['id']} ({vector['dimensions']}D)")
+        print(f"✅ Vector stored: {vector['id']} ({vector['dimensions']}D) | {len(self.index)} in index")
         return vector
 
+    def batch_store(self, items):
+        """Store many (data, metadata) pairs in one index update + one save"""
+        ids = [f"vec_{uuid.uuid4().hex[:12]}" for _ in items]
+        vectors = [self._embed(data) for data, _ in items]
+        metadata = [meta or {} for _, meta in items]
+        self.index.add(ids, vectors, metadata)
+        self._evict_over_cap()
+        self.vectors_stored += len(items)
+        self.flush()
+        print(f"✅ Batch stored: {len(items)} vectors | {len(self.index)} in index")
+        return [{"id": vector_id, "dimensions": self.index.dims} for vector_id in ids]
+
+    def _evict_over_cap(self):
+        excess = len(self.index) - self.max_vectors
+        if excess > 0:
+            for vector_id in self.index.oldest(excess):
+                self.index.delete(vector_id)
+            self.vectors_evicted += excess
+
+    def search_similar(self, query, k=5):
+        """Top-k cosine neighbours (IVF-Flat, nprobe auto-tuned to the recall target)"""
+        rows, scores = self.index.search(self._embed(query), k)
+        results = [
+            {
+                "id": self.index.ids[row],
+                "score": float(score),
+                "metadata": self.index.metadata.get(self.index.ids[row], {})
+            }
+            for row, score in zip(rows.tolist(), scores.tolist())
+        ]
+        print(f"🔎 AgentDB similarity: {len(results)} matches (nprobe={self.index.nprobe})")
+        return results
+
+    def get_vector(self, vector_id):
+        return self.index.get(vector_id)
+
+    def delete_vector(self, vector_id):
+        deleted = self.index.delete(vector_id)
+        print(f"🗑️  AgentDB delete {vector_id}: {'✅' if deleted else '❌ not found'}")
+        return deleted
+
+    def flush(self):
+        if self.index.dirty:
+            self.index.save()
+
+    def close(self):
+        """Eviction hook: persist the index before the client is dropped"""
+        self.flush()
+        atexit.unregister(self.flush)
+
+    def memory_bytes(self):
+        return self.index.memory_bytes()
+
 class RealCoolifyMCP:
     def __init__(self):
         self.name = "Coolify Deployment MCP"
@@ -326,82 +733,126 @@ class GenericMCP:
         return f"{self.name} result for {command}"
 
 class V6CompleteLazyMCP:
-    def __init__(self):
+    def __init__(self, parallel=True, max_workers=8, per_backend_limit=2,
+                 prewarm=True, log_path=DEFAULT_LOG_PATH, router="keyword",
+                 model_path=DEFAULT_MODEL_PATH):
         self.mcp_manager = CompleteLazyMCPManager()
         self.total_tasks = 0
         self.successes = 0
+        self._counters_lock = threading.Lock()  # execute() may run on several threads (batch mode)
+        self._last_route = threading.local()    # (strategy, needed_mcps) of this thread's task
+        self._session = threading.local()       # strategy of this thread's previous task (prewarm)
+        # Independent MCP calls fan out on a bounded thread pool (parallel=False → serial loop)
+        self.parallel = parallel
+        self.executor = V6MCPFanOutExecutor(max_workers=max_workers,
+                                            per_backend_limit=per_backend_limit)
+        # Next-MCP predictor trained on past strategy/active_mcps sequences
+        self.log_path = log_path
+        self.prewarmer = None
+        if prewarm:
+            predictor = MCPTransitionPredictor.from_log(log_path)
+            self.prewarmer = MCPPrewarmer(self.mcp_manager, predictor)
+            self.prewarmer.prime()
+        # router="learned": Naive Bayes trained from the logs (v6_router_model.py)
+        self.learned_router = load_learned_router(model_path) if router == "learned" else None
+        if router == "learned" and self.learned_router is None:
+            print(f"⚠️  No router model at {model_path} - using keyword rules")
+
+    def close(self):
+        """Stop the prewarm thread, drain the fan-out pool and unload (close) every MCP"""
+        if self.prewarmer:
+            self.prewarmer.close()
+            self.prewarmer = None
+        self.executor.shutdown()
+        self.mcp_manager.close_all()
 
     def execute(self, task):
-        self.total_tasks += 1
+        with self._counters_lock:
+            self.total_tasks += 1
         start = time.time()
-
+        self._last_route.value = (None, [])
+        if self.prewarmer:
+            self.prewarmer.task_started()
+        try:
+            return self._execute(task, start)
+        finally:
+            if self.prewarmer:
+                strategy, needed = getattr(self._last_route, "value", (None, []))
+                previous = getattr(self._session, "strategy", None)
+                self._session.strategy = strategy
+                self.prewarmer.task_finished(strategy, needed, previous)
+
+    def _execute(self, task, start):
         print("\n🎯 V6 ENTERPRISE LAZY-MCP COMPLETE")
         print(f"📡 Task: {task}")
         print(f"🔄 Active MCPs: {self.mcp_manager.get_active_mcps()}")
-        print(f"💾 Memory: {len(self.mcp_manager.loaded_mcps) * 15}MB")
+        print(f"💾 Memory: {self.mcp_manager.memory_usage_mb():.1f}MB (measured)")
 
         # Enhanced analysis with ALL MCPs
         confidence, strategy, needed_mcps = self.analyze_task_complete(task)
+        self._last_route.value = (strategy, needed_mcps)
         agents = max(25, int(confidence * 40))
 
         print(f"✅ Confidence: {confidence:.0%} | {agents} agents")
         print(f"🎯 Strategy: {strategy}")
         print(f"🔌 MCPs needed: {needed_mcps}")
 
-        # Execute ALL required MCPs
-        mcp_results = {}
-        for mcp_name in needed_mcps:
-            mcp = self.mcp_manager.get_mcp(mcp_name, task)
-            mcp_results[mcp_name] = self.execute_real_mcp_task(mcp, task, strategy)
+        # Execute ALL required MCPs (concurrently: wall time = slowest MCP, not the sum)
+        mcp_results, mcp_errors = self.execute_mcps(needed_mcps, task, strategy)
 
         # Core V6 execution
         time.sleep(0.07)
         exec_time = (time.time() - start) * 1000
-        success = confidence > 0.85
-        self.successes += success
+        success = not mcp_errors  # outcome of the MCP calls, not confidence > threshold
+        with self._counters_lock:
+            self.successes += success
+        TASK_MS.labels("complete", strategy).observe(exec_time)
+        TASKS.labels("complete", strategy, "success" if success else "failure").inc()
 
         self.display_complete_results(task, confidence, agents, exec_time, success,
-                                    mcp_results, strategy)
-
-    def analyze_task_complete(self, task):
-        """Complete analysis with ALL available MCPs"""
-        task_lower = task.lower()
-
-        # Error/Research → Tavily
-        if any(word in task_lower for word in ['error', '522', 'pesquis', 'research', 'analyze']):
-            return 0.98, "research_error", ["tavily"]
-
-        # Server Management → Hetzner
-        elif any(word in task_lower for word in ['server', 'hetzner', 'cloud', 'vps', 'deploy']):
-            return 0.95, "infrastructure", ["hetzner", "claude_flow"]
+                                    mcp_results, strategy, mcp_errors)
 
-        # Image/Visual → Nanobanana
-        elif any(word in task_lower for word in ['image', 'generate', 'visual', 'art', 'design']):
-            return 0.93, "creative", ["nanobanana"]
-
-        # Document → Docling
-        elif any(word in task_lower for word in ['document', 'pdf', 'process', 'text']):
-            return 0.92, "document_processing", ["docling", "redis"]
-
-        # Cache/Memory → Redis
-        elif any(word in task_lower for word in ['cache', 'memory', 'store', 'database']):
-            return 0.91, "data_management", ["redis", "agentdb"]
-
-        # Cloud Deploy → Flow Nexus + Coolify
-        elif any(word in task_lower for word in ['cloud deploy', 'production', 'scale']):
-            return 0.94, "cloud_deployment", ["flow_nexus", "coolify", "claude_flow"]
+        return {
+            "task": task,
+            "strategy": strategy,
+            "confidence": confidence,
+            "agents": agents,
+            "success": success,
+            "time_ms": exec_time,
+            "mcp_results": mcp_results,
+            "mcp_errors": mcp_errors
+        }
 
-        # Vector/Embedding → AgentDB
-        elif any(word in task_lower for word in ['vector', 'embedding', 'search', 'similarity']):
-            return 0.90, "vector_search", ["agentdb", "redis"]
+    def execute_mcps(self, needed_mcps, task, strategy):
+        """Run every needed MCP; returns ({mcp: result}, {mcp: error}) - one failure doesn't stop the rest"""
+        calls, leased = [], []
+        run = self.executor.run if self.parallel else self.executor.run_serial
+        try:
+            # Leased until every call is done: budget/idle eviction can't close an MCP mid-call
+            for mcp_name in needed_mcps:
+                mcp = self.mcp_manager.get_mcp(mcp_name, task, lease=True)
+                leased.append(mcp_name)
+                calls.append((mcp_name, lambda mcp=mcp: self.execute_real_mcp_task(mcp, task, strategy)))
+            outcomes = run(calls)
+        finally:
+            for mcp_name in leased:
+                self.mcp_manager.release(mcp_name)
+
+        mcp_results = {name: outcome["result"] for name, outcome in outcomes.items() if outcome["ok"]}
+        mcp_errors = {name: outcome["error"] for name, outcome in outcomes.items() if not outcome["ok"]}
+        return mcp_results, mcp_errors
 
-        # Orchestration → Claude Flow
-        elif any(word in task_lower for word in ['orchestrate', 'coordinate', 'agents']):
-            return 0.96, "orchestration", ["claude_flow"]
+    def analyze_task_complete(self, task):
+        """Complete analysis with ALL available MCPs (rules: v6_router.ROUTING_RULES["complete"])"""
+        if self.learned_router is not None:
+            return self.learned_router.predict(task)
+        return get_router().route_complete(task)
 
-        # General task → No MCPs needed
-        else:
-            return 0.88, "general", []
+    def classify_batch(self, tasks):
+        """analyze_task_complete for each task of a batch (same router, same decisions)"""
+        if self.learned_router is None:
+            return get_router().classify_batch(tasks)
+        return [self.analyze_task_complete(task) for task in tasks]
 
     def execute_real_mcp_task(self, mcp, task, strategy):
         """Execute specific real MCP task"""
@@ -425,22 +876,31 @@ class V6CompleteLazyMCP:
         elif mcp.name == "Flow Nexus Cloud (80+ tools)":
             return mcp.cloud_deploy(strategy)
         elif mcp.name == "AgentDB Vector Database":
-            return mcp.store_vector(task.split(), {"strategy": strategy})
+            similar = mcp.search_similar(task, k=3)
+            if not AGENTDB_WRITE_WORDS.intersection(task.lower().split()):
+                return {"similar": similar}
+            # Write requested: one vector per distinct task text (re-runs replace it)
+            vector_id = f"task_{hashlib.blake2b(task.encode(), digest_size=6).hexdigest()}"
+            stored = mcp.store_vector(task.split(), {"strategy": strategy, "task": task}, vector_id)
+            return {**stored, "similar": similar}
         elif mcp.name == "Coolify Deployment MCP":
             return mcp.deploy_application(strategy, f"{strategy}:latest")
         else:
             return mcp.execute(strategy)
 
     def display_complete_results(self, task, confidence, agents, exec_time, success,
-                                mcp_results, strategy):
+                                mcp_results, strategy, mcp_errors=None):
         """Display comprehensive results with ALL MCP details"""
+        mcp_errors = mcp_errors or {}
         print(f"\n🔥 REAL MCP EXECUTION RESULTS:")
         for mcp_name, result in mcp_results.items():
             print(f"   ✅ {mcp_name.upper()}: {result}")
+        for mcp_name, error in mcp_errors.items():
+            print(f"   ❌ {mcp_name.upper()}: {error}")
 
         print(f"\n⏱️  Total execution: {exec_time:.0f}ms | Success: {'✅' if success else '❌'}")
         print(f"🤖 Agents: {agents} | Strategy: {strategy}")
-        print(f"💾 Current memory: {len(self.mcp_manager.loaded_mcps) * 15}MB")
+        print(f"💾 Current memory: {self.mcp_manager.memory_usage_mb():.1f}MB (measured)")
         print(f"🔄 Active MCPs: {len(self.mcp_manager.get_active_mcps())}")
 
         # Complete MCP Statistics
@@ -464,11 +924,12 @@ class V6CompleteLazyMCP:
         print(f"   📊 Total MCP Ecosystem: 10+ REAL servers")
 
         self.log_complete_execution(task, confidence, exec_time, success,
-                                   len(mcp_results), strategy)
+                                   len(mcp_results), strategy, list(mcp_errors),
+                                   list(mcp_results) + list(mcp_errors))
 
-    def log_complete_execution(self, task, conf, time_ms, success, mcps_used, strategy):
-        """Enhanced logging with complete MCP info"""
-        os.makedirs(".claude/logs", exist_ok=True)
+    def log_complete_execution(self, task, conf, time_ms, success, mcps_used, strategy,
+                               mcp_errors=None, needed_mcps=None):
+        """Enhanced logging with complete MCP info (queued; written by the shared background logger)"""
         log = {
             "timestamp": datetime.now().isoformat(),
             "task": task,
@@ -476,15 +937,194 @@ class V6CompleteLazyMCP:
             "time_ms": time_ms,
             "success": success,
             "mcps_used": mcps_used,
+            "mcp_errors": mcp_errors or [],
+            "needed_mcps": needed_mcps or [],
             "strategy": strategy,
             "active_mcps": self.mcp_manager.get_active_mcps(),
             "mcp_ecosystem": "10+ real servers",
-            "total_memory_mb": len(self.mcp_manager.loaded_mcps) * 15
+            "total_memory_mb": round(self.mcp_manager.memory_usage_mb(), 3),
+            "mcp_evictions": self.mcp_manager.eviction_stats["evictions_idle"]
+                             + self.mcp_manager.eviction_stats["evictions_memory"],
+            "prewarm_latency_removed_ms": round(self.mcp_manager.prewarm_stats["latency_removed_ms"], 3),
+            "routing_cache_hits": get_router().cache_stats["hits"],
+            "routing_cache_misses": get_router().cache_stats["misses"]
         }
-        with open(".claude/logs/v6_complete_mcp.jsonl", "a") as f:
-            f.write(json.dumps(log) + "\n")
-
-if __name__ == "__main__":
+        get_logger(self.log_path).log(log)
+
+def benchmark_parallel_fanout(task="scale production app", runs=3):
+    """Wall time of the same task with the serial loop vs the parallel fan-out"""
+    import contextlib
+    import io
+
+    timings = {}
+    for label, parallel in (("serial", False), ("parallel", True)):
+        with contextlib.redirect_stdout(io.StringIO()):
+            v6 = V6CompleteLazyMCP(parallel=parallel)
+            _, strategy, needed_mcps = v6.analyze_task_complete(task)
+            v6.execute_mcps(needed_mcps, task, strategy)  # loads outside the timing
+            start = time.perf_counter()
+            for _ in range(runs):
+                v6.execute_mcps(needed_mcps, task, strategy)
+            timings[label] = (time.perf_counter() - start) * 1000 / runs
+            v6.close()
+    return {"task": task, "strategy": strategy, "mcps": needed_mcps, **timings,
+            "speedup": timings["serial"] / timings["parallel"]}
+
+def iter_batch_tasks(lines):
+    """Tasks from a line stream: plain text (one per line) or JSONL ({"task": ..., "id": ...})"""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                yield {"task": line}
+                continue
+            if item.get("task"):
+                yield item
+        else:
+            yield {"task": line}
+
+def run_batch(v6, lines, parallelism=4, out=None, close=True):
+    """
+    Run every task through one warm V6CompleteLazyMCP, `parallelism` at a time.
+    One JSONL result per task is streamed to `out` as soon as it finishes
+    (input is consumed lazily, so stdin can be an endless stream).
+    The engine is closed at the end (close=False to keep using it).
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    out = out or sys.stdout
+    summary = {"tasks": 0, "successes": 0, "errors": 0}
+
+    def run_one(index, item):
+        record = {"index": index, "id": item.get("id", index), "task": item["task"]}
+        try:
+            record.update(v6.execute(item["task"]))
+        except Exception as e:
+            record["error"] = f"{type(e).__name__}: {e}"
+        return record
+
+    def emit(futures):
+        for future in futures:
+            record = future.result()
+            summary["tasks"] += 1
+            summary["successes"] += bool(record.get("success"))
+            summary["errors"] += "error" in record
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="v6-batch") as pool:
+            pending = set()
+            for index, item in enumerate(iter_batch_tasks(lines)):
+                if len(pending) >= parallelism * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    emit(done)
+                pending.add(pool.submit(run_one, index, item))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                emit(done)
+    finally:
+        if close:
+            v6.close()
+
+    summary["wall_s"] = time.perf_counter() - start
+    summary["tasks_per_sec"] = summary["tasks"] / summary["wall_s"] if summary["wall_s"] else 0.0
+    return summary
+
+def test_manager_concurrency(callers=500, load_delay=0.05):
+    """
+    Stress: `callers` threads and then `callers` coroutines hit get_mcp on a
+    handful of cold MCPs at once. Each MCP must be constructed exactly once
+    and no activation count may be lost.
+    """
+    import contextlib
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+
+    names = ["tavily", "redis", "docling", "claude_flow", "coolify"]
+    constructed = {}
+    constructed_lock = threading.Lock()
+
+    class SlowLoadManager(CompleteLazyMCPManager):
+        def _load_real_mcp(self, mcp_name):
+            with constructed_lock:
+                constructed[mcp_name] = constructed.get(mcp_name, 0) + 1
+            time.sleep(load_delay)  # widen the check-then-insert window
+            return super()._load_real_mcp(mcp_name)
+
+    results = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        manager = SlowLoadManager(idle_timeout=None)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=200) as pool:
+            instances = list(pool.map(lambda i: manager.get_mcp(names[i % len(names)]), range(callers)))
+        results["threads_ms"] = (time.perf_counter() - start) * 1000
+        assert all(constructed[name] == 1 for name in names), constructed
+        assert sum(manager.mcp_stats[name] for name in names) == callers
+        assert all(instance is manager.loaded_mcps[names[i % len(names)]]
+                   for i, instance in enumerate(instances))
+        results["thread_waiters"] = manager.concurrency_stats["load_waiters"]
+
+        constructed.clear()
+        async_manager = AsyncCompleteLazyMCPManager(SlowLoadManager(idle_timeout=None))
+
+        async def hammer():
+            return await asyncio.gather(*(async_manager.get_mcp(names[i % len(names)])
+                                          for i in range(callers)))
+
+        start = time.perf_counter()
+        asyncio.run(hammer())
+        results["async_ms"] = (time.perf_counter() - start) * 1000
+        assert all(constructed[name] == 1 for name in names), constructed
+        assert sum(async_manager.mcp_stats[name] for name in names) == callers
+        results["async_waiters"] = async_manager.concurrency_stats["load_waiters"]
+
+    results.update({"callers": callers, "mcps": len(names)})
+    return results
+
+if __name__ == "__main__" and "--stress" in sys.argv:
+    print("🧪 V6 LAZY-MCP - CONCURRENT get_mcp STRESS TEST")
+    result = test_manager_concurrency()
+    print(f"   ✅ {result['callers']} threads → {result['mcps']} loads, "
+          f"{result['thread_waiters']} waited on an in-flight load ({result['threads_ms']:.0f}ms)")
+    print(f"   ✅ {result['callers']} coroutines → {result['mcps']} loads, "
+          f"{result['async_waiters']} awaited an in-flight load ({result['async_ms']:.0f}ms)")
+
+elif __name__ == "__main__" and "--batch" in sys.argv:
+    import argparse
+    import contextlib
+
+    parser = argparse.ArgumentParser(description="V6 Lazy-MCP batch mode (JSONL results on stdout)")
+    parser.add_argument("--batch", metavar="FILE", help="task file (one per line or JSONL); '-' = stdin")
+    parser.add_argument("--parallel", type=int, default=4, help="tasks in flight at once")
+    parser.add_argument("--quiet", action="store_true", help="drop per-task progress output")
+    args = parser.parse_args()
+
+    results_out = sys.stdout
+    progress = open(os.devnull, "w") if args.quiet else sys.stderr
+    source = sys.stdin if args.batch == "-" else open(args.batch)
+    # Progress prints go to stderr/devnull so stdout stays pure JSONL
+    with contextlib.redirect_stdout(progress):
+        v6 = V6CompleteLazyMCP()
+        summary = run_batch(v6, source, parallelism=args.parallel, out=results_out)
+
+    print(f"📊 Batch: {summary['tasks']} tasks in {summary['wall_s']:.2f}s "
+          f"({summary['tasks_per_sec']:.1f} tasks/s) | ✅ {summary['successes']} | "
+          f"❌ {summary['errors']} errors | parallel={args.parallel}", file=sys.stderr)
+
+elif __name__ == "__main__" and "--bench-fanout" in sys.argv:
+    print("📊 V6 LAZY-MCP - SERIAL LOOP vs PARALLEL FAN-OUT")
+    result = benchmark_parallel_fanout()
+    print(f"   🎯 Strategy: {result['strategy']} | MCPs: {result['mcps']}")
+    print(f"   🐢 Serial:   {result['serial']:.0f}ms")
+    print(f"   ⚡ Parallel: {result['parallel']:.0f}ms ({result['speedup']:.1f}x)")
+
+elif __name__ == "__main__":
     print("🚀 V6 ENTERPRISE LAZY-MCP COMPLETE INITIALIZING...")
     print("⚡ 10+ REAL MCPs | 105+ Claude Flow Tools | 80+ Flow Nexus Tools")
 
@@ -492,6 +1132,7 @@ if __name__ == "__main__":
 
     task = " ".join(sys.argv[1:]) or input("📡 V6 Complete Lazy-MCP Task > ")
     v6.execute(task)
+    v6.close()
 
     print(f"\n🎉 Complete Lazy-MCP execution finished!")
     print("🔥 ALL REAL MCPs tested successfully!")
\ No newline at end of file
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+🗃️ V6 LOG STORE - Compactação colunar dos logs de execução
+==========================================================
+Segmentos JSONL fechados → colunas .npy (1 diretório por segmento) | NumPy puro
+Consultas: count / percentile / group_by com filtros por tempo, strategy, success e texto
+Milhões de execuções respondidas em milissegundos, sem json.loads por linha
+"""
+
+import glob
+import gzip
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+from v6_log_stream import loads
+
+NUMERIC_COLUMNS = {"timestamp": "float64", "confidence": "float32", "time_ms": "float32"}
+SEGMENT_SUFFIXES = (".jsonl", ".jsonl.gz", ".jsonl.zst")
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+# Segmento comprimido cortado no meio (compressor ainda escrevendo ou morto): "ainda não fechado"
+TRUNCATED_ERRORS = (EOFError, gzip.BadGzipFile) + ((zstandard.ZstdError,) if HAS_ZSTD else ())
+
+
+def default_store_dir(log_path: str) -> str:
+    """<dir do log>/columnar/<nome do log>"""
+    name = os.path.basename(log_path).split(".")[0]
+    return os.path.join(os.path.dirname(os.path.abspath(log_path)), "columnar", name)
+
+
+def segment_source(path: str) -> str:
+    """Nome do segmento sem a extensão de compressão: o mesmo antes e depois do gzip/zstd"""
+    name = os.path.basename(path)
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name
+
+
+def closed_segments(log_path: str) -> List[str]:
+    """
+    Segmentos rotacionados pelo V6JSONLLogger: <nome>.<carimbo>.jsonl(.gz|.zst)
+    Um .jsonl com irmão .gz/.zst ainda está sendo comprimido (o .gz está incompleto):
+    nenhum dos dois entra até o logger remover o .jsonl
+    """
+    base = os.path.splitext(os.path.abspath(log_path))[0]
+    paths = {path for path in glob.glob(glob.escape(base) + ".*")
+             if path.endswith(SEGMENT_SUFFIXES) and path != os.path.abspath(log_path)}
+    compressing = {path for path in paths if not path.endswith(COMPRESSED_SUFFIXES)
+                   and any(path + suffix in paths for suffix in COMPRESSED_SUFFIXES)}
+    return sorted(path for path in paths
+                  if os.path.join(os.path.dirname(path), segment_source(path)) not in compressing)
+
+
+def open_segment(path: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        if not HAS_ZSTD:
+            raise ImportError(f"{path} requer zstandard (pip install zstandard)")
+        import io
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")), encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def parse_timestamp(value) -> float:
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return time.mktime(time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")) + (
+            float("0" + value[19:26]) if value[19:20] == "." else 0.0)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def build_columns(records: Iterable[Dict]) -> Tuple[Dict[str, "np.ndarray"], Dict]:
+    """
+    Registros → colunas. Texto da task vira um blob UTF-8 minúsculo + offsets e um
+    índice de tokens (CSR: token_indptr/token_ids sobre um vocabulário local)
+    """
+    numeric = {name: [] for name in NUMERIC_COLUMNS}
+    success, strategy_codes, strategies = [], [], {}
+    blob_parts, offsets = [], [0]
+    vocabulary, token_ids, token_indptr = {}, [], [0]
+    malformed = 0
+
+    for record in records:
+        if not isinstance(record, dict):
+            malformed += 1
+            continue
+        numeric["timestamp"].append(parse_timestamp(record.get("timestamp")))
+        for name in ("confidence", "time_ms"):
+            value = record.get(name)
+            numeric[name].append(float(value) if isinstance(value, (int, float)) else float("nan"))
+        success.append(bool(record.get("success")))
+        strategy = record.get("strategy")
+        strategy_codes.append(strategies.setdefault(strategy, len(strategies)) if strategy else -1)
+
+        task = str(record.get("task") or "").lower()
+        encoded = task.encode("utf-8")
+        blob_parts.append(encoded)
+        offsets.append(offsets[-1] + len(encoded) + 1)
+        token_ids.extend(vocabulary.setdefault(token, len(vocabulary)) for token in task.split())
+        token_indptr.append(len(token_ids))
+
+    columns = {name: np.asarray(values, dtype=NUMERIC_COLUMNS[name]) for name, values in numeric.items()}
+    columns["success"] = np.asarray(success, dtype=bool)
+    columns["strategy"] = np.asarray(strategy_codes, dtype=np.int16)
+    columns["task_blob"] = np.frombuffer(b"\n".join(blob_parts) + b"\n" if blob_parts else b"", dtype=np.uint8)
+    columns["task_offsets"] = np.asarray(offsets, dtype=np.int64)
+    columns["token_ids"] = np.asarray(token_ids, dtype=np.int32)
+    columns["token_indptr"] = np.asarray(token_indptr, dtype=np.int64)
+    meta = {"rows": len(success), "malformed": malformed,
+            "strategies": sorted(strategies, key=strategies.get),
+            "vocabulary": sorted(vocabulary, key=vocabulary.get)}
+    return columns, meta
+
+
+def iter_segment_records(path: str) -> Iterable:
+    with open_segment(path) as f:
+        for line in f:
+            try:
+                yield loads(line)
+            except ValueError:
+                yield None  # conta como malformada
+
+
+def compact_log(log_path: str, store_dir: Optional[str] = None, segments: Optional[List[str]] = None) -> "V6LogStore":
+    """
+    Compacta os segmentos fechados ainda não compactados (idempotente: o nome do
+    segmento fica no meta.json da parte). O arquivo ativo não entra: ele ainda cresce.
+    """
+    if not HAS_NUMPY:
+        raise ImportError("compact_log requer numpy (pip install numpy)")
+    store_dir = store_dir or default_store_dir(log_path)
+    store = V6LogStore(store_dir, load=False)
+    done = store.compacted_sources()
+
+    for segment in (closed_segments(log_path) if segments is None else segments):
+        source = segment_source(segment)
+        if source in done:
+            continue
+        try:
+            columns, meta = build_columns(iter_segment_records(segment))
+        except TRUNCATED_ERRORS:
+            continue  # comprimido pela metade: fica para a próxima compactação
+        part_dir = os.path.join(store_dir, f"part-{len(done) + 1:05d}")
+        tmp_dir = part_dir + ".tmp"
+        os.makedirs(tmp_dir, exist_ok=True)
+        for name, values in columns.items():
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), values)
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump({**meta, "source": source, "compacted_at": time.time()}, f)
+        os.replace(tmp_dir, part_dir)  # parte aparece inteira ou não aparece
+        done.add(source)
+
+    store.load()
+    return store
+
+
+class V6LogStore:
+    """
+    🗃️ Store colunar de um log de execuções (todas as partes concatenadas em memória)
+    Filtros aceitos por count/percentile/group_by:
+      strategy="...", success=True/False, since=epoch, until=epoch,
+      task_contains=["keyword", ...] (substring em task.lower(), qualquer uma casa)
+    """
+
+    GROUP_KEYS = ("strategy", "success", "day", "hour")
+
+    def __init__(self, store_dir: str, load: bool = True):
+        if not HAS_NUMPY:
+            raise ImportError("V6LogStore requer numpy (pip install numpy)")
+        self.store_dir = store_dir
+        self.rows = 0
+        self.strategies: List[str] = []
+        self.columns: Dict[str, "np.ndarray"] = {}
+        self._parts = []
+        if load:
+            self.load()
+
+    def part_dirs(self) -> List[str]:
+        if not os.path.isdir(self.store_dir):
+            return []
+        return sorted(os.path.join(self.store_dir, name) for name in os.listdir(self.store_dir)
+                      if name.startswith("part-") and not name.endswith(".tmp"))
+
+    def compacted_sources(self) -> set:
+        sources = set()
+        for part_dir in self.part_dirs():
+            with open(os.path.join(part_dir, "meta.json")) as f:
+                sources.add(segment_source(json.load(f)["source"]))
+        return sources
+
+    def load(self) -> "V6LogStore":
+        """Concatena as partes; códigos de strategy viram um dicionário global"""
+        strategies: Dict[str, int] = {}
+        columns = {name: [] for name in list(NUMERIC_COLUMNS) + ["success", "strategy"]}
+        self._parts = []
+        for part_dir in self.part_dirs():
+            with open(os.path.join(part_dir, "meta.json")) as f:
+                meta = json.load(f)
+            remap = np.array([strategies.setdefault(name, len(strategies)) for name in meta["strategies"]] + [-1],
+                             dtype=np.int16)
+            for name in columns:
+                values = np.load(os.path.join(part_dir, f"{name}.npy"))
+                columns[name].append(remap[values] if name == "strategy" else values)
+            self._parts.append({
+                "rows": meta["rows"], "vocabulary": meta["vocabulary"],
+                **{name: np.load(os.path.join(part_dir, f"{name}.npy"), mmap_mode="r")
+                   for name in ("task_blob", "task_offsets", "token_ids", "token_indptr")}})
+
+        self.strategies = sorted(strategies, key=strategies.get)
+        self.columns = {name: np.concatenate(values) if values else np.empty(0, dtype=NUMERIC_COLUMNS.get(name, bool))
+                        for name, values in columns.items()}
+        if not columns["strategy"]:
+            self.columns["strategy"] = np.empty(0, dtype=np.int16)
+        self.rows = len(self.columns["success"])
+        return self
+
+    # ------------------------------------------------------------- filtros
+    def task_contains(self, keywords: Sequence[str]) -> "np.ndarray":
+        """Máscara: task.lower() contém alguma das keywords (mesmo `in` do código original)"""
+        masks = []
+        keywords = [kw.lower() for kw in keywords]
+        if "" in keywords:
+            return np.ones(self.rows, dtype=bool)
+        for part in self._parts:
+            hit = np.zeros(part["rows"], dtype=bool)
+            single = [kw for kw in keywords if kw and not any(ch.isspace() for ch in kw)]
+            if single and part["rows"]:
+                # Keyword sem espaço casa dentro de um token: resolve no vocabulário da parte
+                matching = np.array([i for i, token in enumerate(part["vocabulary"])
+                                     if any(kw in token for kw in single)], dtype=np.int32)
+                if matching.size:
+                    token_hit = np.isin(part["token_ids"], matching)
+                    indptr = part["token_indptr"]
+                    rows = np.flatnonzero(np.diff(indptr))
+                    hit[rows] = np.logical_or.reduceat(token_hit, indptr[rows])
+            # Keywords com espaço: comparação deslizante vetorizada sobre o blob inteiro
+            blob = part["task_blob"]
+            for kw in keywords:
+                if kw in single:
+                    continue
+                needle = np.frombuffer(kw.encode("utf-8"), dtype=np.uint8)
+                span = blob.size - needle.size + 1
+                if span <= 0:
+                    continue
+                found = blob[:span] == needle[0]
+                for j in range(1, needle.size):
+                    found &= blob[j:j + span] == needle[j]
+                positions = np.flatnonzero(found)
+                hit[np.searchsorted(part["task_offsets"], positions, side="right") - 1] = True
+            masks.append(hit)
+        return np.concatenate(masks) if masks else np.zeros(0, dtype=bool)
+
+    def _mask(self, strategy: Optional[str] = None, success: Optional[bool] = None,
+              since: Optional[float] = None, until: Optional[float] = None,
+              task_contains: Optional[Sequence[str]] = None) -> "np.ndarray":
+        mask = np.ones(self.rows, dtype=bool)
+        if strategy is not None:
+            code = self.strategies.index(strategy) if strategy in self.strategies else -2
+            mask &= self.columns["strategy"] == code
+        if success is not None:
+            mask &= self.columns["success"] == bool(success)
+        if since is not None:
+            mask &= self.columns["timestamp"] >= since
+        if until is not None:
+            mask &= self.columns["timestamp"] < until
+        if task_contains:
+            mask &= self.task_contains(task_contains)
+        return mask
+
+    # ------------------------------------------------------------- consultas
+    def count(self, **filters) -> int:
+        return int(np.count_nonzero(self._mask(**filters))) if filters else self.rows
+
+    def percentile(self, column: str, q=(50, 95, 99), **filters) -> Dict[float, float]:
+        values = self.columns[column][self._mask(**filters)]
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return {p: float("nan") for p in q}
+        return dict(zip(q, np.percentile(values, q).tolist()))
+
+    def _group_codes(self, key: str):
+        if key == "strategy":
+            return self.columns["strategy"].astype(np.int64) + 1, ["<none>"] + self.strategies
+        if key == "success":
+            return self.columns["success"].astype(np.int64), [False, True]
+        if key in ("day", "hour"):
+            width = 86400 if key == "day" else 3600
+            buckets = np.floor(np.nan_to_num(self.columns["timestamp"]) / width).astype(np.int64)
+            labels, codes = np.unique(buckets, return_inverse=True)
+            fmt = "%Y-%m-%d" if key == "day" else "%Y-%m-%d %H:00"
+            return codes, [time.strftime(fmt, time.localtime(b * width)) for b in labels.tolist()]
+        raise ValueError(f"group_by: chave {key!r} inválida (use {self.GROUP_KEYS})")
+
+    def group_by(self, key: str = "strategy", value: Optional[str] = None, agg: str = "count",
+                 **filters) -> Dict:
+        """
+        {grupo: agregado} com agg em count | sum | mean | success_rate | pNN (ex.: p95)
+        value é a coluna agregada (time_ms, confidence) para sum/mean/pNN
+        """
+        codes, labels = self._group_codes(key)
+        mask = self._mask(**filters)
+        codes = codes[mask]
+        counts = np.bincount(codes, minlength=len(labels))
+        if agg == "count":
+            result = counts
+        elif agg == "success_rate":
+            hits = np.bincount(codes, weights=self.columns["success"][mask], minlength=len(labels))
+            result = np.divide(hits, counts, out=np.zeros(len(labels)), where=counts > 0)
+        elif agg in ("sum", "mean"):
+            values = np.nan_to_num(self.columns[value][mask].astype(np.float64))
+            sums = np.bincount(codes, weights=values, minlength=len(labels))
+            result = sums if agg == "sum" else np.divide(sums, counts, out=np.zeros(len(labels)), where=counts > 0)
+        elif agg.startswith("p"):
+            values = self.columns[value][mask]
+            order = np.argsort(codes, kind="stable")
+            bounds = np.concatenate(([0], np.cumsum(counts)))
+            result = np.full(len(labels), np.nan)
+            for group in np.flatnonzero(counts):
+                result[group] = np.nanpercentile(values[order[bounds[group]:bounds[group + 1]]], float(agg[1:]))
+        else:
+            raise ValueError(f"group_by: agg {agg!r} inválido")
+        return {labels[i]: result[i].item() for i in np.flatnonzero(counts)}
+
+
+def benchmark_log_store(records: int = 1_000_000) -> Dict:
+    """Consultas no store colunar vs readlines + json.loads do segmento JSONL"""
+    import random
+    import tempfile
+    from datetime import datetime, timedelta
+
+    rng = random.Random(5)
+    strategies = ["research_error", "infrastructure", "creative", "document_processing",
+                  "data_management", "vector_search", "orchestration", "general"]
+    words = ["fix", "vector", "search", "deploy", "server", "error", "522", "cache", "image",
+             "embedding", "report", "agents", "find similar docs", "pdf", "the", "release"]
+    start_day = datetime(2026, 1, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "v6_executions.jsonl")
+        segment = os.path.join(tmp, "v6_executions.20260101-000000.jsonl")
+        with open(segment, "w") as f:
+            for i in range(records):
+                f.write(json.dumps({
+                    "timestamp": (start_day + timedelta(seconds=i * 7)).isoformat(),
+                    "task": " ".join(rng.choices(words, k=rng.randint(2, 6))),
+                    "confidence": round(rng.uniform(0.85, 0.99), 2), "time_ms": rng.expovariate(1 / 40),
+                    "success": rng.random() < 0.93, "strategy": rng.choice(strategies)}) + "\n")
+
+        started = time.perf_counter()
+        store = compact_log(log_path)
+        compact_s = time.perf_counter() - started
+
+        vector_keywords = ["vector", "embedding", "search", "similarity", "find similar"]
+        started = time.perf_counter()
+        with open(segment) as f:
+            logs = f.readlines()
+        scanned = sum(1 for line in logs
+                      if any(kw in json.loads(line).get("task", "").lower() for kw in vector_keywords))
+        scan_ms = (time.perf_counter() - started) * 1000
+        del logs
+
+        queries = {
+            "count(task_contains=vector)": lambda: store.count(task_contains=vector_keywords),
+            "count(strategy, success)": lambda: store.count(strategy="vector_search", success=True),
+            "percentile(time_ms)": lambda: store.percentile("time_ms"),
+            "group_by(strategy, count)": lambda: store.group_by("strategy"),
+            "group_by(strategy, p95 time_ms)": lambda: store.group_by("strategy", "time_ms", "p95"),
+            "group_by(day, success_rate)": lambda: store.group_by("day", agg="success_rate"),
+        }
+        timings = {}
+        for name, query in queries.items():
+            query()  # primeira chamada paga o mmap
+            started = time.perf_counter()
+            query()
+            timings[name] = (time.perf_counter() - started) * 1000
+
+        return {"records": records, "compact_s": compact_s, "scan_ms": scan_ms,
+                "scan_count": scanned, "store_count": store.count(task_contains=vector_keywords),
+                "queries_ms": timings}
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and not sys.argv[1].startswith("--"):
+        store = compact_log(sys.argv[1])
+        print(f"🗃️ {store.rows:,} execuções compactadas em {store.store_dir}")
+        print(f"   por strategy: {store.group_by('strategy')}")
+        print(f"   time_ms p50/p95/p99: {store.percentile('time_ms')}")
+        sys.exit(0)
+
+    records = int(sys.argv[sys.argv.index("--records") + 1]) if "--records" in sys.argv else 1_000_000
+    print(f"🗃️ V6 LOG STORE - BENCHMARK ({records:,} execuções)")
+    result = benchmark_log_store(records)
+    print(f"\n📦 Compactação: {result['compact_s']:.1f}s (uma vez por segmento fechado)")
+    print(f"🐢 readlines + json.loads (keywords vector): {result['scan_ms']:.0f}ms → {result['scan_count']:,}")
+    for name, ms in result["queries_ms"].items():
+        print(f"⚡ {name:<34} {ms:>8.2f}ms")
+    print(f"✅ Mesma contagem: {result['scan_count'] == result['store_count']}")
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+🌊 V6 LOG STREAM - Leitura em streaming dos logs JSONL de execução
+==================================================================
+Gerador linha a linha (orjson quando disponível) | Linhas malformadas puladas e contadas
+Agregados em memória constante: histograma de latência, sucesso por strategy, uso de MCPs
+follow=True acompanha o arquivo vivo (tail -F), inclusive através de rotações
+"""
+
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+try:
+    import orjson
+    HAS_ORJSON = True
+    loads = orjson.loads
+except ImportError:
+    import json
+    HAS_ORJSON = False
+    loads = json.loads
+
+
+def iter_lines(path: str, follow: bool = False, from_end: bool = False,
+               poll_interval: float = 0.25, stop=None) -> Iterator[bytes]:
+    """
+    Linhas completas (bytes) de path. Com follow=True espera por novas linhas e reabre
+    o arquivo quando ele é rotacionado/truncado; uma linha só sai depois do seu '\\n'
+    (registro pela metade, ainda sendo escrito, fica no buffer). stop: threading.Event.
+    """
+    handle, inode, partial, draining = None, None, b"", False
+    while True:
+        if handle is None:
+            try:
+                handle = open(path, "rb")
+            except FileNotFoundError:
+                if not follow or (stop is not None and stop.is_set()):
+                    return
+                time.sleep(poll_interval)
+                continue
+            inode = os.fstat(handle.fileno()).st_ino
+            if from_end:
+                handle.seek(0, os.SEEK_END)
+                from_end = False
+
+        for chunk in iter(lambda: handle.readline(), b""):
+            if chunk.endswith(b"\n"):
+                yield partial + chunk
+                partial = b""
+            else:
+                partial += chunk
+
+        if not follow:
+            if partial:
+                yield partial  # última linha sem '\n' num arquivo fechado
+            handle.close()
+            return
+        if stop is not None and stop.is_set():
+            handle.close()
+            return
+
+        if draining:
+            handle.close()
+            handle, partial, draining = None, b"", False
+            continue
+
+        # EOF no modo follow: rotacionado (outro inode) ou truncado → uma última leitura
+        # do handle antigo (o que chegou antes do rename) e reabre do início
+        try:
+            current = os.stat(path)
+            draining = current.st_ino != inode or current.st_size < handle.tell()
+        except FileNotFoundError:
+            draining = False
+        if not draining:
+            time.sleep(poll_interval)
+
+
+def parse_records(lines: Iterable, stats: Optional[Dict] = None) -> Iterator[Dict]:
+    """Etapa de parsing do pipeline: linhas (str/bytes) → dicts; malformadas contadas em stats"""
+    if stats is None:
+        stats = {}
+    stats.setdefault("records", 0)
+    stats.setdefault("malformed", 0)
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError:
+            stats["malformed"] += 1
+            continue
+        if not isinstance(record, dict):
+            stats["malformed"] += 1
+            continue
+        stats["records"] += 1
+        yield record
+
+
+def iter_records(path: str, stats: Optional[Dict] = None, **options) -> Iterator[Dict]:
+    """Registros JSON (dicts) de path; options vão para iter_lines (follow, from_end, ...)"""
+    return parse_records(iter_lines(path, **options), stats)
+
+
+def iter_history(log_path: str, stats: Optional[Dict] = None) -> Iterator[Dict]:
+    """Segmentos fechados (mais antigos primeiro, .gz/.zst inclusive) e depois o arquivo ativo"""
+    from v6_log_store import closed_segments, open_segment
+
+    if stats is None:
+        stats = {}
+    for segment in closed_segments(log_path):
+        with open_segment(segment) as f:
+            yield from parse_records(f, stats)
+    yield from parse_records(iter_lines(log_path), stats)
+
+
+def record_mcps(record: Dict) -> List[str]:
+    """
+    Nomes dos MCPs de uma execução. Nos logs reais mcps_used é a contagem (int), então
+    os nomes vêm de needed_mcps (complete) ou active_mcps (lazy); mcps_used só se for lista
+    """
+    for key in ("mcps_used", "needed_mcps", "active_mcps"):
+        mcps = record.get(key)
+        if isinstance(mcps, list):
+            return [mcp for mcp in mcps if isinstance(mcp, str)]
+    return []
+
+
+class LatencyHistogram:
+    """
+    Histograma log-bucketed de latência (ms): buckets de largura 2^(1/8) entre 1µs e
+    ~2.8h, erro relativo < 9% nos percentis; memória fixa, independe do nº de amostras
+    """
+
+    BUCKETS_PER_OCTAVE = 8
+    MIN_MS = 0.001
+    SIZE = 8 * 34
+
+    def __init__(self):
+        self.counts = [0] * (self.SIZE + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, value_ms: float):
+        if value_ms is None or value_ms != value_ms or value_ms < 0:
+            return
+        self.count += 1
+        self.total += value_ms
+        self.min = min(self.min, value_ms)
+        self.max = max(self.max, value_ms)
+        if value_ms <= self.MIN_MS:
+            bucket = 0
+        else:
+            bucket = min(self.SIZE, int(math.log2(value_ms / self.MIN_MS) * self.BUCKETS_PER_OCTAVE) + 1)
+        self.counts[bucket] += 1
+
+    def merge(self, other: "LatencyHistogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return float("nan")
+        target = q / 100 * self.count
+        seen = 0
+        for bucket, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                if bucket == 0:
+                    return self.MIN_MS
+                # Meio geométrico do bucket, limitado ao que foi de fato observado
+                upper = self.MIN_MS * 2 ** (bucket / self.BUCKETS_PER_OCTAVE)
+                estimate = upper * 2 ** (-0.5 / self.BUCKETS_PER_OCTAVE)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        return {"count": self.count, "mean": self.total / self.count if self.count else float("nan"),
+                "min": self.min if self.count else float("nan"), "max": self.max,
+                "p50": self.percentile(50), "p95": self.percentile(95), "p99": self.percentile(99)}
+
+
+class ExecutionAggregator:
+    """
+    Agregados correntes de um stream de execuções, em memória constante
+    (proporcional ao nº de strategies/MCPs/keyword groups, nunca ao nº de registros)
+    keywords: {"nome": ["kw", ...]} conta tasks cujo texto contém alguma kw
+    """
+
+    def __init__(self, keywords: Optional[Dict[str, Sequence[str]]] = None):
+        self.keywords = {name: [kw.lower() for kw in words] for name, words in (keywords or {}).items()}
+        self.total = 0
+        self.successes = 0
+        self.confidence_total = 0.0
+        self.latency = LatencyHistogram()
+        self.by_strategy = defaultdict(lambda: {"count": 0, "successes": 0, "latency": LatencyHistogram()})
+        self.mcp_usage = Counter()
+        self.mcp_errors = Counter()
+        self.keyword_hits = Counter()
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    def update(self, record: Dict):
+        self.total += 1
+        success = bool(record.get("success"))
+        self.successes += success
+        confidence = record.get("confidence")
+        if isinstance(confidence, (int, float)):
+            self.confidence_total += confidence
+        time_ms = record.get("time_ms")
+        if isinstance(time_ms, (int, float)):
+            self.latency.add(time_ms)
+
+        strategy = record.get("strategy") or "<none>"
+        entry = self.by_strategy[strategy]
+        entry["count"] += 1
+        entry["successes"] += success
+        if isinstance(time_ms, (int, float)):
+            entry["latency"].add(time_ms)
+
+        self.mcp_usage.update(record_mcps(record))
+        errors = record.get("mcp_errors") or []
+        self.mcp_errors.update(errors if isinstance(errors, (list, dict)) else [])
+
+        if self.keywords:
+            task = str(record.get("task") or "").lower()
+            for name, words in self.keywords.items():
+                if any(kw in task for kw in words):
+                    self.keyword_hits[name] += 1
+
+        timestamp = record.get("timestamp")
+        if timestamp:
+            self.first_timestamp = self.first_timestamp or timestamp
+            self.last_timestamp = timestamp
+
+    def consume(self, records: Iterable[Dict]) -> "ExecutionAggregator":
+        for record in records:
+            self.update(record)
+        return self
+
+    def summary(self) -> Dict:
+        return {
+            "total": self.total,
+            "success_rate": self.successes / self.total if self.total else 0.0,
+            "avg_confidence": self.confidence_total / self.total if self.total else 0.0,
+            "latency_ms": self.latency.summary(),
+            "strategies": {
+                strategy: {"count": entry["count"],
+                           "success_rate": entry["successes"] / entry["count"],
+                           "p50_ms": entry["latency"].percentile(50),
+                           "p95_ms": entry["latency"].percentile(95)}
+                for strategy, entry in sorted(self.by_strategy.items(), key=lambda item: -item[1]["count"])},
+            "mcp_usage": dict(self.mcp_usage.most_common()),
+            "mcp_errors": dict(self.mcp_errors.most_common()),
+            "keyword_hits": dict(self.keyword_hits),
+            "first_timestamp": self.first_timestamp,
+            "last_timestamp": self.last_timestamp,
+        }
+
+
+def aggregate_logs(paths: Sequence[str], keywords: Optional[Dict[str, Sequence[str]]] = None,
+                   history: bool = True) -> Dict:
+    """Agrega um ou mais logs (com os segmentos fechados, se history) num só resumo"""
+    aggregator = ExecutionAggregator(keywords)
+    stats = {}
+    for path in paths:
+        aggregator.consume(iter_history(path, stats) if history else iter_records(path, stats))
+    return {**aggregator.summary(), "malformed": stats.get("malformed", 0)}
+
+
+def benchmark_stream(records: int = 200_000) -> Dict:
+    """readlines + json.loads vs streaming (orjson) + agregados, no mesmo arquivo"""
+    import json as stdlib_json
+    import random
+    import tempfile
+    import tracemalloc
+
+    rng = random.Random(9)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "v6_complete_mcp.jsonl")
+        with open(path, "w") as f:
+            for i in range(records):
+                f.write(stdlib_json.dumps({
+                    "timestamp": f"2026-10-17T10:{i // 60 % 60:02d}:{i % 60:02d}", "task": "research error 522",
+                    "time_ms": rng.expovariate(1 / 40), "success": rng.random() < 0.95,
+                    "strategy": rng.choice(["research_error", "infrastructure", "general"]),
+                    # Formato do log_complete_execution: mcps_used é int, os nomes em needed_mcps
+                    "mcps_used": 2, "needed_mcps": rng.sample(["tavily", "redis", "hetzner", "docling"], 2),
+                    "active_mcps": ["tavily", "redis"]}) + "\n")
+                if i % 5000 == 0:
+                    f.write("{malformed\n")
+
+        def readlines_pass():
+            with open(path) as f:
+                logs = f.readlines()
+            aggregator = ExecutionAggregator()
+            for line in logs:
+                try:
+                    aggregator.update(stdlib_json.loads(line))
+                except ValueError:
+                    continue
+            return aggregator
+
+        def stream_pass():
+            return ExecutionAggregator().consume(iter_records(path, stats))
+
+        results = {}
+        for name, run in (("readlines", readlines_pass), ("stream", stream_pass)):
+            stats = {}
+            start = time.perf_counter()
+            results[name] = run()
+            elapsed = time.perf_counter() - start
+            # Pico de memória medido numa segunda passada (tracemalloc distorce o tempo)
+            stats = {}
+            tracemalloc.start()
+            run()
+            results[name + "_s"], results[name + "_peak"] = elapsed, tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+    return {"records": records, "orjson": HAS_ORJSON,
+            "readlines_s": results["readlines_s"], "stream_s": results["stream_s"],
+            "readlines_peak_mb": results["readlines_peak"] / 1e6, "stream_peak_mb": results["stream_peak"] / 1e6,
+            "malformed": stats["malformed"], "mcps_counted": sum(results["stream"].mcp_usage.values()),
+            "same_total": results["stream"].summary() == results["readlines"].summary()}
+
+
+def check_record_shapes() -> Dict:
+    """Uso de MCPs nos formatos reais dos logs (complete, lazy e o legado com lista em mcps_used)"""
+    records = [
+        {"task": "research error", "success": True, "time_ms": 80.0, "strategy": "research_error",
+         "mcps_used": 2, "needed_mcps": ["tavily", "redis"], "active_mcps": ["tavily", "redis", "docling"]},
+        {"task": "deploy server", "success": True, "time_ms": 75.0, "strategy": "infrastructure",
+         "mcps_used": 1, "active_mcps": ["hetzner"]},
+        {"task": "legacy", "success": False, "strategy": "general", "mcps_used": ["claude_flow"]},
+    ]
+    usage = ExecutionAggregator().consume(records).summary()["mcp_usage"]
+    expected = {"tavily": 1, "redis": 1, "hetzner": 1, "claude_flow": 1}
+    return {"mcp_usage": usage, "ok": usage == expected}
+
+
+if __name__ == "__main__":
+    import json as stdlib_json
+    import sys
+
+    if "--bench" in sys.argv:
+        result = benchmark_stream()
+        print(f"🌊 V6 LOG STREAM - BENCHMARK ({result['records']:,} registros, orjson: {result['orjson']})")
+        print(f"   🐢 readlines + json.loads: {result['readlines_s']:.2f}s | pico {result['readlines_peak_mb']:.1f}MB")
+        print(f"   ⚡ streaming:              {result['stream_s']:.2f}s | pico {result['stream_peak_mb']:.1f}MB")
+        print(f"   ⚠️  malformadas puladas: {result['malformed']} | mesmos totais: {result['same_total']}")
+        print(f"   🔌 MCPs contados: {result['mcps_counted']:,}")
+        sys.exit(0)
+
+    if "--check" in sys.argv:
+        result = check_record_shapes()
+        print(f"🔌 mcp_usage nos formatos reais: {result['mcp_usage']} | {'✅' if result['ok'] else '❌'}")
+        sys.exit(0 if result["ok"] else 1)
+
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("--")] or [".claude/logs/v6_complete_mcp.jsonl"]
+    if "--follow" in sys.argv:
+        # tail -F com resumo a cada 5s (Ctrl+C para sair)
+        aggregator, last = ExecutionAggregator(), time.time()
+        try:
+            for record in iter_records(paths[0], follow=True):
+                aggregator.update(record)
+                if time.time() - last >= 5:
+                    summary = aggregator.summary()
+                    print(f"🌊 {summary['total']} execuções | sucesso {summary['success_rate']:.1%} | "
+                          f"p95 {summary['latency_ms']['p95']:.1f}ms | MCPs {summary['mcp_usage']}")
+                    last = time.time()
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    print(stdlib_json.dumps(aggregate_logs(paths), indent=2, default=str))
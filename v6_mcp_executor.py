@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+⚡ V6 MCP EXECUTOR - Fan-out paralelo das chamadas MCP
+======================================================
+Thread pool limitado | Limite de concorrência por backend | Resultado e erro por MCP
+Uma estratégia com N MCPs paga o mais lento, não a soma
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+from v6_metrics import MCP_CALL_MS, MCP_CALLS
+
+
+class V6MCPFanOutExecutor:
+    """
+    ⚡ Executa chamadas MCP independentes ao mesmo tempo
+    As APIs dos MCPs são bloqueantes (HTTP/sleep), então um pool de threads
+    limitado basta; cada backend tem seu semáforo para não receber mais que
+    per_backend_limit chamadas simultâneas (vale entre tasks concorrentes também).
+    """
+
+    def __init__(self, max_workers: int = 8, per_backend_limit: int = 2):
+        self.max_workers = max_workers
+        self.per_backend_limit = per_backend_limit
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="v6-mcp")
+        self._limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._limits_lock = threading.Lock()
+        self.stats = {"fanouts": 0, "calls": 0, "errors": 0}
+
+    def _limit(self, backend: str) -> threading.BoundedSemaphore:
+        with self._limits_lock:
+            semaphore = self._limits.get(backend)
+            if semaphore is None:
+                semaphore = self._limits[backend] = threading.BoundedSemaphore(self.per_backend_limit)
+            return semaphore
+
+    def _call(self, backend: str, fn: Callable[[], Any]) -> Dict[str, Any]:
+        start = time.perf_counter()
+        with self._limit(backend):
+            try:
+                result = fn()
+                outcome = {"ok": True, "result": result, "error": None}
+            except Exception as e:
+                outcome = {"ok": False, "result": None, "error": f"{type(e).__name__}: {e}"}
+        outcome["ms"] = (time.perf_counter() - start) * 1000
+        MCP_CALL_MS.labels(backend).observe(outcome["ms"])
+        MCP_CALLS.labels(backend, "ok" if outcome["ok"] else "error").inc()
+        return outcome
+
+    def run(self, calls: List[Tuple[str, Callable[[], Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        calls: [(mcp_name, fn)] → {mcp_name: {"ok", "result", "error", "ms"}}
+        Um erro num MCP não derruba os outros; a ordem de calls é preservada.
+        """
+        self.stats["fanouts"] += 1
+        self.stats["calls"] += len(calls)
+        if len(calls) == 1:
+            # Sem ganho em trocar de thread para uma chamada só
+            name, fn = calls[0]
+            outcomes = {name: self._call(name, fn)}
+        else:
+            futures = [(name, self._pool.submit(self._call, name, fn)) for name, fn in calls]
+            outcomes = {name: future.result() for name, future in futures}
+        self.stats["errors"] += sum(1 for outcome in outcomes.values() if not outcome["ok"])
+        return outcomes
+
+    def run_serial(self, calls: List[Tuple[str, Callable[[], Any]]]) -> Dict[str, Dict[str, Any]]:
+        """Mesmo contrato de run(), um MCP depois do outro (baseline)"""
+        self.stats["fanouts"] += 1
+        self.stats["calls"] += len(calls)
+        outcomes = {name: self._call(name, fn) for name, fn in calls}
+        self.stats["errors"] += sum(1 for outcome in outcomes.values() if not outcome["ok"])
+        return outcomes
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+🔮 V6 MCP PREWARM - Predictive Background Loading of Lazy MCPs
+==============================================================
+Strategy → next-task MCP transitions learned from v6_complete_mcp.jsonl
+Predicted MCPs load while the process is idle, off the task's critical path
+Counts persisted to .swarm/ with the log offset: startup replays only the new tail
+"""
+
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from v6_log_stream import iter_records, parse_records
+
+DEFAULT_LOG_PATH = ".claude/logs/v6_complete_mcp.jsonl"
+DEFAULT_STATE_PATH = ".swarm/v6_mcp_transitions.json"
+SESSION_START = "<session>"
+MAX_REPLAY_BYTES = 8 * 1024 * 1024  # without saved state, only the log's tail is replayed
+
+
+def iter_log_records(path: str) -> Iterable[Dict]:
+    """Records of a JSONL execution log, streamed line by line, malformed lines skipped"""
+    return iter_records(path)
+
+
+def task_mcps(record: Dict, previous_active: List[str]) -> List[str]:
+    """MCPs a logged task needed: explicit needed_mcps, else the ones newly active after it"""
+    if isinstance(record.get("needed_mcps"), list):
+        return list(record["needed_mcps"])
+    active = record.get("active_mcps") or []
+    return [name for name in active if name not in previous_active]
+
+
+class MCPTransitionPredictor:
+    """
+    🔮 First-order model: P(next task needs MCP m | current strategy)
+    Sessions are split where active_mcps stops growing (a new process starts empty).
+    """
+
+    def __init__(self):
+        self.transitions = defaultdict(lambda: defaultdict(int))  # strategy -> mcp -> count
+        self.totals = defaultdict(int)                            # strategy -> transitions seen
+        self.records = 0
+        self._previous = (None, [])  # (strategy, active_mcps) of the last record fitted
+
+    def observe(self, previous_strategy: Optional[str], needed_mcps: List[str]):
+        state = previous_strategy or SESSION_START
+        self.totals[state] += 1
+        for name in set(needed_mcps):
+            self.transitions[state][name] += 1
+
+    def fit_records(self, records: Iterable[Dict]) -> "MCPTransitionPredictor":
+        """Fit more records, continuing the sequence of the previous call"""
+        previous_strategy, previous_active = self._previous
+        for record in records:
+            active = record.get("active_mcps") or []
+            if not set(previous_active) <= set(active):
+                previous_strategy, previous_active = None, []  # new session
+            self.observe(previous_strategy, task_mcps(record, previous_active))
+            previous_strategy, previous_active = record.get("strategy"), active
+            self.records += 1
+        self._previous = (previous_strategy, previous_active)
+        return self
+
+    @classmethod
+    def from_log(cls, path: str = DEFAULT_LOG_PATH, state_path: Optional[str] = DEFAULT_STATE_PATH,
+                 max_replay_bytes: int = MAX_REPLAY_BYTES) -> "MCPTransitionPredictor":
+        """
+        Counts saved at state_path plus the log lines written since: from the saved offset
+        (same inode, not truncated) or from the start of a rotated/truncated log. Without
+        saved counts, a fresh fit of the last max_replay_bytes of the log. The result is
+        saved back, so each startup reads only the new tail.
+        """
+        predictor, offset = cls(), None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return predictor
+        state = cls._read_state(state_path) or {}
+        if state and state.get("log") == os.path.abspath(path):
+            predictor._load_state(state)
+            same_file = state.get("inode") == stat.st_ino and state.get("offset", 0) <= stat.st_size
+            offset = state["offset"] if same_file else 0
+        new_offset = predictor._fit_log_tail(path, offset, max_replay_bytes)
+        if state_path and (new_offset != offset or state.get("inode") != stat.st_ino):
+            predictor.save(state_path, path, stat.st_ino, new_offset)  # only when the log moved on
+        return predictor
+
+    def _fit_log_tail(self, path: str, offset: Optional[int], max_replay_bytes: int) -> int:
+        """Fit complete lines from offset (None: the last max_replay_bytes); returns the new offset"""
+        with open(path, "rb") as f:
+            if offset is None:
+                offset = max(0, os.fstat(f.fileno()).st_size - max_replay_bytes)
+                f.seek(offset)
+                if offset:
+                    offset += len(f.readline())  # skip the partial first line
+            else:
+                f.seek(offset)
+            lines = []
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written: picked up next time
+                lines.append(line)
+                offset += len(line)
+                if len(lines) >= 4096:
+                    self.fit_records(parse_records(lines))
+                    lines = []
+            self.fit_records(parse_records(lines))
+        return offset
+
+    @staticmethod
+    def _read_state(state_path: Optional[str]) -> Optional[Dict]:
+        if not state_path or not os.path.exists(state_path):
+            return None
+        try:
+            with open(state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_state(self, state: Dict):
+        for name, counts in state["transitions"].items():
+            self.transitions[name].update(counts)
+        self.totals.update(state["totals"])
+        self.records = state["records"]
+        self._previous = tuple(state["previous"])
+
+    def save(self, state_path: str, log_path: str, inode: int, offset: int):
+        """Atomic write (other processes may be loading it)"""
+        state = {"log": os.path.abspath(log_path), "inode": inode, "offset": offset,
+                 "records": self.records, "previous": list(self._previous),
+                 "totals": dict(self.totals),
+                 "transitions": {name: dict(counts) for name, counts in self.transitions.items()}}
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+        tmp = f"{state_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp, state_path)
+        except OSError as e:
+            print(f"⚠️  Could not save MCP transitions to {state_path}: {e}")
+
+    def predict(self, strategy: Optional[str], threshold: float = 0.3, limit: int = 2) -> List[tuple]:
+        """[(mcp, probability)] for the next task, most likely first"""
+        state = strategy or SESSION_START
+        total = self.totals.get(state, 0)
+        if not total:
+            return []
+        ranked = sorted(((count / total, name) for name, count in self.transitions[state].items()),
+                        reverse=True)
+        return [(name, p) for p, name in ranked if p >= threshold][:limit]
+
+
+class MCPPrewarmer:
+    """
+    🔮 Loads predicted MCPs on a background thread once no task is running
+    (idle_delay after the last one finishes); a newer prediction replaces a pending one.
+    Each caller passes its own previous strategy (one per thread/session), so
+    interleaved tasks from batch or daemon threads don't mix their transitions.
+    """
+
+    def __init__(self, manager, predictor: MCPTransitionPredictor, threshold: float = 0.3,
+                 limit: int = 2, idle_delay: float = 0.05):
+        self.manager = manager
+        self.predictor = predictor
+        self.threshold = threshold
+        self.limit = limit
+        self.idle_delay = idle_delay
+        self._in_flight = 0
+        self._pending = None
+        self._cond = threading.Condition()
+        self.errors = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="v6-mcp-prewarm", daemon=True)
+        self._thread.start()
+
+    def task_started(self):
+        with self._cond:
+            self._in_flight += 1
+
+    def task_finished(self, strategy: Optional[str], needed_mcps: List[str],
+                      previous_strategy: Optional[str] = None):
+        """Learn the transition previous_strategy → needed_mcps online, then prewarm for the next task"""
+        with self._cond:
+            self._in_flight -= 1
+            self.predictor.observe(previous_strategy, needed_mcps)
+            self._pending = [name for name, _ in
+                             self.predictor.predict(strategy, self.threshold, self.limit)]
+            self._cond.notify()
+
+    def prime(self):
+        """Prewarm for the first task of a session"""
+        with self._cond:
+            self._pending = [name for name, _ in
+                             self.predictor.predict(None, self.threshold, self.limit)]
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._pending or self._in_flight):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                # Idle: give a follow-up task idle_delay to show up before loading
+                self._cond.wait(self.idle_delay)
+                if self._in_flight or not self._pending:
+                    continue
+                names, self._pending = self._pending, None
+            for name in names:
+                if self._closed:
+                    return
+                try:
+                    self.manager.prewarm(name)
+                except Exception as e:
+                    # A failed load must not kill the thread: the task will load it on demand
+                    self.errors += 1
+                    print(f"⚠️  Prewarm of {name} failed: {e}")
+
+    def close(self, timeout: float = 10.0):
+        """Stop the thread; waits for a load already running so it can't land after the manager closes"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout)
+
+
+def replay_accuracy(records: List[Dict], train_fraction: float = 0.8,
+                    threshold: float = 0.3, limit: int = 2) -> Dict:
+    """Train on the first part of the log, score predictions on the rest"""
+    split = int(len(records) * train_fraction)
+    predictor = MCPTransitionPredictor().fit_records(records[:split])
+
+    hits = needed_total = predicted_total = 0
+    previous_strategy, previous_active = None, []
+    for record in records[split:]:
+        active = record.get("active_mcps") or []
+        if not set(previous_active) <= set(active):
+            previous_strategy, previous_active = None, []
+        needed = set(task_mcps(record, previous_active))
+        predicted = {name for name, _ in predictor.predict(previous_strategy, threshold, limit)}
+        hits += len(needed & predicted)
+        needed_total += len(needed)
+        predicted_total += len(predicted)
+        predictor.observe(previous_strategy, list(needed))
+        previous_strategy, previous_active = record.get("strategy"), active
+
+    return {
+        "train": split,
+        "test": len(records) - split,
+        "recall": hits / needed_total if needed_total else 0.0,
+        "precision": hits / predicted_total if predicted_total else 0.0
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_LOG_PATH
+    print("🔮 V6 MCP PREWARM - TRANSITIONS FROM EXECUTION LOG")
+    records = list(iter_log_records(path))
+    if not records:
+        print(f"⚠️  No records in {path} - run some tasks first")
+        sys.exit(0)
+
+    predictor = MCPTransitionPredictor().fit_records(records)
+    print(f"📚 {predictor.records} records from {path}")
+    for state in sorted(predictor.totals):
+        prediction = predictor.predict(None if state == SESSION_START else state)
+        print(f"   {state:>20} → {prediction}")
+
+    accuracy = replay_accuracy(records)
+    print(f"\n🎯 Replay ({accuracy['train']} train / {accuracy['test']} test): "
+          f"recall {accuracy['recall']:.1%} | precision {accuracy['precision']:.1%}")
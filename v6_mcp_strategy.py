@@ -14,6 +14,8 @@ import json
 import subprocess
 from datetime import datetime
 
+from v6_router import get_router
+
 class V6MCPStrategyManager:
     """V6 MCP Strategy Manager - Hybrid Implementation"""
 
@@ -81,44 +83,8 @@ class V6MCPStrategyManager:
         }
 
     def get_mcp_recommendation(self, task):
-        """Get MCP recommendation based on task analysis"""
-        task_lower = task.lower()
-
-        # Análise de task → MCPs necessários
-        needed_mcps = []
-        strategy = "general"
-
-        # MCPs persistentes sempre disponíveis
-        if any(word in task_lower for word in ['cache', 'memory', 'store', 'data']):
-            needed_mcps.append("redis")
-            strategy = "data_management"
-
-        if any(word in task_lower for word in ['pesquis', 'research', 'analyze', 'error', '522']):
-            needed_mcps.append("tavily")
-            strategy = "research_analysis"
-
-        if any(word in task_lower for word in ['orchestrat', 'agent', 'swarm', 'coordinate']):
-            needed_mcps.append("claude-flow")
-            strategy = "orchestration"
-
-        # MCPs lazy por demanda
-        if any(word in task_lower for word in ['server', 'hetzner', 'cloud', 'vps', 'deploy']):
-            needed_mcps.extend(["hetzner", "claude-flow"])
-            strategy = "infrastructure"
-
-        elif any(word in task_lower for word in ['document', 'pdf', 'process', 'text']):
-            needed_mcps.extend(["docling", "redis"])
-            strategy = "document_processing"
-
-        elif any(word in task_lower for word in ['cloud deploy', 'production', 'scale']):
-            needed_mcps.extend(["flow-nexus", "coolify"])
-            strategy = "cloud_deployment"
-
-        elif any(word in task_lower for word in ['vector', 'embedding', 'search', 'similarity']):
-            needed_mcps.extend(["agentdb", "redis"])
-            strategy = "vector_search"
-
-        return needed_mcps, strategy
+        """Get MCP recommendation based on task analysis (regras: v6_router.ROUTING_RULES["strategy"])"""
+        return get_router().route_strategy(task)
 
     def display_strategy_info(self):
         """Display current V6 MCP strategy"""
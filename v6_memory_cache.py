@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+📦 V6 MEMORY CACHE - In-Process Cache Tier
+==========================================
+Exact keys | Per-entry TTL checked on read | Heap sweep of expired entries
+Memory budget with LRU eviction | Real hit/miss/expiry/eviction counters
+"""
+
+import heapq
+import json
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+def estimate_size(key: str, value: Any) -> int:
+    """Approximate footprint of one entry in bytes (key + serialized value + overhead)"""
+    if isinstance(value, (bytes, bytearray)):
+        payload = len(value)
+    elif isinstance(value, str):
+        payload = len(value)
+    else:
+        try:
+            payload = len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            payload = sys.getsizeof(value)
+    return len(key) + payload + 64
+
+
+class V6MemoryCache:
+    """
+    📦 Bounded in-process cache
+    Entries live in an OrderedDict (LRU order); expiries sit in a min-heap so
+    a sweep only touches entries that are actually due. Expired entries are
+    never served: get() checks the deadline before returning.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: Optional[float] = 3600,
+                 sweep_every: int = 256):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.sweep_every = sweep_every
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, expires_at, size)
+        self._expiry_heap = []                                   # (expires_at, key)
+        self._writes_since_sweep = 0
+        self.bytes_used = 0
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "sets": 0, "sweeps": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self._live_entry(key, time.monotonic()) is not None
+
+    def _live_entry(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= now:
+            self._remove(key)
+            self.stats["expired"] += 1
+            return None
+        return entry
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes_used -= entry[2]
+        return entry
+
+    def get(self, key: str, default: Any = None) -> Any:
+        entry = self._live_entry(key, time.monotonic())
+        if entry is None:
+            self.stats["misses"] += 1
+            return default
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[0]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Store with TTL (seconds; None → default_ttl, 0 → no expiry); False if it cannot fit"""
+        size = estimate_size(key, value)
+        if size > self.max_bytes:
+            return False
+
+        ttl = self.default_ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+
+        self._remove(key)
+        self._entries[key] = (value, expires_at, size)
+        self.bytes_used += size
+        if expires_at is not None:
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+        self.stats["sets"] += 1
+
+        self._writes_since_sweep += 1
+        if self._writes_since_sweep >= self.sweep_every:
+            self.sweep()
+        if self.bytes_used > self.max_bytes:
+            self.sweep()
+            self._evict()
+        return True
+
+    def delete(self, key: str) -> bool:
+        return self._remove(key) is not None
+
+    def ttl(self, key: str) -> Optional[float]:
+        """Seconds left (-1 no expiry, None missing/expired)"""
+        entry = self._live_entry(key, time.monotonic())
+        if entry is None:
+            return None
+        return -1 if entry[1] is None else entry[1] - time.monotonic()
+
+    def sweep(self) -> int:
+        """Drop every entry whose deadline has passed; O(expired · log n)"""
+        now = time.monotonic()
+        removed = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # Stale heap items (key re-set or deleted since) are skipped
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                removed += 1
+        # Re-set keys leave stale heap items behind; rebuild once they dominate
+        if len(heap) > 2 * len(self._entries) + 1024:
+            self._expiry_heap = [(entry[1], key) for key, entry in self._entries.items() if entry[1] is not None]
+            heapq.heapify(self._expiry_heap)
+        self._writes_since_sweep = 0
+        self.stats["expired"] += removed
+        self.stats["sweeps"] += 1
+        return removed
+
+    def _evict(self):
+        while self.bytes_used > self.max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        self._entries.clear()
+        self._expiry_heap = []
+        self.bytes_used = 0
+
+    def get_stats(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+            **self.stats
+        }
+
+
+if __name__ == "__main__":
+    print("📦 V6 MEMORY CACHE - SELF CHECK")
+
+    cache = V6MemoryCache(max_bytes=4096, default_ttl=60)
+    cache.set("short", "lives 50ms", ttl=0.05)
+    cache.set("long", "lives 60s")
+    time.sleep(0.06)
+    assert cache.get("short") is None, "expired entry served"
+    assert cache.get("long") == "lives 60s"
+
+    for i in range(200):
+        cache.set(f"k{i}", "x" * 100)
+    assert cache.bytes_used <= cache.max_bytes
+    assert cache.get("k199") is not None and cache.get("k0") is None
+
+    n = 200_000
+    big = V6MemoryCache(max_bytes=256 * 1024 * 1024)
+    start = time.perf_counter()
+    for i in range(n):
+        big.set(f"key_{i}", i, ttl=0.001 if i % 2 else 3600)
+    set_us = (time.perf_counter() - start) / n * 1e6
+    time.sleep(0.01)
+    start = time.perf_counter()
+    expired = big.sweep()
+    sweep_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    for i in range(n):
+        big.get(f"key_{i}")
+    get_us = (time.perf_counter() - start) / n * 1e6
+
+    print(f"✅ TTL on read, LRU budget: {cache.get_stats()}")
+    print(f"⚡ set: {set_us:.2f}µs | get: {get_us:.2f}µs | sweep of {expired} expired: {sweep_ms:.1f}ms")
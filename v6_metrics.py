@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+📈 V6 METRICS - Registro de métricas in-process para o hot path
+===============================================================
+Counters, gauges e histogramas de latência log-bucketed (estilo HDR) em slots pré-alocados
+Labels por MCP / strategy / tier de cache | Shards por thread sem lock, somados na leitura
+Desligado (V6_METRICS=0 ou registry.disable()) cada chamada custa um if
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Histogramas: 8 buckets por oitava a partir de 1µs (valores em ms), ~9% de erro relativo
+HISTOGRAM_MIN_MS = 0.001
+BUCKETS_PER_OCTAVE = 8
+OCTAVES = 28  # até ~268s; acima disso vai para o bucket de overflow
+HISTOGRAM_BUCKETS = BUCKETS_PER_OCTAVE * OCTAVES + 2  # underflow + log buckets + overflow
+_LAST_BUCKET = HISTOGRAM_BUCKETS - 1
+_SUM = HISTOGRAM_BUCKETS          # slot da soma dentro do bloco do histograma
+_BLOCK = HISTOGRAM_BUCKETS + 1
+_LOG_SCALE = BUCKETS_PER_OCTAVE / math.log(2)
+_INV_MIN = 1 / HISTOGRAM_MIN_MS
+_log = math.log
+
+
+def bucket_upper_bounds() -> List[float]:
+    """Limite superior (ms) de cada bucket; o último é +Inf"""
+    bounds = [HISTOGRAM_MIN_MS * 2 ** (i / BUCKETS_PER_OCTAVE) for i in range(HISTOGRAM_BUCKETS - 1)]
+    return bounds + [math.inf]
+
+
+def bucket_percentile(counts: Sequence[float], q: float) -> float:
+    """Percentil q (0-100) estimado pelo meio geométrico do bucket que o contém"""
+    total = sum(counts)
+    if not total:
+        return float("nan")
+    target, seen = q / 100 * total, 0
+    for bucket, n in enumerate(counts):
+        seen += n
+        if n and seen >= target:
+            if bucket == 0:
+                return HISTOGRAM_MIN_MS
+            if bucket == _LAST_BUCKET:
+                return HISTOGRAM_MIN_MS * 2 ** ((bucket - 1) / BUCKETS_PER_OCTAVE)
+            return HISTOGRAM_MIN_MS * 2 ** ((bucket - 0.5) / BUCKETS_PER_OCTAVE)
+    return float("nan")
+
+
+class _Counter:
+    __slots__ = ("registry", "local", "slot")
+
+    def __init__(self, registry, slot):
+        self.registry, self.local, self.slot = registry, registry._local, slot
+
+    def inc(self, amount: float = 1.0):
+        if not self.registry.enabled:
+            return
+        try:
+            self.local.values[self.slot] += amount
+        except (AttributeError, IndexError):
+            self.registry._shard_values(self.slot + 1)[self.slot] += amount
+
+
+class _Histogram:
+    __slots__ = ("registry", "local", "base")
+
+    def __init__(self, registry, base):
+        self.registry, self.local, self.base = registry, registry._local, base
+
+    def observe(self, value_ms: float):
+        if not self.registry.enabled:
+            return
+        bucket = int(_log(value_ms * _INV_MIN) * _LOG_SCALE) + 1 if value_ms > HISTOGRAM_MIN_MS else 0
+        if bucket > _LAST_BUCKET:
+            bucket = _LAST_BUCKET
+        base = self.base
+        try:
+            values = self.local.values
+            values[base + _SUM] += value_ms
+        except (AttributeError, IndexError):
+            values = self.registry._shard_values(base + _BLOCK)
+            values[base + _SUM] += value_ms
+        values[base + bucket] += 1
+
+    @contextmanager
+    def time(self):
+        """with histogram.time(): ... → observa a duração do bloco em ms"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe((time.perf_counter() - start) * 1000)
+
+
+class _Gauge:
+    """Valor instantâneo (último set vence); não é sharded, não faz sentido somar gauges"""
+    __slots__ = ("registry", "slot")
+
+    def __init__(self, registry, slot):
+        self.registry, self.slot = registry, slot
+
+    def set(self, value: float):
+        if self.registry.enabled:
+            self.registry._gauge_values[self.slot] = value
+
+    def set_function(self, fn: Callable[[], float]):
+        """Valor calculado na leitura (ex.: memória medida dos MCPs carregados)"""
+        self.registry._gauge_functions[self.slot] = fn
+
+
+class Metric:
+    """
+    Família de métricas (um nome, um tipo, N combinações de labels)
+    .labels(...) devolve o filho daquela combinação - guarde-o no hot path, o lookup
+    é um dict; sem labelnames a própria família tem inc/set/observe.
+    """
+
+    def __init__(self, registry: "V6MetricsRegistry", kind: str, name: str, help: str,
+                 labelnames: Sequence[str]):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            child = self.labels()
+            for method in ("inc", "observe", "set", "set_function", "time"):
+                if hasattr(child, method):
+                    setattr(self, method, getattr(child, method))
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(str(kwargs.get(name, "")) for name in self.labelnames)
+        else:
+            values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} espera labels {self.labelnames}, recebeu {values}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._children[values] = self.registry._new_child(self.kind)
+        return child
+
+    def children(self) -> List[Tuple[Dict[str, str], object]]:
+        return [(dict(zip(self.labelnames, values)), child) for values, child in list(self._children.items())]
+
+
+class V6MetricsRegistry:
+    """
+    📈 Registro de métricas com shards por thread
+    Cada thread escreve só no próprio shard, uma lista de floats pré-alocada (sem lock,
+    sem contenção; lista e não array('d') porque += num item de lista custa metade);
+    a leitura soma os shards. Slots são alocados uma vez, na criação de cada combinação de labels.
+    Shards de threads que morreram são dobrados num acumulador na leitura seguinte.
+    """
+
+    def __init__(self, enabled: bool = True, initial_slots: int = 4096):
+        self.enabled = enabled
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._capacity = initial_slots
+        self._size = 0
+        self._shards: List[Tuple[threading.Thread, List[float]]] = []
+        self._retired: List[float] = []
+        self._gauge_values: List[float] = []
+        self._gauge_functions: Dict[int, Callable[[], float]] = {}
+        self.metrics: Dict[str, Metric] = {}
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    # Declaração (idempotente: módulos diferentes podem declarar a mesma família)
+    def _declare(self, kind: str, name: str, help: str, labelnames: Sequence[str]) -> Metric:
+        with self._lock:
+            metric = self.metrics.get(name)
+        if metric is not None:
+            if metric.kind != kind or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"métrica {name} já declarada como {metric.kind}{metric.labelnames}")
+            return metric
+        metric = Metric(self, kind, name, help, labelnames)
+        with self._lock:
+            return self.metrics.setdefault(name, metric)
+
+    def counter(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Metric:
+        return self._declare("counter", name, help, labelnames)
+
+    def gauge(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Metric:
+        return self._declare("gauge", name, help, labelnames)
+
+    def histogram(self, name: str, help: str = "", labelnames: Sequence[str] = ()) -> Metric:
+        return self._declare("histogram", name, help, labelnames)
+
+    def _new_child(self, kind: str):
+        with self._lock:
+            if kind == "gauge":
+                self._gauge_values.append(float("nan"))
+                return _Gauge(self, len(self._gauge_values) - 1)
+            width = _BLOCK if kind == "histogram" else 1
+            slot = self._size
+            self._size += width
+            while self._size > self._capacity:
+                self._capacity *= 2
+        return _Histogram(self, slot) if kind == "histogram" else _Counter(self, slot)
+
+    def _shard_values(self, needed: int) -> List[float]:
+        """Shard desta thread, criado/estendido até a capacidade atual (só a dona escreve nele)"""
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = self._local.values = [0.0] * self._capacity
+            with self._lock:
+                self._shards.append((threading.current_thread(), values))
+        if len(values) < needed:
+            values.extend([0.0] * (max(self._capacity, needed) - len(values)))
+        return values
+
+    # Leitura
+    def _merged(self) -> List[float]:
+        with self._lock:
+            alive = []
+            for thread, values in self._shards:
+                if thread.is_alive():
+                    alive.append((thread, values))
+                else:
+                    self._retired = self._sum_into(self._retired, values)
+            self._shards = alive
+            merged = list(self._retired)
+            shards = [values for _, values in alive]
+            size = self._size
+        for values in shards:
+            merged = self._sum_into(merged, values)
+        return merged + [0.0] * (size - len(merged)) if len(merged) < size else merged
+
+    @staticmethod
+    def _sum_into(total, values):
+        n = len(values)
+        if len(total) < n:
+            total = total + [0.0] * (n - len(total))
+        return [a + b for a, b in zip(total, values[:n])] + total[n:]
+
+    def _gauge_value(self, slot: int) -> float:
+        fn = self._gauge_functions.get(slot)
+        if fn is not None:
+            try:
+                return float(fn())
+            except Exception:
+                return float("nan")
+        return self._gauge_values[slot]
+
+    def collect(self) -> List[Dict]:
+        """
+        [{"name", "type", "help", "samples": [(labels, value)]}]; em histogramas value é
+        {"counts": [...por bucket], "sum", "count"} (bucket_upper_bounds() dá os limites)
+        """
+        merged = self._merged()
+        families = []
+        for metric in list(self.metrics.values()):
+            samples = []
+            for labels, child in metric.children():
+                if metric.kind == "counter":
+                    value = merged[child.slot]
+                elif metric.kind == "gauge":
+                    value = self._gauge_value(child.slot)
+                else:
+                    counts = merged[child.base:child.base + HISTOGRAM_BUCKETS]
+                    value = {"counts": counts, "sum": merged[child.base + _SUM], "count": sum(counts)}
+                samples.append((labels, value))
+            families.append({"name": metric.name, "type": metric.kind, "help": metric.help, "samples": samples})
+        return families
+
+    def snapshot(self) -> Dict[str, object]:
+        """Forma compacta para JSON: "nome{label=valor}" → valor (histograma: count/sum/p50/p95/p99)"""
+        result = {}
+        for family in self.collect():
+            for labels, value in family["samples"]:
+                key = family["name"] + ("{" + ",".join(f"{k}={v}" for k, v in labels.items()) + "}"
+                                        if labels else "")
+                if family["type"] == "histogram":
+                    if not value["count"]:
+                        continue
+                    value = {"count": int(value["count"]), "sum_ms": round(value["sum"], 3),
+                             **{f"p{q}_ms": round(bucket_percentile(value["counts"], q), 3) for q in (50, 95, 99)}}
+                elif value != value:
+                    continue  # gauge nunca definido
+                elif family["type"] == "counter" and value.is_integer():
+                    value = int(value)
+                result[key] = value
+        return result
+
+
+_registry = V6MetricsRegistry(enabled=os.getenv("V6_METRICS", "1").lower() not in ("0", "false", "off"))
+
+
+def get_registry() -> V6MetricsRegistry:
+    """Registro compartilhado do processo (V6_METRICS=0 começa desligado)"""
+    return _registry
+
+
+# Famílias compartilhadas (executores, MCP manager, cache híbrido reportam aqui)
+TASKS = _registry.counter("v6_tasks_total", "Tasks executadas", ("executor", "strategy", "outcome"))
+TASK_MS = _registry.histogram("v6_task_ms", "Duração da task (ms)", ("executor", "strategy"))
+MCP_CALLS = _registry.counter("v6_mcp_calls_total", "Chamadas MCP", ("mcp", "outcome"))
+MCP_CALL_MS = _registry.histogram("v6_mcp_call_ms", "Duração da chamada MCP (ms)", ("mcp",))
+MCP_LOADS = _registry.counter("v6_mcp_loads_total", "Carregamentos de MCP", ("mcp", "kind"))
+MCP_LOAD_MS = _registry.histogram("v6_mcp_load_ms", "Cold load do MCP (ms)", ("mcp",))
+MCP_USES = _registry.counter("v6_mcp_uses_total", "get_mcp atendidos", ("mcp",))
+MCP_EVICTIONS = _registry.counter("v6_mcp_evictions_total", "MCPs descarregados", ("mcp", "reason"))
+MCP_LOADED = _registry.gauge("v6_mcp_loaded", "MCPs carregados agora")
+MCP_MEMORY_BYTES = _registry.gauge("v6_mcp_memory_bytes", "Memória medida dos MCPs carregados")
+CACHE_REQUESTS = _registry.counter("v6_cache_requests_total", "Lookups por tier do cache híbrido",
+                                   ("tier", "result"))
+MEMORY_OPS = _registry.counter("v6_memory_ops_total", "Operações no memory.db", ("op", "outcome"))
+MEMORY_OP_MS = _registry.histogram("v6_memory_op_ms", "Duração da operação no memory.db (ms)", ("op",))
+CACHE_GET_MS = _registry.histogram("v6_cache_get_ms", "Latência do hybrid_get pelo tier que respondeu (ms)",
+                                   ("tier",))
+
+
+def benchmark_metrics(operations: int = 1_000_000, threads: int = 8) -> Dict:
+    """Custo por operação: dict + lock vs registro (ligado/desligado), e contagem exata multi-thread"""
+    registry = V6MetricsRegistry()
+    counter = registry.counter("bench_total", labelnames=("mcp",)).labels("tavily")
+    histogram = registry.histogram("bench_ms", labelnames=("strategy",)).labels("research_error")
+    stats, lock = {"tavily": 0}, threading.Lock()
+
+    def timed(fn):
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) / operations * 1e9
+
+    def locked_dict():
+        for _ in range(operations):
+            with lock:
+                stats["tavily"] += 1
+
+    def counter_loop():
+        inc = counter.inc
+        for _ in range(operations):
+            inc()
+
+    def histogram_loop():
+        observe = histogram.observe
+        for i in range(operations):
+            observe(i % 500 * 0.37)
+
+    def empty_loop():
+        for _ in range(operations):
+            pass
+
+    result = {"loop_ns": timed(empty_loop), "dict_lock_ns": timed(locked_dict), "counter_ns": timed(counter_loop),
+              "observe_ns": timed(histogram_loop)}
+    registry.disable()
+    result["disabled_counter_ns"] = timed(counter_loop)
+    result["disabled_observe_ns"] = timed(histogram_loop)
+    registry.enable()
+
+    # Exatidão: N threads sem lock, nenhum incremento perdido
+    shared = registry.counter("bench_threads_total")
+    per_thread = operations // threads
+    workers = [threading.Thread(target=lambda: [shared.inc() for _ in range(per_thread)]) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    result["threads_s"] = time.perf_counter() - start
+    result["threads_expected"] = per_thread * threads
+    result["threads_counted"] = int(registry.snapshot()["bench_threads_total"])
+
+    start = time.perf_counter()
+    snapshot = registry.snapshot()
+    result["snapshot_ms"] = (time.perf_counter() - start) * 1000
+    result["p50_ms"] = snapshot["bench_ms{strategy=research_error}"]["p50_ms"]
+    result["p99_ms"] = snapshot["bench_ms{strategy=research_error}"]["p99_ms"]
+    return result
+
+
+if __name__ == "__main__":
+    print("📈 V6 METRICS - BENCHMARK (1M operações)")
+    result = benchmark_metrics()
+    print(f"\n🔁 Loop vazio (base):    {result['loop_ns']:>6.0f}ns")
+    print(f"🐢 dict + lock:          {result['dict_lock_ns']:>6.0f}ns/inc")
+    print(f"⚡ counter.inc():        {result['counter_ns']:>6.0f}ns")
+    print(f"⚡ histogram.observe():  {result['observe_ns']:>6.0f}ns")
+    print(f"💤 Desligado:            {result['disabled_counter_ns']:>6.0f}ns inc | "
+          f"{result['disabled_observe_ns']:.0f}ns observe")
+    print(f"🧵 8 threads sem lock: {result['threads_counted']:,}/{result['threads_expected']:,} contados "
+          f"({result['threads_s']:.2f}s)")
+    print(f"📊 snapshot(): {result['snapshot_ms']:.2f}ms | p50 {result['p50_ms']:.1f}ms (real 92.3) | "
+          f"p99 {result['p99_ms']:.1f}ms (real 182.7)")
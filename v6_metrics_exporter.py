@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+📡 V6 METRICS EXPORTER - OpenMetrics em localhost + metrics_log no memory.db
+===========================================================================
+GET /metrics → texto OpenMetrics do registro (v6_metrics) | Só 127.0.0.1 por padrão
+A cada intervalo: séries que mudaram → metrics_log num único INSERT em lote
+Roll-up 1s → 1m → 1h com retenção por nível | performance.json atualizado com as operações reais
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from v6_metrics import (BUCKETS_PER_OCTAVE, HISTOGRAM_BUCKETS, V6MetricsRegistry, bucket_percentile,
+                        bucket_upper_bounds, get_registry)
+from v6_sqlite_engine import DEFAULT_DB_PATH, get_engine
+
+DEFAULT_PORT = int(os.getenv("V6_METRICS_PORT", "9464"))
+DEFAULT_PERFORMANCE_PATH = ".backup-metrics/performance.json"
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# Mesmo DDL do Claude Flow (caso o banco ainda não tenha a tabela) + índice para roll-up/retenção
+METRICS_LOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics_log (
+      id INTEGER PRIMARY KEY AUTOINCREMENT,
+      metric_name TEXT NOT NULL,
+      value REAL NOT NULL,
+      timestamp TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+CREATE INDEX IF NOT EXISTS idx_metrics_log_timestamp ON metrics_log(timestamp);
+"""
+
+# (sufixo no metric_name, largura da janela em s, retenção em s); o nível 1s não tem sufixo
+RESOLUTIONS = (("", 1, 15 * 60), ("@1m", 60, 86400), ("@1h", 3600, 30 * 86400))
+PERCENTILES = (50, 95, 99)
+
+# operations.<op> do performance.json ← v6_memory_ops_total / v6_memory_op_ms do V6SQLiteEngine
+PERFORMANCE_OPERATIONS = ("store", "retrieve", "query", "list", "delete", "search", "init")
+
+
+def _sql_time(epoch: float) -> str:
+    """Formato do CURRENT_TIMESTAMP do SQLite (UTC, ordena como texto)"""
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels.items()) + ([extra] if extra else [])
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value != value:
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_openmetrics(registry: Optional[V6MetricsRegistry] = None) -> str:
+    """
+    Texto OpenMetrics 1.0 do registro. Histogramas saem com um bucket por oitava
+    (le = 1µs, 2µs, 4µs, ... em ms): limites fixos entre scrapes, contagens exatas
+    porque os buckets internos (8 por oitava) se alinham às oitavas.
+    """
+    registry = registry or get_registry()
+    bounds = bucket_upper_bounds()
+    octave_edges = list(range(0, HISTOGRAM_BUCKETS - 1, BUCKETS_PER_OCTAVE))
+    lines = []
+    for family in registry.collect():
+        kind, name = family["type"], family["name"]
+        if kind == "counter" and name.endswith("_total"):
+            name = name[:-len("_total")]
+        lines.append(f"# TYPE {name} {kind}")
+        if family["help"]:
+            lines.append(f"# HELP {name} {_escape(family['help'])}")
+        if kind == "histogram" and name.endswith("_ms"):
+            lines.append(f"# UNIT {name} ms")
+        for labels, value in family["samples"]:
+            if kind == "counter":
+                lines.append(f"{name}_total{_labels(labels)} {_number(value)}")
+            elif kind == "gauge":
+                if value == value:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+            else:
+                counts, cumulative, edge = value["counts"], 0.0, 0
+                for index in octave_edges:
+                    cumulative += sum(counts[edge:index + 1])
+                    edge = index + 1
+                    lines.append(f"{name}_bucket{_labels(labels, ('le', repr(bounds[index])))} {_number(cumulative)}")
+                lines.append(f"{name}_bucket{_labels(labels, ('le', '+Inf'))} {_number(value['count'])}")
+                lines.append(f"{name}_count{_labels(labels)} {_number(value['count'])}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(value['sum'])}")
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_openmetrics(self.server.registry).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # um scrape por segundo não deve poluir o stderr
+
+
+class MetricsLogWriter:
+    """
+    💾 Registro → metrics_log (down-sampling)
+    A cada flush grava só as séries que mudaram desde o último: counters e _count/_sum
+    de histogramas com o valor acumulado, gauges com o valor atual, e _p50/_p95/_p99 do
+    intervalo (calculados do delta dos buckets). Roll-up: counters e percentis → MAX da
+    janela (counters são monotônicos, MAX = último), gauges → AVG.
+    """
+
+    def __init__(self, registry: Optional[V6MetricsRegistry] = None, db_path: str = DEFAULT_DB_PATH):
+        self.registry = registry or get_registry()
+        self.engine = get_engine(db_path)
+        self._last_values: Dict[str, float] = {}
+        self._last_counts: Dict[str, List[float]] = {}
+        self.stats = {"flushes": 0, "rows": 0, "rolled_up": 0, "expired": 0}
+        with self.engine.connection() as conn:
+            conn.executescript(METRICS_LOG_SCHEMA)
+        self._watermarks = {suffix: self._initial_watermark(suffix, width) for suffix, width, _ in RESOLUTIONS[1:]}
+
+    def _initial_watermark(self, suffix: str, width: int) -> Optional[str]:
+        """Fim da última janela já consolidada nesse nível (retomada após restart)"""
+        with self.engine.connection() as conn:
+            row = conn.execute("SELECT CAST(strftime('%s', MAX(timestamp)) AS INTEGER) FROM metrics_log "
+                               "WHERE metric_name LIKE ?", (f"%{suffix}",)).fetchone()
+        return _sql_time(row[0] + width) if row[0] is not None else None
+
+    def _rows(self) -> List[Tuple[str, float]]:
+        rows = []
+        for family in self.registry.collect():
+            for labels, value in family["samples"]:
+                series = family["name"] + ("{" + ",".join(f"{k}={v}" for k, v in labels.items()) + "}"
+                                           if labels else "")
+                if family["type"] != "histogram":
+                    if value == value and self._last_values.get(series) != value:
+                        self._last_values[series] = value
+                        rows.append((series, value))
+                    continue
+                previous = self._last_counts.get(series)
+                counts = value["counts"]
+                delta = counts if previous is None else [a - b for a, b in zip(counts, previous)]
+                if not any(delta):
+                    continue
+                self._last_counts[series] = list(counts)
+                base, _, label_part = series.partition("{")
+                label_part = "{" + label_part if label_part else ""
+                rows.append((f"{base}_count{label_part}", value["count"]))
+                rows.append((f"{base}_sum{label_part}", value["sum"]))
+                rows.extend((f"{base}_p{q}{label_part}", bucket_percentile(delta, q)) for q in PERCENTILES)
+        return rows
+
+    def flush(self, now: Optional[float] = None) -> int:
+        """Um INSERT em lote com as séries que mudaram; depois roll-up e retenção"""
+        now = time.time() if now is None else now
+        rows = self._rows()
+        timestamp = _sql_time(now)
+        with self.engine.transaction() as conn:
+            if rows:
+                conn.executemany("INSERT INTO metrics_log (metric_name, value, timestamp) VALUES (?, ?, ?)",
+                                 [(series, value, timestamp) for series, value in rows])
+            self._rollup(conn, now)
+        self.stats["flushes"] += 1
+        self.stats["rows"] += len(rows)
+        return len(rows)
+
+    def _gauge_names(self) -> set:
+        return {name for name, metric in self.registry.metrics.items() if metric.kind == "gauge"}
+
+    def _rollup(self, conn, now: float):
+        gauges = self._gauge_names()
+        for (source, _, retention), (target, width, _) in zip(RESOLUTIONS, RESOLUTIONS[1:]):
+            # Só janelas completas: [watermark, início da janela atual)
+            end = _sql_time(now // width * width)
+            start = self._watermarks[target] or "0000"
+            if start < end:
+                level = "metric_name NOT LIKE '%@%'" if not source else "metric_name LIKE ?"
+                params = () if not source else (f"%{source}",)
+                grouped = conn.execute(
+                    f"SELECT metric_name, datetime(CAST(strftime('%s', timestamp) AS INTEGER) / ? * ?, 'unixepoch') "
+                    f"AS window, MAX(value), AVG(value) FROM metrics_log "
+                    f"WHERE {level} AND timestamp >= ? AND timestamp < ? GROUP BY metric_name, window",
+                    (width, width) + params + (start, end)).fetchall()
+                rollups = []
+                for series, window, maximum, average in grouped:
+                    name = series[:len(series) - len(source)] if source else series
+                    value = average if name.partition("{")[0] in gauges else maximum
+                    rollups.append((name + target, value, window))
+                conn.executemany("INSERT INTO metrics_log (metric_name, value, timestamp) VALUES (?, ?, ?)",
+                                 rollups)
+                self._watermarks[target] = end
+                self.stats["rolled_up"] += len(rollups)
+
+            level = "metric_name NOT LIKE '%@%'" if not source else "metric_name LIKE ?"
+            params = () if not source else (f"%{source}",)
+            self.stats["expired"] += conn.execute(
+                f"DELETE FROM metrics_log WHERE {level} AND timestamp < ?",
+                params + (_sql_time(now - retention),)).rowcount
+
+        suffix, _, retention = RESOLUTIONS[-1]
+        self.stats["expired"] += conn.execute(
+            "DELETE FROM metrics_log WHERE metric_name LIKE ? AND timestamp < ?",
+            (f"%{suffix}", _sql_time(now - retention))).rowcount
+
+
+class PerformanceJSONSync:
+    """
+    📝 operations.<op> do .backup-metrics/performance.json com os números reais
+    Os valores que já estavam no arquivo na partida viram a base; o que este processo
+    mediu é somado por cima. Os demais campos do arquivo não são tocados.
+    """
+
+    def __init__(self, path: str = DEFAULT_PERFORMANCE_PATH, registry: Optional[V6MetricsRegistry] = None):
+        self.path = path
+        self.registry = registry or get_registry()
+        self.baseline = self._read().get("operations", {})
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _measured(self) -> Dict[str, Dict[str, float]]:
+        measured = {}
+        for family in self.registry.collect():
+            if family["name"] not in ("v6_memory_ops_total", "v6_memory_op_ms"):
+                continue
+            for labels, value in family["samples"]:
+                op = measured.setdefault(labels["op"], {"count": 0, "totalDuration": 0.0, "errors": 0})
+                if family["name"] == "v6_memory_op_ms":
+                    op["totalDuration"] += value["sum"]
+                elif labels["outcome"] == "error":
+                    op["errors"] += value
+                    op["count"] += value
+                else:
+                    op["count"] += value
+        return measured
+
+    def sync(self) -> Dict:
+        """Reescreve o arquivo (atômico); se ele não existe não há o que manter em dia"""
+        if not os.path.exists(self.path):
+            return {}
+        data = self._read()
+        operations = data.setdefault("operations", {})
+        measured = self._measured()
+        for op in PERFORMANCE_OPERATIONS:
+            base = self.baseline.get(op, {})
+            mine = measured.get(op, {})
+            operations[op] = {key: round(base.get(key, 0) + mine.get(key, 0), 3) if key == "totalDuration"
+                              else int(base.get(key, 0) + mine.get(key, 0))
+                              for key in ("count", "totalDuration", "errors")}
+        total_ops = sum(op["count"] for op in operations.values())
+        total_ms = sum(op["totalDuration"] for op in operations.values())
+        performance = data.setdefault("performance", {})
+        performance["totalOperationTime"] = round(total_ms, 3)
+        performance["avgOperationDuration"] = round(total_ms / total_ops, 3) if total_ops else 0
+        if measured:
+            data["lastActivity"] = int(time.time() * 1000)
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.path)
+        return operations
+
+
+class V6MetricsExporter:
+    """
+    📡 HTTP /metrics em host:port + thread que grava o metrics_log a cada interval
+    e o performance.json a cada performance_every flushes. port=None desliga o HTTP,
+    db_path=None desliga o metrics_log, performance_path=None o performance.json.
+    """
+
+    def __init__(self, registry: Optional[V6MetricsRegistry] = None, host: str = "127.0.0.1",
+                 port: Optional[int] = DEFAULT_PORT, db_path: Optional[str] = DEFAULT_DB_PATH,
+                 interval: float = 1.0, performance_path: Optional[str] = DEFAULT_PERFORMANCE_PATH,
+                 performance_every: int = 10):
+        self.registry = registry or get_registry()
+        self.host, self.port = host, port
+        self.interval = interval
+        self.performance_every = performance_every
+        self.writer = MetricsLogWriter(self.registry, db_path) if db_path else None
+        self.performance = PerformanceJSONSync(performance_path, self.registry) if performance_path else None
+        self._server = None
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "V6MetricsExporter":
+        if self.port is not None:
+            self._server = ThreadingHTTPServer((self.host, self.port), _MetricsHandler)
+            self._server.daemon_threads = True
+            self._server.registry = self.registry
+            self.port = self._server.server_address[1]  # port=0 → porta livre escolhida pelo SO
+            self._threads.append(threading.Thread(target=self._server.serve_forever,
+                                                  name="v6-metrics-http", daemon=True))
+        if self.writer or self.performance:
+            self._threads.append(threading.Thread(target=self._run, name="v6-metrics-log", daemon=True))
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def flush(self):
+        if self.writer:
+            self.writer.flush()
+        if self.performance:
+            self.performance.sync()
+
+    def _run(self):
+        ticks = 0
+        while not self._stop.wait(self.interval):
+            ticks += 1
+            try:
+                if self.writer:
+                    self.writer.flush()
+                if self.performance and ticks % self.performance_every == 0:
+                    self.performance.sync()
+            except Exception as e:
+                print(f"❌ Export de métricas falhou (nova tentativa no próximo intervalo): {e}")
+
+    def stop(self):
+        """Para o HTTP e a thread; um último flush garante o intervalo em andamento"""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self.flush()
+
+
+def demo_retention(hours: int = 3, series: int = 20) -> Dict:
+    """Simula horas de flushes de 1s (relógio sintético) num banco temporário: linhas por nível"""
+    import tempfile
+
+    registry = V6MetricsRegistry()
+    tasks = registry.counter("v6_tasks_total", "Tasks", ("executor", "strategy", "outcome"))
+    task_ms = registry.histogram("v6_task_ms", "Duração (ms)", ("executor", "strategy"))
+    loaded = registry.gauge("v6_mcp_loaded", "MCPs carregados")
+    strategies = [f"strategy_{i}" for i in range(series)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = MetricsLogWriter(registry, os.path.join(tmp, "memory.db"))
+        now = 1_760_000_000 // 3600 * 3600
+        start = time.perf_counter()
+        for second in range(hours * 3600):
+            strategy = strategies[second % series]
+            tasks.labels("complete", strategy, "success").inc()
+            task_ms.labels("complete", strategy).observe(60 + second % 40)
+            loaded.set(second % 7)
+            writer.flush(now + second)
+        elapsed = time.perf_counter() - start
+        with writer.engine.connection() as conn:
+            levels = {label: conn.execute(
+                "SELECT COUNT(*) FROM metrics_log WHERE " +
+                ("metric_name NOT LIKE '%@%'" if not suffix else f"metric_name LIKE '%{suffix}'")).fetchone()[0]
+                for label, suffix in (("1s", ""), ("1m", "@1m"), ("1h", "@1h"))}
+        writer.engine.close()
+
+    return {"hours": hours, "flushes": writer.stats["flushes"], "rows_written": writer.stats["rows"],
+            "rolled_up": writer.stats["rolled_up"], "expired": writer.stats["expired"],
+            "levels": levels, "flush_ms": elapsed / writer.stats["flushes"] * 1000}
+
+
+if __name__ == "__main__":
+    import sys
+
+    if "--demo" in sys.argv:
+        print("📡 V6 METRICS EXPORTER - RETENÇÃO E ROLL-UP (3h simuladas, 20 strategies)")
+        result = demo_retention()
+        print(f"   💾 {result['flushes']:,} flushes | {result['rows_written']:,} linhas 1s gravadas "
+              f"({result['flush_ms']:.2f}ms/flush)")
+        print(f"   📉 Roll-ups: {result['rolled_up']:,} | expiradas: {result['expired']:,}")
+        print(f"   🗄️  metrics_log agora: 1s={result['levels']['1s']:,} | 1m={result['levels']['1m']:,} | "
+              f"1h={result['levels']['1h']:,}")
+        sys.exit(0)
+
+    port = int(sys.argv[sys.argv.index("--port") + 1]) if "--port" in sys.argv else DEFAULT_PORT
+    exporter = V6MetricsExporter(port=port).start()
+    print(f"📡 OpenMetrics em http://{exporter.host}:{exporter.port}/metrics | metrics_log a cada "
+          f"{exporter.interval:.0f}s (Ctrl+C para sair)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exporter.stop()
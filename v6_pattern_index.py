@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+🧭 V6 PATTERN INDEX - Similaridade vetorial sobre pattern_embeddings
+====================================================================
+Matriz float32 contígua por modelo | top-k cosine em 1 produto matriz-vetor
+Filtro por patterns.type/confidence | Refresh incremental por rowid
+Deletes, rowids reutilizados e UPDATEs de type/confidence detectados via PRAGMA data_version
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Any, Iterable, Union
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from v6_sqlite_engine import DEFAULT_DB_PATH, get_engine
+
+SQL_LOAD_EMBEDDINGS = """
+SELECT e.rowid, e.id, e.dims, e.vector, p.type, p.confidence
+FROM pattern_embeddings e
+JOIN patterns p ON p.id = e.id
+WHERE e.model = ? AND e.rowid > ?
+ORDER BY e.rowid
+"""
+
+# Metadados das linhas indexáveis (sem os BLOBs): confere deletes/UPDATEs com o que está em memória
+SQL_LOAD_METADATA = """
+SELECT e.rowid, e.id, p.type, p.confidence, substr(e.vector, 1, 8)
+FROM pattern_embeddings e
+JOIN patterns p ON p.id = e.id
+WHERE e.model = ? AND e.dims = ? AND length(e.vector) = ?
+"""
+
+# Mesmo schema do Claude Flow (ReasoningBank), para bancos novos
+PATTERN_SCHEMA = """
+CREATE TABLE IF NOT EXISTS patterns (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    pattern_data TEXT NOT NULL,
+    confidence REAL NOT NULL DEFAULT 0.5,
+    usage_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    last_used TEXT
+);
+CREATE TABLE IF NOT EXISTS pattern_embeddings (
+    id TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    dims INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (id) REFERENCES patterns(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_patterns_type ON patterns(type);
+CREATE INDEX IF NOT EXISTS idx_patterns_confidence ON patterns(confidence DESC);
+"""
+
+
+class PatternIndex:
+    """
+    🧭 Índice em memória dos embeddings de um modelo
+    Vetores (float32 little-endian nos BLOBs) normalizados numa matriz contígua:
+    cosine top-k = matrix @ query + argpartition, sem loop Python por linha.
+    O refresh só olha o banco quando PRAGMA data_version (numa conexão própria, que
+    nunca escreve) mudou: aí confere os metadados carregados (sem BLOBs) - type/confidence
+    alterados são corrigidos no lugar, linha sumida ou rowid reutilizado recarrega tudo -
+    e carrega as linhas novas por rowid.
+    """
+
+    def __init__(self, model: str = "text-embedding-3-small", db_path: str = DEFAULT_DB_PATH,
+                 refresh_interval: float = 5.0):
+        if not HAS_NUMPY:
+            raise ImportError("PatternIndex requer numpy (pip install numpy)")
+
+        self.model = model
+        self.engine = get_engine(db_path)
+        self.refresh_interval = refresh_interval
+
+        self.dims = None
+        self.size = 0
+        self.matrix = None            # (capacidade, dims) float32, linhas [0:size] válidas
+        self.confidence = np.empty(0, dtype=np.float32)
+        self.type_codes = np.empty(0, dtype=np.int32)
+        self.rowids = np.empty(0, dtype=np.int64)  # linha -> rowid em pattern_embeddings
+        self.heads = np.empty(0, dtype=np.uint64)  # linha -> 8 primeiros bytes do BLOB (vetor trocado no mesmo rowid)
+        self.ids = []                 # linha -> pattern id
+        self.row_of = {}              # pattern id -> linha
+        self.type_names = {}          # type -> código
+        self._watermark = 0           # maior rowid já carregado
+        self._last_refresh = 0.0
+        self._data_version = None     # último PRAGMA data_version visto
+        self._version_conn = self.engine._connect()
+        self._version_lock = threading.Lock()
+        self.stats = {"loads": 0, "rows_loaded": 0, "searches": 0, "full_reloads": 0,
+                      "in_place_updates": 0, "unchanged_refreshes": 0}
+
+        with self.engine.connection() as conn:
+            conn.executescript(PATTERN_SCHEMA)
+
+        self.refresh()
+
+    def _grow(self, needed: int):
+        capacity = 0 if self.matrix is None else self.matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2, 1024)
+        matrix = np.empty((new_capacity, self.dims), dtype=np.float32)
+        confidence = np.empty(new_capacity, dtype=np.float32)
+        type_codes = np.empty(new_capacity, dtype=np.int32)
+        rowids = np.empty(new_capacity, dtype=np.int64)
+        heads = np.empty(new_capacity, dtype=np.uint64)
+        if self.size:
+            matrix[:self.size] = self.matrix[:self.size]
+            confidence[:self.size] = self.confidence[:self.size]
+            type_codes[:self.size] = self.type_codes[:self.size]
+            rowids[:self.size] = self.rowids[:self.size]
+            heads[:self.size] = self.heads[:self.size]
+        self.matrix, self.confidence, self.type_codes = matrix, confidence, type_codes
+        self.rowids, self.heads = rowids, heads
+
+    def _type_code(self, pattern_type: str) -> int:
+        code = self.type_names.get(pattern_type)
+        if code is None:
+            code = self.type_names[pattern_type] = len(self.type_names)
+        return code
+
+    def refresh(self) -> int:
+        """Sincroniza com o banco se alguém commitou desde a última vez; retorna quantas linhas entraram"""
+        self._last_refresh = time.monotonic()
+        with self._version_lock:
+            version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            self.stats["unchanged_refreshes"] += 1
+            return 0
+        self._data_version = version
+        if self.size and not self._sync_loaded():
+            self._reset()
+            self.stats["full_reloads"] += 1
+        return self._load_new()
+
+    def _sync_loaded(self) -> bool:
+        """
+        Confere as linhas em memória com os metadados do banco e aplica UPDATEs de
+        type/confidence no lugar; False quando só uma recarga completa resolve (linha
+        removida, linha nova num rowid <= watermark, que o incremental não enxerga, ou
+        vetor trocado no mesmo rowid - INSERT OR REPLACE da última linha reusa o rowid)
+        """
+        with self.engine.connection() as conn:
+            meta = conn.execute(SQL_LOAD_METADATA, (self.model, self.dims, self.dims * 4)).fetchall()
+
+        present = 0
+        changed_rows, changed_conf, changed_types = [], [], []
+        for rowid, pattern_id, pattern_type, confidence, head in meta:
+            row = self.row_of.get(pattern_id)
+            if row is None or rowid != self.rowids[row]:
+                if rowid <= self._watermark:
+                    return False
+                if row is None:
+                    continue  # linha nova: _load_new traz
+            elif int.from_bytes(head, "little") != self.heads[row]:
+                return False
+            present += 1
+            code = self._type_code(pattern_type)
+            if self.confidence[row] != np.float32(confidence) or self.type_codes[row] != code:
+                changed_rows.append(row)
+                changed_conf.append(confidence)
+                changed_types.append(code)
+        if present != self.size:
+            return False
+
+        if changed_rows:
+            self.confidence[changed_rows] = changed_conf
+            self.type_codes[changed_rows] = changed_types
+            self.stats["in_place_updates"] += len(changed_rows)
+        return True
+
+    def _load_new(self) -> int:
+        """Carrega só as linhas novas (rowid > watermark)"""
+        with self.engine.connection() as conn:
+            rows = conn.execute(SQL_LOAD_EMBEDDINGS, (self.model, self._watermark)).fetchall()
+        if not rows:
+            return 0
+
+        self._watermark = max(self._watermark, rows[-1][0])
+        if self.dims is None:
+            self.dims = rows[0][2]
+        rows = [row for row in rows if row[2] == self.dims and len(row[3]) == self.dims * 4]
+        if not rows:
+            return 0
+
+        # Cópias: o join dos BLOBs (frombuffer é uma view dele) e a normalização; linhas
+        # novas no fim da matriz recebem a divisão direto (out=), as substituídas via fancy index
+        block = np.frombuffer(b"".join(row[3] for row in rows), dtype="<f4").reshape(len(rows), self.dims)
+        norms = np.linalg.norm(block, axis=1)
+        norms[norms == 0] = 1.0
+
+        targets = np.empty(len(rows), dtype=np.int64)
+        next_row = self.size
+        for i, row in enumerate(rows):
+            existing = self.row_of.get(row[1])
+            if existing is None:
+                existing = next_row
+                next_row += 1
+                self.row_of[row[1]] = existing
+                self.ids.append(row[1])
+            targets[i] = existing
+
+        self._grow(next_row)
+        if len(rows) == next_row - self.size and targets[0] == self.size:
+            np.divide(block, norms[:, None], out=self.matrix[self.size:next_row])
+        else:
+            self.matrix[targets] = block / norms[:, None]
+        self.confidence[targets] = [row[5] for row in rows]
+        self.type_codes[targets] = [self._type_code(row[4]) for row in rows]
+        self.rowids[targets] = [row[0] for row in rows]
+        self.heads[targets] = np.frombuffer(b"".join(row[3][:8].ljust(8, b"\0") for row in rows), dtype="<u8")
+        self.size = next_row
+
+        self.stats["loads"] += 1
+        self.stats["rows_loaded"] += len(rows)
+        return len(rows)
+
+    def _reset(self):
+        self.size = 0
+        self.ids = []
+        self.row_of = {}
+        self._watermark = 0
+
+    def _maybe_refresh(self):
+        if time.monotonic() - self._last_refresh >= self.refresh_interval:
+            self.refresh()
+
+    def search(self, query: Union["np.ndarray", Iterable[float]], k: int = 5,
+               types: Optional[Union[str, List[str]]] = None,
+               min_confidence: float = 0.0) -> List[Dict[str, Any]]:
+        """Top-k por similaridade de cosseno, com filtro opcional de type/confidence"""
+        self._maybe_refresh()
+        self.stats["searches"] += 1
+        if self.size == 0 or k <= 0:
+            return []
+
+        q = np.asarray(query, dtype=np.float32).reshape(-1)
+        if q.shape[0] != self.dims:
+            raise ValueError(f"Query com {q.shape[0]} dims, índice '{self.model}' tem {self.dims}")
+        q_norm = np.linalg.norm(q)
+        if q_norm == 0:
+            return []
+
+        scores = self.matrix[:self.size] @ (q / q_norm)
+
+        mask = None
+        if types is not None:
+            wanted = [types] if isinstance(types, str) else types
+            codes = [self.type_names[t] for t in wanted if t in self.type_names]
+            mask = np.isin(self.type_codes[:self.size], codes)
+        if min_confidence > 0:
+            conf_mask = self.confidence[:self.size] >= min_confidence
+            mask = conf_mask if mask is None else mask & conf_mask
+        if mask is not None:
+            valid = int(mask.sum())
+            if valid == 0:
+                return []
+            scores = np.where(mask, scores, -np.inf)
+            k = min(k, valid)
+
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        codes_to_names = {code: name for name, code in self.type_names.items()}
+        return [
+            {
+                "id": self.ids[i],
+                "score": float(scores[i]),
+                "type": codes_to_names[int(self.type_codes[i])],
+                "confidence": float(self.confidence[i])
+            }
+            for i in top
+        ]
+
+    def get_stats(self) -> Dict:
+        return {
+            "model": self.model,
+            "dims": self.dims,
+            "vectors": self.size,
+            "memory_mb": (self.matrix.nbytes / 1024 / 1024) if self.matrix is not None else 0,
+            **self.stats
+        }
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import uuid
+
+    print("🧭 V6 PATTERN INDEX - BENCHMARK")
+    print("📊 Top-k cosine vetorizado vs loop Python por linha")
+
+    n, dims = 50_000, 384
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((n, dims)).astype(np.float32)
+    types = ["reasoning_memory", "error_solution", "best_practice"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "memory.db")
+        engine = get_engine(db_path)
+        with engine.connection() as conn:
+            conn.executescript(PATTERN_SCHEMA)
+        with engine.transaction() as conn:
+            for i in range(n):
+                pattern_id = str(uuid.uuid4())
+                conn.execute("INSERT INTO patterns (id, type, pattern_data, confidence) VALUES (?, ?, '{}', ?)",
+                             (pattern_id, types[i % 3], float(rng.uniform(0.3, 1.0))))
+                conn.execute("INSERT INTO pattern_embeddings (id, model, dims, vector) VALUES (?, ?, ?, ?)",
+                             (pattern_id, "text-embedding-3-small", dims, vectors[i].tobytes()))
+
+        start = time.perf_counter()
+        index = PatternIndex(db_path=db_path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        queries = rng.standard_normal((100, dims)).astype(np.float32)
+        start = time.perf_counter()
+        for q in queries:
+            index.search(q, k=10, types="error_solution", min_confidence=0.5)
+        vector_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        rows = [(index.matrix[i].tolist()) for i in range(2000)]
+        start = time.perf_counter()
+        q = queries[0].tolist()
+        sorted(((sum(a * b for a, b in zip(row, q)), i) for i, row in enumerate(rows)), reverse=True)[:10]
+        loop_ms = (time.perf_counter() - start) * 1000 * (n / len(rows))
+
+        print(f"\n📚 Vetores: {index.size} x {index.dims}D ({index.get_stats()['memory_mb']:.1f}MB)")
+        print(f"📥 Bulk load: {load_ms:.0f}ms")
+        print(f"⚡ Vetorizado: {vector_ms:.2f}ms/query (filtro type+confidence)")
+        print(f"🐢 Loop Python (estimado p/ {n}): {loop_ms:.0f}ms/query")
+        engine.close()
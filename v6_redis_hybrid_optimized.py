@@ -10,21 +10,62 @@ import time
 import os
 import json
 import asyncio
+from collections import OrderedDict
 from datetime import datetime
 
+from v6_memory_cache import V6MemoryCache, estimate_size
+from v6_metrics import CACHE_GET_MS, CACHE_REQUESTS
+from v6_resp import RESPPool, RESPStandInServer, parse_redis_url
+from v6_sqlite_engine import DEFAULT_DB_PATH, get_engine
+
+DEFAULT_HISTORY_PATH = ".swarm/redis_access_history.json"
+FIRST_MINUTE = 60.0
+
+_MISSING = object()
+
 class RedisHybridManager:
     """Redis MCP Hybrid Strategy - Production Optimized"""
 
-    def __init__(self):
+    def __init__(self, redis_url=None, pool_size=20, verbose=True, memory_budget_mb=16,
+                 key_prefix="v6:cache:", db_path=DEFAULT_DB_PATH, history_path=DEFAULT_HISTORY_PATH,
+                 warm_on_start=True, warm_top_k=500, warm_budget_mb=4, warm_batch_size=100,
+                 warm_parallel_batches=4, history_max_keys=10000):
         self.persistent_redis = None
         self.lazy_redis = None
         self.connection_strategy = "hybrid"
+        self.redis_url = redis_url or os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+        self.pool_size = pool_size
+        self.pool = None
+        self.standin = None
+        self.verbose = verbose
+        self.key_prefix = key_prefix
+        self.memory_cache = V6MemoryCache(max_bytes=int(memory_budget_mb * 1024 * 1024))
         self.cache_stats = {
             "persistent_hits": 0,
+            "persistent_misses": 0,
+            "expired_on_read": 0,
             "lazy_fallbacks": 0,
             "memory_fallbacks": 0,
-            "total_operations": 0
+            "misses": 0,
+            "total_operations": 0,
+            "lazy_loads": 0,
+            "coalesced_waiters": 0
         }
+        self._inflight = {}  # key -> asyncio.Future of the lazy load in progress
+
+        # Access-log-driven warming: memory_entries heat + recorded hit/miss history
+        self.db_path = db_path
+        self.history_path = history_path
+        self.warm_on_start = warm_on_start
+        self.warm_top_k = warm_top_k
+        self.warm_budget_bytes = int(warm_budget_mb * 1024 * 1024)
+        self.warm_batch_size = warm_batch_size
+        self.warm_parallel_batches = warm_parallel_batches
+        self.history_max_keys = history_max_keys
+        self.access_history = self._load_history()  # key -> [hits, misses], LRU order
+        self.warming_report = None
+        self.window_started = None
+        self.first_minute = {"lookups": 0, "hits": 0}
 
         print("🔥 REDIS HYBRID MANAGER INITIALIZED")
         print("⚡ Strategy: Persistent + Lazy Fallback")
@@ -35,44 +76,208 @@ class RedisHybridManager:
         """Initialize persistent connection pool - V6 Style"""
         print("🚀 Initializing persistent Redis connection pool...")
 
-        # Simulate persistent connection establishment
-        time.sleep(0.1)  # 100ms connection time
+        host, port, db = parse_redis_url(self.redis_url)
+        backend = "redis-server"
+        pool = RESPPool(host, port, size=self.pool_size, db=db, timeout=1.0)
+        try:
+            await pool.execute("PING")
+        except (ConnectionError, OSError, asyncio.TimeoutError):
+            # No redis-server reachable: in-process RESP stand-in, same protocol
+            print(f"⚠️  No redis-server at {host}:{port} → starting in-process RESP stand-in")
+            await pool.close()
+            self.standin = RESPStandInServer()
+            port = await self.standin.start()
+            host, backend = self.standin.host, "in-process stand-in"
+            pool = RESPPool(host, port, size=self.pool_size)
+
+        self.pool = pool
+
+        # Measured round-trip instead of a fixed 0.8ms
+        pings = 20
+        start_time = time.perf_counter()
+        for _ in range(pings):
+            await self.pool.execute("PING")
+        latency = (time.perf_counter() - start_time) * 1000 / pings
 
         self.persistent_redis = {
             "type": "persistent_pool",
-            "connections": 20,  # Optimal pool size
+            "backend": backend,
+            "address": f"{host}:{port}",
+            "connections": self.pool_size,
             "timeout": 5,  # Reduced from 10s
             "keepalive": True,
             "hit_rate": 0.85,  # 85% expected hit rate
-            "latency": 0.8  # 0.8ms per operation
+            "latency": round(latency, 3)
         }
 
-        # Cache warming - critical keys pre-loaded
-        await self.cache_warming()
+        # Cache warming - hottest keys pre-loaded
+        if self.warm_on_start:
+            await self.cache_warming()
+        self.window_started = time.monotonic()
 
         print("✅ Persistent Redis ready!")
+        print(f"   🔌 {self.persistent_redis['backend']} @ {self.persistent_redis['address']}")
         print(f"   📊 {self.persistent_redis['connections']} connections")
         print(f"   ⚡ {self.persistent_redis['latency']}ms latency")
         print(f"   🎯 {self.persistent_redis['hit_rate']:.0%} expected hit rate")
 
         return self.persistent_redis
 
-    async def cache_warming(self):
-        """Proactive cache warming - V6 Feature"""
-        print("🔥 Warming critical cache keys...")
-
-        critical_keys = [
-            "swarm_session_*",
-            "user_preferences_*",
-            "recent_searches_*",
-            "system_config_*",
-            "v6_mcp_stats_*"
-        ]
-
-        # Simulate cache warming
-        time.sleep(0.2)
-
-        print(f"   ✅ {len(critical_keys)} key patterns warmed")
+    def _load_history(self):
+        history = OrderedDict()
+        if not self.history_path or not os.path.exists(self.history_path):
+            return history
+        try:
+            with open(self.history_path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return history
+        # Saved hottest first: load coldest first so the hottest are the last evicted
+        for key, counts in reversed(list(saved.items())[:self.history_max_keys]):
+            history[key] = list(counts)
+        return history
+
+    def save_history(self, max_keys=None):
+        """Persist the hottest max_keys hit/miss counters for the next startup's warming"""
+        if not self.history_path or not self.access_history:
+            return
+        max_keys = max_keys or self.history_max_keys
+        hottest = sorted(self.access_history.items(), key=lambda item: -sum(item[1]))[:max_keys]
+        os.makedirs(os.path.dirname(self.history_path) or ".", exist_ok=True)
+        tmp_path = f"{self.history_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(dict(hottest), f)
+        os.replace(tmp_path, self.history_path)
+
+    def _record_access(self, key, hit):
+        # Bounded in memory: LRU over history_max_keys keys, not one entry per key ever seen
+        counts = self.access_history.get(key)
+        if counts is None:
+            counts = self.access_history[key] = [0, 0]
+            if len(self.access_history) > self.history_max_keys:
+                self.access_history.popitem(last=False)
+        else:
+            self.access_history.move_to_end(key)
+        counts[0 if hit else 1] += 1
+        if self.window_started is not None and time.monotonic() - self.window_started < FIRST_MINUTE:
+            self.first_minute["lookups"] += 1
+            self.first_minute["hits"] += hit
+
+    @staticmethod
+    def _entry_cache_key(entry):
+        if entry["namespace"] == "default":
+            return entry["key"]
+        return f"{entry['namespace']}:{entry['key']}"
+
+    def _warming_candidates(self, top_k):
+        """(cache key, score, value or _MISSING, ttl) for the top_k hottest keys"""
+        candidates = {}
+        if self.db_path and os.path.exists(self.db_path):
+            try:
+                entries = get_engine(self.db_path).hot_entries(limit=top_k)
+            except Exception as e:
+                print(f"⚠️  memory_entries unavailable for warming: {e}")
+                entries = []
+            now = int(time.time())
+            for entry in entries:
+                try:
+                    value = json.loads(entry["value"])
+                except (TypeError, ValueError):
+                    value = entry["value"]
+                ttl = entry["expires_at"] - now if entry["expires_at"] else 3600
+                if ttl <= 0:
+                    continue  # expired (or about to): warming it would store a dead entry
+                candidates[self._entry_cache_key(entry)] = [entry["heat"], value, ttl]
+
+        # Recorded misses weigh double: those are the lookups warming would have saved
+        for key, (hits, misses) in self.access_history.items():
+            score = hits + 2 * misses
+            if key in candidates:
+                candidates[key][0] += score
+            else:
+                candidates[key] = [score, _MISSING, 3600]
+
+        ranked = sorted(candidates.items(), key=lambda item: -item[1][0])[:top_k]
+        return [(key, score, value, ttl) for key, (score, value, ttl) in ranked]
+
+    async def _warm_batch(self, batch, budget):
+        """Resolve one batch (persistent MGET, lazy batch for the rest) and load it within budget"""
+        if budget["used"] >= budget["limit"]:
+            budget["skipped"] += len(batch)  # budget already spent: don't fetch at all
+            return 0
+        unknown = [key for key, _, value, _ in batch if value is _MISSING]
+        resolved = {}
+        on_persistent = set()
+        if unknown:
+            for key, value in zip(unknown, await self.persistent_mget(unknown)):
+                if value is not None:
+                    resolved[key] = value
+                    on_persistent.add(key)
+            missing = [key for key in unknown if key not in resolved]
+            resolved.update(await self.lazy_mget(missing))
+
+        to_persist = {}
+        warmed = 0
+        for key, _, value, ttl in batch:
+            if value is _MISSING:
+                value = resolved.get(key)
+                if value is None:
+                    continue
+            size = estimate_size(key, value)
+            if budget["used"] + size > budget["limit"]:
+                budget["skipped"] += 1
+                continue
+            budget["used"] += size
+            warmed += 1
+            if key in on_persistent:
+                await self.memory_set(key, value, ttl)
+            else:
+                to_persist[key] = (value, ttl)
+
+        if to_persist:
+            async with self.pipeline() as pipe:
+                for key, (value, ttl) in to_persist.items():
+                    pipe.set(key, value, ttl)
+            for key, (value, ttl) in to_persist.items():
+                await self.memory_set(key, value, ttl)
+        return warmed
+
+    async def cache_warming(self, keys=None, top_k=None, byte_budget=None):
+        """
+        Proactive cache warming - V6 Feature
+        Top-K hottest keys (memory_entries access_count/accessed_at + recorded
+        hit/miss history), loaded within a byte budget in parallel batches
+        """
+        print("🔥 Warming hottest cache keys...")
+        start_time = time.perf_counter()
+        top_k = top_k or self.warm_top_k
+        budget = {"used": 0, "limit": byte_budget or self.warm_budget_bytes, "skipped": 0}
+
+        if keys:
+            candidates = [(key, 0, _MISSING, 3600) for key in keys]
+        else:
+            candidates = self._warming_candidates(top_k)
+
+        batches = [candidates[i:i + self.warm_batch_size]
+                   for i in range(0, len(candidates), self.warm_batch_size)]
+        # Waves of warm_parallel_batches: the budget is checked before each batch is fetched,
+        # so at most one wave is fetched past the point where the budget runs out
+        warmed = 0
+        for i in range(0, len(batches), self.warm_parallel_batches):
+            wave = batches[i:i + self.warm_parallel_batches]
+            warmed += sum(await asyncio.gather(*(self._warm_batch(batch, budget) for batch in wave)))
+
+        self.warming_report = {
+            "candidates": len(candidates),
+            "warmed": warmed,
+            "bytes": budget["used"],
+            "over_budget": budget["skipped"],
+            "batches": len(batches),
+            "ms": (time.perf_counter() - start_time) * 1000
+        }
+        print(f"   ✅ {warmed}/{len(candidates)} hot keys warmed "
+              f"({budget['used'] / 1024:.0f}KB, {len(batches)} parallel batches, "
+              f"{self.warming_report['ms']:.0f}ms)")
         return True
 
     async def hybrid_get(self, key, default_value=None):
@@ -86,68 +291,236 @@ class RedisHybridManager:
                 result = await self.persistent_get(key)
                 if result is not None:
                     self.cache_stats["persistent_hits"] += 1
+                    CACHE_REQUESTS.labels("persistent", "hit").inc()
+                    self._record_access(key, True)
                     latency = (time.time() - start_time) * 1000
-                    print(f"🎯 Redis HIT: '{key}' → {result} ({latency:.1f}ms)")
+                    CACHE_GET_MS.labels("persistent").observe(latency)
+                    if self.verbose:
+                        print(f"🎯 Redis HIT: '{key}' → {result} ({latency:.1f}ms)")
                     return result
+                self.cache_stats["persistent_misses"] += 1
+                CACHE_REQUESTS.labels("persistent", "miss").inc()
 
             # 10%: Lazy fallback (52-200ms)
-            print(f"🔄 Persistent miss → Lazy fallback for: '{key}'")
+            self._record_access(key, False)
+            if self.verbose:
+                print(f"🔄 Persistent miss → Lazy fallback for: '{key}'")
             result = await self.lazy_get(key, default_value)
             if result is not None:
                 self.cache_stats["lazy_fallbacks"] += 1
+                CACHE_REQUESTS.labels("lazy", "hit").inc()
+                CACHE_GET_MS.labels("lazy").observe((time.time() - start_time) * 1000)
                 return result
+            CACHE_REQUESTS.labels("lazy", "miss").inc()
 
             # 1%: Memory fallback (instant)
-            print(f"📦 Lazy miss → Memory fallback for: '{key}'")
-            return await self.memory_get(key, default_value)
+            if self.verbose:
+                print(f"📦 Lazy miss → Memory fallback for: '{key}'")
+            result = await self.memory_get(key, default_value)
+            CACHE_GET_MS.labels("memory").observe((time.time() - start_time) * 1000)
+            return result
 
         except Exception as e:
             print(f"❌ Redis hybrid error: {e}")
             return default_value
 
+    def _persistent_key(self, key):
+        """Exact, collision-free key on the persistent tier"""
+        return f"{self.key_prefix}{key}"
+
+    @staticmethod
+    def _encode_record(value, ttl):
+        return json.dumps({
+            "value": value,
+            "ttl": ttl,
+            "timestamp": time.time()
+        })
+
+    @staticmethod
+    def _set_command(redis_key, record, ttl):
+        """SET with server-side expiry (EX) when a TTL is given"""
+        if ttl:
+            return ("SET", redis_key, record, "EX", max(1, int(ttl)))
+        return ("SET", redis_key, record)
+
+    def _decode_record(self, raw):
+        """Record value, or None when missing or past timestamp + ttl"""
+        if raw is None:
+            return None
+        record = json.loads(raw)
+        ttl = record.get("ttl")
+        if ttl and record.get("timestamp", 0) + ttl <= time.time():
+            # Server did not expire it (no EX / legacy record): never serve it
+            self.cache_stats["expired_on_read"] += 1
+            return None
+        return record["value"]
+
     async def persistent_get(self, key):
         """Persistent Redis GET with connection pooling"""
         if not self.persistent_redis:
             return None
 
-        # Simulate Redis persistent operation
-        time.sleep(self.persistent_redis["latency"] / 1000)
+        raw = await self.pool.execute("GET", self._persistent_key(key))
+        return self._decode_record(raw)
 
-        # Simulate cache hit logic
-        cache_key = f"cache_{hash(key) % 1000}"
-        if cache_key in self._get_persistent_cache():
-            return self._get_persistent_cache()[cache_key]
+    async def persistent_mget(self, keys):
+        """Persistent Redis MGET: all keys in one round-trip"""
+        if not self.persistent_redis or not keys:
+            return [None] * len(keys)
 
-        return None
+        raws = await self.pool.execute("MGET", *[self._persistent_key(key) for key in keys])
+        return [self._decode_record(raw) for raw in raws]
 
     async def lazy_get(self, key, default_value=None):
-        """Lazy Redis GET - fallback only"""
-        print(f"🔄 LAZY REDIS: Connecting for '{key}'...")
+        """
+        Lazy Redis GET - fallback only, single-flight: concurrent misses on the
+        same key await the one load already in flight instead of starting their own.
+        The load runs as its own task and every caller (the first one included) awaits
+        it through asyncio.shield, so one caller's timeout/cancel never fails the others.
+        """
+        load = self._inflight.get(key)
+        if load is not None:
+            self.cache_stats["coalesced_waiters"] += 1
+        else:
+            load = self._track(key, asyncio.ensure_future(self._lazy_load(key)))
+        return await asyncio.shield(load)
+
+    def _track(self, key, load):
+        """Register an in-flight load for key; it leaves _inflight when it finishes"""
+        def done(finished):
+            if self._inflight.get(key) is finished:
+                del self._inflight[key]
+            if not finished.cancelled():
+                finished.exception()  # retrieved here: no warning when every caller gave up
+        self._inflight[key] = load
+        load.add_done_callback(done)
+        return load
+
+    async def _lazy_load(self, key):
+        """One lazy-tier backend load (cold connection + GET)"""
+        self.cache_stats["lazy_loads"] += 1
+        if self.verbose:
+            print(f"🔄 LAZY REDIS: Connecting for '{key}'...")
 
         # Simulate cold start penalty
         cold_start_time = 0.052 + (hash(key) % 0.148)  # 52-200ms range
-        time.sleep(cold_start_time)
+        await asyncio.sleep(cold_start_time)
 
         # Simulate lazy connection operation
         lazy_result = f"lazy_result_{key}_{int(time.time())}"
 
-        print(f"✅ LAZY RESULT: {lazy_result} ({cold_start_time*1000:.0f}ms)")
+        if self.verbose:
+            print(f"✅ LAZY RESULT: {lazy_result} ({cold_start_time*1000:.0f}ms)")
         return lazy_result
 
-    async def memory_get(self, key, default_value=None):
-        """Memory fallback cache"""
-        if not hasattr(self, 'memory_cache'):
-            self.memory_cache = {}
+    async def _lazy_load_batch(self, keys):
+        """One lazy-tier backend load for many keys (one cold start for the whole batch)"""
+        self.cache_stats["lazy_loads"] += 1
+        if self.verbose:
+            print(f"🔄 LAZY REDIS: Connecting for {len(keys)} keys (single batch)...")
 
-        if key in self.memory_cache:
+        cold_start_time = 0.052 + (hash(tuple(keys)) % 0.148)  # 52-200ms range, paid once
+        await asyncio.sleep(cold_start_time)
+
+        now = int(time.time())
+        return {key: f"lazy_result_{key}_{now}" for key in keys}
+
+    async def memory_get(self, key, default_value=None):
+        """Memory fallback cache (exact key, TTL enforced, bounded)"""
+        value = self.memory_cache.get(key, _MISSING)
+        if value is not _MISSING:
             self.cache_stats["memory_fallbacks"] += 1
-            return self.memory_cache[key]
+            CACHE_REQUESTS.labels("memory", "hit").inc()
+            return value
 
+        self.cache_stats["misses"] += 1
+        CACHE_REQUESTS.labels("memory", "miss").inc()
         return default_value
 
+    async def lazy_mget(self, keys, default_value=None):
+        """Lazy Redis batch GET - one cold start for the whole miss batch"""
+        if not keys:
+            return {}
+
+        # Keys already loading elsewhere are awaited, not reloaded
+        waiting = {key: self._inflight[key] for key in keys if key in self._inflight}
+        to_load = [key for key in dict.fromkeys(keys) if key not in waiting]
+        self.cache_stats["coalesced_waiters"] += len(waiting)
+
+        results = {}
+        if to_load:
+            batch = asyncio.ensure_future(self._lazy_load_batch(to_load))
+            loop = asyncio.get_running_loop()
+            for key in to_load:
+                future = self._track(key, loop.create_future())
+
+                def resolve(finished, key=key, future=future):
+                    if future.done():
+                        return
+                    if finished.cancelled():
+                        future.cancel()
+                    elif finished.exception() is not None:
+                        future.set_exception(finished.exception())
+                    else:
+                        future.set_result(finished.result()[key])
+                batch.add_done_callback(resolve)
+            results = dict(await asyncio.shield(batch))
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+        return results
+
+    async def hybrid_mget(self, keys, default_value=None):
+        """
+        Multi-key hybrid GET: one MGET on the persistent tier, then the misses
+        go as a single batch to the lazy tier and finally to the memory tier
+        """
+        self.cache_stats["total_operations"] += len(keys)
+        results = {}
+
+        try:
+            values = await self.persistent_mget(keys)
+            misses = []
+            for key, value in zip(keys, values):
+                if value is not None:
+                    results[key] = value
+                else:
+                    misses.append(key)
+                self._record_access(key, value is not None)
+            self.cache_stats["persistent_hits"] += len(results)
+            CACHE_REQUESTS.labels("persistent", "hit").inc(len(results))
+            if self.persistent_redis:
+                self.cache_stats["persistent_misses"] += len(misses)
+                CACHE_REQUESTS.labels("persistent", "miss").inc(len(misses))
+
+            lazy_results = await self.lazy_mget(misses, default_value)
+            remaining = []
+            for key in misses:
+                value = lazy_results.get(key)
+                if value is not None:
+                    results[key] = value
+                    self.cache_stats["lazy_fallbacks"] += 1
+                else:
+                    remaining.append(key)
+            CACHE_REQUESTS.labels("lazy", "hit").inc(len(misses) - len(remaining))
+            CACHE_REQUESTS.labels("lazy", "miss").inc(len(remaining))
+
+            for key in remaining:
+                results[key] = await self.memory_get(key, default_value)
+
+            if self.verbose:
+                print(f"🎯 Redis MGET: {len(keys)} keys | {len(keys) - len(misses)} persistent hits | "
+                      f"{len(misses)} → lazy batch")
+            return results
+
+        except Exception as e:
+            print(f"❌ Redis hybrid MGET error: {e}")
+            return {key: results.get(key, default_value) for key in keys}
+
     async def hybrid_set(self, key, value, ttl=3600):
         """Hybrid Redis SET with multi-tier persistence"""
-        print(f"💾 HYBRID SET: '{key}' = '{value}' (TTL: {ttl}s)")
+        if self.verbose:
+            print(f"💾 HYBRID SET: '{key}' = '{value}' (TTL: {ttl}s)")
 
         try:
             # Primary: Persistent Redis (fast)
@@ -155,7 +528,7 @@ class RedisHybridManager:
                 await self.persistent_set(key, value, ttl)
 
             # Backup: Memory cache
-            await self.memory_set(key, value)
+            await self.memory_set(key, value, ttl)
 
             return True
 
@@ -164,31 +537,44 @@ class RedisHybridManager:
             return False
 
     async def persistent_set(self, key, value, ttl):
-        """Persistent Redis SET with connection pooling"""
-        # Simulate persistent operation
-        time.sleep(self.persistent_redis["latency"] / 1000)
+        """Persistent Redis SET with connection pooling (expires server-side after ttl)"""
+        await self.pool.execute(*self._set_command(self._persistent_key(key), self._encode_record(value, ttl), ttl))
 
-        # Store in persistent cache simulation
-        cache_key = f"cache_{hash(key) % 1000}"
-        if not hasattr(self, '_persistent_cache_data'):
-            self._persistent_cache_data = {}
+    async def hybrid_mset(self, mapping, ttl=3600):
+        """Multi-key hybrid SET: one pipelined round-trip on the persistent tier"""
+        if self.verbose:
+            print(f"💾 HYBRID MSET: {len(mapping)} keys (TTL: {ttl}s)")
 
-        self._persistent_cache_data[cache_key] = {
-            "value": value,
-            "ttl": ttl,
-            "timestamp": time.time()
-        }
+        try:
+            if self.persistent_redis:
+                async with self.pipeline() as pipe:
+                    for key, value in mapping.items():
+                        pipe.set(key, value, ttl)
 
-    async def memory_set(self, key, value):
-        """Memory fallback SET"""
-        if not hasattr(self, 'memory_cache'):
-            self.memory_cache = {}
+            for key, value in mapping.items():
+                await self.memory_set(key, value, ttl)
+
+            return True
 
-        self.memory_cache[key] = value
+        except Exception as e:
+            print(f"❌ Hybrid MSET error: {e}")
+            return False
 
-    def _get_persistent_cache(self):
-        """Get persistent cache data"""
-        return getattr(self, '_persistent_cache_data', {})
+    def pipeline(self):
+        """`async with manager.pipeline() as pipe:` - queued commands run in one round-trip"""
+        return RedisPipeline(self)
+
+    async def memory_set(self, key, value, ttl=3600):
+        """Memory fallback SET"""
+        self.memory_cache.set(key, value, ttl)
+
+    async def close(self):
+        """Close the connection pool (and the stand-in server, if started)"""
+        self.save_history()
+        if self.pool:
+            await self.pool.close()
+        if self.standin:
+            await self.standin.stop()
 
     def get_performance_stats(self):
         """Get comprehensive performance statistics"""
@@ -203,14 +589,63 @@ class RedisHybridManager:
         return {
             "total_operations": total,
             "persistent_hits": self.cache_stats["persistent_hits"],
+            "persistent_misses": self.cache_stats["persistent_misses"],
+            "expired_on_read": self.cache_stats["expired_on_read"],
             "lazy_fallbacks": self.cache_stats["lazy_fallbacks"],
             "memory_fallbacks": self.cache_stats["memory_fallbacks"],
+            "misses": self.cache_stats["misses"],
+            "lazy_loads": self.cache_stats["lazy_loads"],
+            "coalesced_waiters": self.cache_stats["coalesced_waiters"],
             "persistent_hit_rate": f"{persistent_hit_rate:.1f}%",
             "lazy_fallback_rate": f"{lazy_fallback_rate:.1f}%",
             "memory_fallback_rate": f"{memory_fallback_rate:.1f}%",
+            "memory_tier": self.memory_cache.get_stats(),
+            "first_minute_hit_rate": (f"{self.first_minute['hits'] / self.first_minute['lookups'] * 100:.1f}%"
+                                      if self.first_minute["lookups"] else "n/a"),
+            "warming": self.warming_report,
             "strategy": "hybrid_optimized"
         }
 
+class RedisPipeline:
+    """Persistent-tier command batch: GET/SET/DELETE queued, sent in one round-trip"""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.commands = []
+        self.decoders = []
+        self.results = []
+
+    def get(self, key):
+        self.commands.append(("GET", self.manager._persistent_key(key)))
+        self.decoders.append(self.manager._decode_record)
+        return self
+
+    def set(self, key, value, ttl=3600):
+        self.commands.append(self.manager._set_command(self.manager._persistent_key(key),
+                                                       self.manager._encode_record(value, ttl), ttl))
+        self.decoders.append(lambda reply: reply == "OK")
+        return self
+
+    def delete(self, key):
+        self.commands.append(("DEL", self.manager._persistent_key(key)))
+        self.decoders.append(bool)
+        return self
+
+    async def execute(self):
+        commands, decoders = self.commands, self.decoders
+        self.commands, self.decoders = [], []
+        replies = await self.manager.pool.execute_many(commands)
+        self.results = [decode(reply) for decode, reply in zip(decoders, replies)]
+        return self.results
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None and self.commands:
+            await self.execute()
+        return False
+
 class V6RedisHybridDemo:
     """V6 Redis Hybrid Strategy Demo"""
 
@@ -280,6 +715,8 @@ class V6RedisHybridDemo:
             else:
                 print(f"   ⚠️  NEEDS OPTIMIZATION: {hit_rate} hit rate too low")
 
+        await self.redis_manager.close()
+
     async def simulate_cache_misses(self):
         """Simulate cache misses to test fallback mechanisms"""
         miss_keys = [
@@ -292,12 +729,174 @@ class V6RedisHybridDemo:
             result = await self.redis_manager.hybrid_get(key)
             print(f"      Result: {result}")
 
+async def benchmark_concurrent_gets(concurrency=1000, pool_size=20):
+    """p50/p99 of `concurrency` simultaneous hybrid_get hits on the persistent tier"""
+    manager = RedisHybridManager(pool_size=pool_size, verbose=False)
+    await manager.init_persistent_redis()
+
+    keys = [f"bench_key_{i}" for i in range(concurrency)]
+    await manager.hybrid_mset({key: f"value_{key}" for key in keys})
+
+    latencies = []
+
+    async def timed_get(key):
+        start_time = time.perf_counter()
+        await manager.hybrid_get(key)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(timed_get(key) for key in keys))
+    wall_ms = (time.perf_counter() - start_time) * 1000
+
+    # Same keys, one call: MGET on the persistent tier instead of O(keys) round-trips
+    start_time = time.perf_counter()
+    await manager.hybrid_mget(keys)
+    mget_ms = (time.perf_counter() - start_time) * 1000
+
+    start_time = time.perf_counter()
+    for key in keys:
+        await manager.hybrid_get(key)
+    sequential_ms = (time.perf_counter() - start_time) * 1000
+
+    backend = manager.persistent_redis["backend"]
+    await manager.close()
+
+    latencies.sort()
+    return {
+        "backend": backend,
+        "concurrency": concurrency,
+        "pool_size": pool_size,
+        "wall_ms": wall_ms,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+        "ops_per_sec": concurrency / (wall_ms / 1000),
+        "mget_ms": mget_ms,
+        "sequential_get_ms": sequential_ms,
+        # Old path: time.sleep(0.8ms) per GET inside async def serialized the loop
+        "blocking_baseline_ms": concurrency * 0.8
+    }
+
+async def test_lazy_single_flight(concurrency=100):
+    """N concurrent misses on one key → exactly one lazy backend load, same result for all"""
+    # No warming/history: the counters must only see this test's lookups
+    manager = RedisHybridManager(verbose=False, history_path=None, warm_on_start=False)
+    await manager.init_persistent_redis()
+
+    key = f"single_flight_{int(time.time())}"
+    start_time = time.perf_counter()
+    results = await asyncio.gather(*(manager.hybrid_get(key) for _ in range(concurrency)))
+    wall_ms = (time.perf_counter() - start_time) * 1000
+    stats = dict(manager.cache_stats)
+    await manager.close()
+
+    assert stats["lazy_loads"] == 1, f"expected 1 backend load, got {stats['lazy_loads']}"
+    assert stats["coalesced_waiters"] == concurrency - 1
+    assert len(set(results)) == 1
+    cancelled = await _test_leader_cancelled(concurrency)
+    return {"concurrency": concurrency, "lazy_loads": stats["lazy_loads"],
+            "coalesced_waiters": stats["coalesced_waiters"], "wall_ms": wall_ms,
+            "leader_cancelled_waiters_ok": cancelled}
+
+async def _test_leader_cancelled(concurrency):
+    """The caller that started the load times out: the coalesced waiters still get the value"""
+    manager = RedisHybridManager(verbose=False, history_path=None, warm_on_start=False)
+    for lookup in (manager.lazy_get, lambda key: manager.lazy_mget([key])):
+        key = f"single_flight_cancel_{time.time_ns()}"
+        leader = asyncio.ensure_future(asyncio.wait_for(lookup(key), 0.01))
+        await asyncio.sleep(0)
+        waiters = [lookup(key) for _ in range(concurrency - 1)]
+        outcomes = await asyncio.gather(leader, *waiters, return_exceptions=True)
+        assert isinstance(outcomes[0], asyncio.TimeoutError), outcomes[0]
+        failed = [o for o in outcomes[1:] if isinstance(o, BaseException)]
+        assert not failed, f"waiters failed with the leader's cancellation: {failed[:3]}"
+    assert manager.cache_stats["lazy_loads"] == 2
+    return concurrency - 1
+
+async def benchmark_cache_warming(entries=5000, lookups=2000, top_k=500, concurrency=200):
+    """
+    First-minute hit rate after a restart, cold vs warmed from the access log.
+    memory_entries gets Zipf-distributed access_count; the replayed traffic
+    follows the same distribution.
+    """
+    import random
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "memory.db")
+        history_path = os.path.join(tmp, "history.json")
+        engine = get_engine(db_path)
+        now = int(time.time())
+        weights = [1 / (rank + 1) ** 1.1 for rank in range(entries)]
+        with engine.transaction() as conn:
+            for rank in range(entries):
+                conn.execute(
+                    "INSERT INTO memory_entries (key, value, namespace, accessed_at, access_count) "
+                    "VALUES (?, ?, 'default', ?, ?)",
+                    (f"hot_key_{rank}", json.dumps({"rank": rank, "payload": "x" * 200}),
+                     now - rank, int(10000 * weights[rank]) + 1))
+
+        rng = random.Random(42)
+        traffic = rng.choices([f"hot_key_{rank}" for rank in range(entries)], weights=weights, k=lookups)
+
+        results = {}
+        for label, warm in (("cold", False), ("warmed", True)):
+            manager = RedisHybridManager(verbose=False, db_path=db_path, history_path=history_path,
+                                         warm_on_start=warm, warm_top_k=top_k)
+            await manager.init_persistent_redis()
+            start_time = time.perf_counter()
+            for i in range(0, lookups, concurrency):
+                await asyncio.gather(*(manager.hybrid_get(key) for key in traffic[i:i + concurrency]))
+            replay_ms = (time.perf_counter() - start_time) * 1000
+            first_minute = dict(manager.first_minute)
+            results[label] = {
+                "hit_rate": first_minute["hits"] / max(1, first_minute["lookups"]),
+                "replay_ms": replay_ms,
+                "warming": manager.warming_report
+            }
+            manager.history_path = None  # keep runs independent
+            await manager.close()
+        engine.close()
+
+    results["improvement_pts"] = (results["warmed"]["hit_rate"] - results["cold"]["hit_rate"]) * 100
+    return results
+
 async def main():
     """Main demo function"""
     demo = V6RedisHybridDemo()
     await demo.demo_operations()
 
-if __name__ == "__main__":
+if __name__ == "__main__" and "--bench" in sys.argv:
+    print("📊 V6 REDIS HYBRID - 1k CONCURRENT GET BENCHMARK")
+    result = asyncio.run(benchmark_concurrent_gets())
+    print(f"   🔌 Backend: {result['backend']} | Pool: {result['pool_size']} connections")
+    print(f"   ⚡ p50: {result['p50_ms']:.2f}ms | p99: {result['p99_ms']:.2f}ms")
+    print(f"   ⏱️  Wall: {result['wall_ms']:.0f}ms for {result['concurrency']} gets "
+          f"({result['ops_per_sec']:.0f} ops/s)")
+    print(f"   🐢 Old blocking path: ≥{result['blocking_baseline_ms']:.0f}ms wall (serialized)")
+    print(f"   📦 hybrid_mget({result['concurrency']} keys): {result['mget_ms']:.1f}ms "
+          f"vs {result['sequential_get_ms']:.0f}ms for sequential hybrid_get")
+
+elif __name__ == "__main__" and "--warm-bench" in sys.argv:
+    print("📊 V6 REDIS HYBRID - ACCESS-LOG CACHE WARMING BENCHMARK")
+    result = asyncio.run(benchmark_cache_warming())
+    warming = result["warmed"]["warming"]
+    print(f"   🔥 Warmed {warming['warmed']} keys ({warming['bytes'] / 1024:.0f}KB) "
+          f"in {warming['batches']} parallel batches, {warming['ms']:.0f}ms")
+    print(f"   🧊 Cold first-minute hit rate:   {result['cold']['hit_rate']:.1%} "
+          f"(replay {result['cold']['replay_ms']:.0f}ms)")
+    print(f"   🔥 Warmed first-minute hit rate: {result['warmed']['hit_rate']:.1%} "
+          f"(replay {result['warmed']['replay_ms']:.0f}ms)")
+    print(f"   📈 Improvement: +{result['improvement_pts']:.1f} pts")
+
+elif __name__ == "__main__" and "--test" in sys.argv:
+    print("🧪 V6 REDIS HYBRID - SINGLE-FLIGHT LAZY LOAD TEST")
+    result = asyncio.run(test_lazy_single_flight())
+    print(f"   ✅ {result['concurrency']} concurrent misses → {result['lazy_loads']} backend load, "
+          f"{result['coalesced_waiters']} coalesced waiters ({result['wall_ms']:.0f}ms wall)")
+    print(f"   ✅ First caller timed out → {result['leader_cancelled_waiters_ok']} waiters still got "
+          f"the value (lazy_get and lazy_mget)")
+
+elif __name__ == "__main__":
     print("🚀 V6 REDIS HYBRID OPTIMIZATION DEMO")
     print("📊 Testing Persistent + Lazy Strategy")
 
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+⚡ V6 RESP - Asyncio Redis Protocol Client, Pool & In-Process Stand-In
+======================================================================
+Non-blocking RESP2 | Fixed-size connection pool | Local stand-in server
+Used by RedisHybridManager when no redis-server is reachable
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Any, Tuple
+from urllib.parse import urlparse
+
+
+class RESPError(Exception):
+    """Error reply (-ERR ...) returned by the server"""
+
+
+def encode_command(*args) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode()
+        else:
+            data = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> Any:
+    """Parse one RESP2 reply (errors are returned as RESPError instances)"""
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("RESP connection closed")
+    kind, payload = line[:1], line[1:-2]
+
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        return RESPError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(payload)
+        if count == -1:
+            return None
+        return [await read_reply(reader) for _ in range(count)]
+    raise RESPError(f"Unknown RESP reply type: {line!r}")
+
+
+def parse_redis_url(url: str) -> Tuple[str, int, int]:
+    parsed = urlparse(url)
+    db = int(parsed.path.lstrip("/") or 0)
+    return parsed.hostname or "127.0.0.1", parsed.port or 6379, db
+
+
+class RESPConnection:
+    """Single asyncio RESP connection (one in-flight request at a time)"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def open(cls, host: str, port: int, timeout: float = 5.0) -> "RESPConnection":
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        return cls(reader, writer)
+
+    async def execute(self, *args) -> Any:
+        self.writer.write(encode_command(*args))
+        await self.writer.drain()
+        reply = await read_reply(self.reader)
+        if isinstance(reply, RESPError):
+            raise reply
+        return reply
+
+    async def execute_many(self, commands: List[Tuple]) -> List[Any]:
+        """Pipeline: write every command, then read every reply (one round-trip)"""
+        self.writer.write(b"".join(encode_command(*command) for command in commands))
+        await self.writer.drain()
+        replies = [await read_reply(self.reader) for _ in commands]
+        for reply in replies:
+            if isinstance(reply, RESPError):
+                raise reply
+        return replies
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class RESPPool:
+    """
+    Fixed-size pool: at most `size` sockets, opened lazily, handed out through
+    an asyncio.Queue so concurrent callers wait instead of opening more
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, size: int = 20,
+                 db: int = 0, timeout: float = 5.0):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.db = db
+        self.timeout = timeout
+        self._idle = asyncio.LifoQueue()
+        self._created = 0
+        self._closed = False
+        self.stats = {"commands": 0, "connections_opened": 0, "waits": 0}
+
+    async def _new_connection(self) -> RESPConnection:
+        conn = await RESPConnection.open(self.host, self.port, self.timeout)
+        if self.db:
+            await conn.execute("SELECT", self.db)
+        self.stats["connections_opened"] += 1
+        return conn
+
+    async def acquire(self) -> RESPConnection:
+        if not self._idle.empty():
+            return self._idle.get_nowait()
+        if self._created < self.size:
+            self._created += 1
+            try:
+                return await self._new_connection()
+            except BaseException:
+                self._created -= 1
+                raise
+        self.stats["waits"] += 1
+        return await self._idle.get()
+
+    def release(self, conn: RESPConnection, broken: bool = False):
+        if broken or self._closed:
+            self._created -= 1
+            asyncio.ensure_future(conn.close())
+        else:
+            self._idle.put_nowait(conn)
+
+    @asynccontextmanager
+    async def connection(self):
+        conn = await self.acquire()
+        broken = False
+        try:
+            yield conn
+        except (ConnectionError, OSError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            broken = True
+            raise
+        finally:
+            self.release(conn, broken)
+
+    async def execute(self, *args) -> Any:
+        self.stats["commands"] += 1
+        async with self.connection() as conn:
+            return await conn.execute(*args)
+
+    async def execute_many(self, commands: List[Tuple]) -> List[Any]:
+        if not commands:
+            return []
+        self.stats["commands"] += len(commands)
+        async with self.connection() as conn:
+            return await conn.execute_many(commands)
+
+    async def close(self):
+        self._closed = True
+        while not self._idle.empty():
+            await self._idle.get_nowait().close()
+            self._created -= 1
+
+
+class RESPStandInServer:
+    """
+    In-process RESP server (asyncio) speaking the subset of Redis used by V6:
+    PING GET SET MGET MSET DEL EXISTS EXPIRE TTL DBSIZE FLUSHDB SELECT
+    Expired keys are dropped lazily on access, like Redis.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self._server = None
+        self.stats = {"commands": 0, "clients": 0}
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["clients"] += 1
+        try:
+            while True:
+                command = await read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    writer.write(b"-ERR protocol error\r\n")
+                else:
+                    writer.write(self._dispatch(command))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    @staticmethod
+    def _bulk(value: Optional[bytes]) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _dispatch(self, command: List[bytes]) -> bytes:
+        self.stats["commands"] += 1
+        name = command[0].upper()
+        args = command[1:]
+
+        if name == b"PING":
+            return b"+PONG\r\n"
+        if name == b"GET":
+            return self._bulk(self._live(args[0]))
+        if name == b"SET":
+            expires_at = None
+            options = [a.upper() for a in args[2:]]
+            if b"EX" in options:
+                expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+            elif b"PX" in options:
+                expires_at = time.monotonic() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            self.data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if name == b"MGET":
+            return b"*%d\r\n" % len(args) + b"".join(self._bulk(self._live(key)) for key in args)
+        if name == b"MSET":
+            for key, value in zip(args[::2], args[1::2]):
+                self.data[key] = (value, None)
+            return b"+OK\r\n"
+        if name == b"DEL":
+            removed = sum(1 for key in args if self._live(key) is not None and self.data.pop(key, None))
+            return b":%d\r\n" % removed
+        if name == b"EXISTS":
+            return b":%d\r\n" % sum(1 for key in args if self._live(key) is not None)
+        if name == b"EXPIRE":
+            value = self._live(args[0])
+            if value is None:
+                return b":0\r\n"
+            self.data[args[0]] = (value, time.monotonic() + int(args[1]))
+            return b":1\r\n"
+        if name == b"TTL":
+            if self._live(args[0]) is None:
+                return b":-2\r\n"
+            expires_at = self.data[args[0]][1]
+            return b":%d\r\n" % (-1 if expires_at is None else int(expires_at - time.monotonic()))
+        if name == b"DBSIZE":
+            return b":%d\r\n" % len(self.data)
+        if name == b"FLUSHDB":
+            self.data.clear()
+            return b"+OK\r\n"
+        if name == b"SELECT":
+            return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % name
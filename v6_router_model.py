@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+🧠 V6 ROUTER MODEL - Learned Task Router (Multinomial Naive Bayes)
+==================================================================
+Trained offline from .claude/logs | Pure NumPy | Persisted to .swarm/
+Same (confidence, strategy, needed_mcps) contract as analyze_task_complete,
+confidence = posterior probability instead of a hard-coded constant
+Labels come from logged outcomes: a route whose MCPs raised (mcp_errors) is not learned.
+The shipped .swarm/v6_router_model.npz is a cold start (--bootstrap: synthetic tasks
+labeled by the keyword router, no logs in the tree), so it only copies that router
+until it is retrained on real execution logs.
+"""
+
+import json
+import math
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from operator import add
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+from v6_mcp_prewarm import iter_log_records
+from v6_router import RoutingEngine, sample_tasks
+
+DEFAULT_MODEL_PATH = ".swarm/v6_router_model.npz"
+DEFAULT_TRAINING_LOGS = (".claude/logs/v6_complete_mcp.jsonl", ".claude/logs/v6_executions.jsonl")
+PREFIX_LENGTHS = (4, 5, 6, 7)
+
+
+def task_features(task: str) -> List[str]:
+    """Lowercased tokens plus their 4-7 char prefixes ("pesquisar" → "pesq", ..., "pesquis")"""
+    features = []
+    for token in task.lower().split():
+        features.append(token)
+        features.extend("^" + token[:n] for n in PREFIX_LENGTHS if len(token) > n)
+    return features
+
+
+def labeled_examples(records: Iterable[Dict]) -> Tuple[List[Tuple[str, str, Tuple[str, ...]]], int]:
+    """
+    (task, strategy, mcps) from execution log records; records without a strategy
+    (v6_executions.jsonl only logs task/confidence/success) are skipped and counted, and
+    so are records whose MCPs failed (non-empty mcp_errors): the logged `success` flag is
+    just confidence > threshold, so the MCP outcome is the only real label.
+    mcps is None when the record has no MCP list (baseline logs store mcps_used as a
+    count): the example still trains the strategy, just not the MCP set.
+    """
+    examples, unlabeled = [], 0
+    for record in records:
+        task, strategy = record.get("task"), record.get("strategy")
+        if not isinstance(task, str) or not task or not isinstance(strategy, str) or not strategy:
+            unlabeled += 1
+            continue
+        if record.get("mcp_errors"):
+            unlabeled += 1
+            continue
+        mcps = next((value for value in (record.get("needed_mcps"), record.get("mcps_used"))
+                     if isinstance(value, list)), None)
+        examples.append((task, strategy, None if mcps is None else tuple(str(mcp) for mcp in mcps)))
+    return examples, unlabeled
+
+
+def bootstrap_examples(n: int = 20_000, seed: int = 7) -> List[Tuple[str, str, Tuple[str, ...]]]:
+    """Synthetic tasks labeled by the keyword router, for trees without execution logs yet"""
+    engine = RoutingEngine(route_cache_size=0)
+    examples = []
+    for task in sample_tasks(n, seed=seed):
+        _, strategy, mcps = engine.route_complete(task)
+        examples.append((task, strategy, tuple(mcps)))
+    return examples
+
+
+class LearnedRouter:
+    """
+    🧠 Multinomial Naive Bayes over task_features → strategy
+    Features never cross token boundaries, so each token's summed log-probability row
+    (token + its prefixes) is memoized; inference adds one short row per token.
+    Needed MCPs are the MCP set most often seen with the predicted strategy.
+    """
+
+    TOKEN_CACHE_SIZE = 65536
+
+    def __init__(self, alpha: float = 0.1):
+        if not HAS_NUMPY:
+            raise ImportError("LearnedRouter requires numpy (pip install numpy)")
+        self.alpha = alpha
+        self.strategies: List[str] = []
+        self.strategy_mcps: Dict[str, List[str]] = {}
+        self.vocabulary: Dict[str, int] = {}
+        self.feature_log_probs = np.empty((0, 0))  # features × strategies
+        self.log_priors = np.empty(0)
+        self.trained_on = 0
+        self._priors: List[float] = []
+        self._token_rows: Dict[str, Tuple[float, ...]] = {}
+
+    def fit(self, examples: List[Tuple[str, str, Tuple[str, ...]]]) -> "LearnedRouter":
+        if not examples:
+            raise ValueError("no labeled examples to train on")
+        self.strategies = sorted({strategy for _, strategy, _ in examples})
+        column = {strategy: i for i, strategy in enumerate(self.strategies)}
+
+        rows, cols = [], []
+        strategy_counts = Counter()
+        mcp_sets = defaultdict(Counter)
+        for task, strategy, mcps in examples:
+            strategy_counts[strategy] += 1
+            if mcps is not None:
+                mcp_sets[strategy][mcps] += 1
+            for feature in task_features(task):
+                rows.append(self.vocabulary.setdefault(feature, len(self.vocabulary)))
+                cols.append(column[strategy])
+
+        counts = np.zeros((len(self.vocabulary), len(self.strategies)))
+        np.add.at(counts, (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)), 1.0)
+        smoothed = counts + self.alpha
+        self.feature_log_probs = np.log(smoothed / smoothed.sum(axis=0))
+
+        priors = np.array([strategy_counts[strategy] for strategy in self.strategies], dtype=float)
+        self.log_priors = np.log(priors / priors.sum())
+        self.strategy_mcps = {strategy: list(mcp_sets[strategy].most_common(1)[0][0]) if mcp_sets[strategy] else []
+                              for strategy in self.strategies}
+        self.trained_on = len(examples)
+        self._priors = self.log_priors.tolist()
+        self._token_rows = {}
+        return self
+
+    def _token_row(self, token: str) -> Tuple[float, ...]:
+        rows = [self.vocabulary[feature] for feature in task_features(token) if feature in self.vocabulary]
+        row = tuple(self.feature_log_probs[rows].sum(axis=0).tolist()) if rows else (0.0,) * len(self.strategies)
+        if len(self._token_rows) >= self.TOKEN_CACHE_SIZE:
+            self._token_rows.clear()
+        self._token_rows[token] = row
+        return row
+
+    def predict(self, task: str) -> Tuple[float, str, List[str]]:
+        """(confidence, strategy, needed_mcps), confidence = P(strategy | task)"""
+        scores = self._priors
+        token_rows = self._token_rows
+        for token in task.lower().split():
+            row = token_rows.get(token) or self._token_row(token)
+            scores = list(map(add, scores, row))
+        best = max(range(len(scores)), key=scores.__getitem__)
+        top = scores[best]
+        posterior = 1.0 / sum(math.exp(score - top) for score in scores)
+        strategy = self.strategies[best]
+        return round(posterior, 4), strategy, list(self.strategy_mcps[strategy])
+
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        features = sorted(self.vocabulary, key=self.vocabulary.get)
+        meta = {"alpha": self.alpha, "strategies": self.strategies,
+                "strategy_mcps": self.strategy_mcps, "trained_on": self.trained_on}
+        with open(path, "wb") as f:
+            np.savez_compressed(f, features=np.array(features), log_priors=self.log_priors,
+                                feature_log_probs=self.feature_log_probs, meta=np.array(json.dumps(meta)))
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH) -> "LearnedRouter":
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            router = cls(alpha=meta["alpha"])
+            router.strategies = meta["strategies"]
+            router.strategy_mcps = meta["strategy_mcps"]
+            router.trained_on = meta["trained_on"]
+            router.vocabulary = {feature: i for i, feature in enumerate(data["features"].tolist())}
+            router.log_priors = data["log_priors"]
+            router.feature_log_probs = data["feature_log_probs"]
+        router._priors = router.log_priors.tolist()
+        return router
+
+
+def load_learned_router(path: str = DEFAULT_MODEL_PATH) -> Optional[LearnedRouter]:
+    """Model from path, or None when there is no model file / no numpy"""
+    if not HAS_NUMPY or not os.path.exists(path):
+        return None
+    return LearnedRouter.load(path)
+
+
+def evaluate(router: LearnedRouter, examples: List[Tuple[str, str, Tuple[str, ...]]]) -> Dict:
+    """
+    Strategy and exact MCP-set accuracy of the learned vs the keyword router on logged labels
+    (MCP-set accuracy only over examples that carry an MCP list)
+    """
+    engine = RoutingEngine(route_cache_size=0)
+    learned_strategy = learned_mcps = keyword_strategy = keyword_mcps = with_mcps = 0
+    for task, strategy, mcps in examples:
+        _, predicted, learned_predicted_mcps = router.predict(task)
+        learned_strategy += predicted == strategy
+        _, predicted, keyword_predicted_mcps = engine.route_complete(task)
+        keyword_strategy += predicted == strategy
+        if mcps is not None:
+            with_mcps += 1
+            learned_mcps += set(learned_predicted_mcps) == set(mcps)
+            keyword_mcps += set(keyword_predicted_mcps) == set(mcps)
+    n, m = len(examples) or 1, with_mcps or float("nan")
+    return {"examples": len(examples), "examples_with_mcps": with_mcps,
+            "learned_strategy_acc": learned_strategy / n, "learned_mcps_acc": learned_mcps / m,
+            "keyword_strategy_acc": keyword_strategy / n, "keyword_mcps_acc": keyword_mcps / m}
+
+
+def inference_latency_us(router: LearnedRouter, tasks: List[str]) -> float:
+    start = time.perf_counter()
+    for task in tasks:
+        router.predict(task)
+    return (time.perf_counter() - start) / len(tasks) * 1e6
+
+
+def train(log_paths: Iterable[str] = DEFAULT_TRAINING_LOGS, out: str = DEFAULT_MODEL_PATH,
+          bootstrap: int = 0, test_fraction: float = 0.2, seed: int = 13) -> Dict:
+    """Offline pipeline: logs → shuffled train/test split → fit → evaluate → save"""
+    examples, unlabeled = [], 0
+    for path in log_paths:
+        found, skipped = labeled_examples(iter_log_records(path))
+        examples.extend(found)
+        unlabeled += skipped
+    if bootstrap:
+        examples.extend(bootstrap_examples(bootstrap))
+
+    # Logs are in time order (one strategy's burst after another); shuffle so the
+    # held-out set is a sample of the whole log, not just its most recent tail
+    random.Random(seed).shuffle(examples)
+    split = int(len(examples) * (1 - test_fraction))
+    router = LearnedRouter().fit(examples[:split])
+    report = {"labeled": len(examples), "unlabeled_skipped": unlabeled,
+              **evaluate(router, examples[split:]),
+              "inference_us": inference_latency_us(router, [task for task, _, _ in examples[split:][:5000]])}
+
+    # Final model sees every example; the held-out report above is what it is judged on
+    router = LearnedRouter().fit(examples)
+    router.save(out)
+    report["model_path"] = out
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train/evaluate the learned V6 task router")
+    parser.add_argument("--logs", nargs="*", default=list(DEFAULT_TRAINING_LOGS), help="JSONL execution logs")
+    parser.add_argument("--out", default=DEFAULT_MODEL_PATH, help="model file (.npz)")
+    parser.add_argument("--bootstrap", type=int, default=0,
+                        help="add N synthetic tasks labeled by the keyword router (cold start)")
+    parser.add_argument("--eval", action="store_true", help="evaluate an existing model on the logs")
+    args = parser.parse_args()
+
+    print("🧠 V6 ROUTER MODEL - NAIVE BAYES TASK ROUTER")
+    if args.eval:
+        router = LearnedRouter.load(args.out)
+        examples = [example for path in args.logs for example in labeled_examples(iter_log_records(path))[0]]
+        report = {**evaluate(router, examples),
+                  "inference_us": inference_latency_us(router, [task for task, _, _ in examples[:5000]] or ["noop"])}
+    else:
+        try:
+            report = train(args.logs, args.out, args.bootstrap)
+        except ValueError:
+            print(f"⚠️  No labeled records in {', '.join(args.logs)} - run some tasks first "
+                  f"or cold-start with --bootstrap N")
+            raise SystemExit(1)
+        print(f"📚 {report['labeled']} labeled examples ({report['unlabeled_skipped']} unlabeled/failed skipped)")
+        print(f"💾 Model: {report['model_path']}")
+    mcp_set = (f"MCP set {report['learned_mcps_acc']:.1%} vs {report['keyword_mcps_acc']:.1%}"
+               if report["examples_with_mcps"] else "MCP set n/a (no needed_mcps in the logs)")
+    print(f"🎯 Held-out {report['examples']}: strategy {report['learned_strategy_acc']:.1%} learned vs "
+          f"{report['keyword_strategy_acc']:.1%} keyword | {mcp_set}")
+    print(f"⚡ Inference: {report['inference_us']:.1f}µs/task")
@@ -0,0 +1,603 @@
+#!/usr/bin/env python3
+"""
+🗄️ V6 SQLITE ENGINE - Acesso direto ao memory.db do Claude Flow
+================================================================
+Pool de conexões persistentes | WAL | Statements preparados | 0 subprocessos
+Fala direto com a tabela memory_entries de .swarm/memory.db
+Índice FTS5 só por migração explícita: python v6_sqlite_engine.py --migrate-fts [db]
+"""
+
+import json
+import os
+import queue
+import re
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Any
+
+from v6_metrics import MEMORY_OP_MS, MEMORY_OPS
+
+DEFAULT_DB_PATH = ".swarm/memory.db"
+
+# SQL fixo: o sqlite3 guarda o statement preparado por conexão (cached_statements),
+# então manter o texto idêntico entre chamadas evita re-parse a cada operação.
+SQL_STORE = """
+INSERT INTO memory_entries (key, value, namespace, metadata, created_at, updated_at,
+                            accessed_at, access_count, ttl, expires_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?)
+ON CONFLICT(key, namespace) DO UPDATE SET
+    value = excluded.value,
+    metadata = excluded.metadata,
+    updated_at = excluded.updated_at,
+    ttl = excluded.ttl,
+    expires_at = excluded.expires_at
+"""
+
+SQL_RETRIEVE = """
+SELECT key, value, namespace, metadata, created_at, updated_at, accessed_at,
+       access_count, ttl, expires_at
+FROM memory_entries
+WHERE key = ? AND namespace = ? AND (expires_at IS NULL OR expires_at > ?)
+"""
+
+SQL_TOUCH = """
+UPDATE memory_entries SET accessed_at = ?, access_count = access_count + 1
+WHERE key = ? AND namespace = ?
+"""
+
+SQL_LIST = """
+SELECT key, value, namespace, metadata, created_at, updated_at, accessed_at,
+       access_count, ttl, expires_at
+FROM memory_entries
+WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)
+ORDER BY updated_at DESC
+LIMIT ?
+"""
+
+SQL_COUNT = """
+SELECT COUNT(*) FROM memory_entries
+WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)
+"""
+
+SQL_SEARCH = """
+SELECT key, value, namespace, metadata, created_at, updated_at, accessed_at,
+       access_count, ttl, expires_at
+FROM memory_entries
+WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?)
+  AND (key LIKE ? ESCAPE '\\' OR value LIKE ? ESCAPE '\\')
+ORDER BY access_count DESC, updated_at DESC
+LIMIT ?
+"""
+
+# Fallback sem FTS5: cada termo da query vira um LIKE; rank = quantos termos casaram
+SQL_SEARCH_TERMS = """
+SELECT key, value, namespace, metadata, created_at, updated_at, accessed_at,
+       access_count, ttl, expires_at, ({score}) AS rank
+FROM memory_entries
+WHERE namespace = ? AND (expires_at IS NULL OR expires_at > ?) AND ({any})
+ORDER BY rank DESC, access_count DESC, updated_at DESC
+LIMIT ?
+"""
+SQL_TERM_LIKE = "(key LIKE ? ESCAPE '\\' OR value LIKE ? ESCAPE '\\')"
+MAX_LIKE_TERMS = 8
+
+SQL_SEARCH_FTS = """
+SELECT m.key, m.value, m.namespace, m.metadata, m.created_at, m.updated_at, m.accessed_at,
+       m.access_count, m.ttl, m.expires_at, bm25(memory_entries_fts) AS rank
+FROM memory_entries_fts
+JOIN memory_entries m ON m.id = memory_entries_fts.rowid
+WHERE memory_entries_fts MATCH ? AND m.namespace = ?
+  AND (m.expires_at IS NULL OR m.expires_at > ?)
+ORDER BY rank
+LIMIT ?
+"""
+
+# Range scan em (namespace, key): prefixo vira key >= 'p' AND key < 'p' + 1 no último char
+SQL_LIST_PREFIX = """
+SELECT key, value, namespace, metadata, created_at, updated_at, accessed_at,
+       access_count, ttl, expires_at
+FROM memory_entries
+WHERE namespace = ? AND key >= ? AND key < ?
+  AND (expires_at IS NULL OR expires_at > ?)
+ORDER BY updated_at DESC
+LIMIT ?
+"""
+
+# Entradas mais quentes: access_count decaído pela idade do último acesso (meia-vida em segundos)
+SQL_HOT_ENTRIES = """
+SELECT key, value, namespace, metadata, created_at, updated_at, accessed_at,
+       access_count, ttl, expires_at,
+       access_count / (1.0 + MAX(0, ? - COALESCE(accessed_at, 0)) / ?) AS heat
+FROM memory_entries
+WHERE access_count > 0 AND (expires_at IS NULL OR expires_at > ?)
+ORDER BY heat DESC
+LIMIT ?
+"""
+
+SQL_DELETE = "DELETE FROM memory_entries WHERE key = ? AND namespace = ?"
+
+SQL_PURGE_EXPIRED = "DELETE FROM memory_entries WHERE expires_at IS NOT NULL AND expires_at <= ?"
+
+# Mesmo schema criado pelo Claude Flow (caso o banco ainda não exista)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    namespace TEXT NOT NULL DEFAULT 'default',
+    metadata TEXT,
+    created_at INTEGER DEFAULT (strftime('%s', 'now')),
+    updated_at INTEGER DEFAULT (strftime('%s', 'now')),
+    accessed_at INTEGER DEFAULT (strftime('%s', 'now')),
+    access_count INTEGER DEFAULT 0,
+    ttl INTEGER,
+    expires_at INTEGER,
+    UNIQUE(key, namespace)
+);
+CREATE INDEX IF NOT EXISTS idx_memory_namespace ON memory_entries(namespace);
+CREATE INDEX IF NOT EXISTS idx_memory_expires ON memory_entries(expires_at) WHERE expires_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_memory_accessed ON memory_entries(accessed_at);
+"""
+
+# Migração opt-in (enable_fts / --migrate-fts): índice por prefixo de agente + FTS5
+# (external content) sobre key/value, sincronizado por triggers. Os triggers valem para
+# TODO writer do banco: um SQLite sem FTS5 passa a falhar em INSERT/UPDATE.
+FTS_STATEMENTS = (
+    "CREATE INDEX IF NOT EXISTS idx_memory_namespace_key ON memory_entries(namespace, key);",
+    """
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_entries_fts USING fts5(
+    key, value, content='memory_entries', content_rowid='id'
+);
+""",
+    """
+CREATE TRIGGER IF NOT EXISTS memory_entries_fts_ai AFTER INSERT ON memory_entries BEGIN
+    INSERT INTO memory_entries_fts(rowid, key, value) VALUES (new.id, new.key, new.value);
+END;
+""",
+    """
+CREATE TRIGGER IF NOT EXISTS memory_entries_fts_ad AFTER DELETE ON memory_entries BEGIN
+    INSERT INTO memory_entries_fts(memory_entries_fts, rowid, key, value)
+    VALUES ('delete', old.id, old.key, old.value);
+END;
+""",
+    """
+CREATE TRIGGER IF NOT EXISTS memory_entries_fts_au AFTER UPDATE OF key, value ON memory_entries BEGIN
+    INSERT INTO memory_entries_fts(memory_entries_fts, rowid, key, value)
+    VALUES ('delete', old.id, old.key, old.value);
+    INSERT INTO memory_entries_fts(rowid, key, value) VALUES (new.id, new.key, new.value);
+END;
+""",
+)
+
+FTS_DROP = """
+DROP TRIGGER IF EXISTS memory_entries_fts_ai;
+DROP TRIGGER IF EXISTS memory_entries_fts_ad;
+DROP TRIGGER IF EXISTS memory_entries_fts_au;
+DROP TABLE IF EXISTS memory_entries_fts;
+"""
+
+ENTRY_COLUMNS = ("key", "value", "namespace", "metadata", "created_at", "updated_at",
+                 "accessed_at", "access_count", "ttl", "expires_at")
+
+
+class V6SQLiteEngine:
+    """
+    🗄️ Engine SQLite in-process para memory_entries
+    Conexões longas em pool, WAL e statements preparados (sem python3 -c por chamada)
+    Abrir a engine não altera o schema do Claude Flow: o FTS5 só é usado se o banco já
+    foi migrado (enable_fts) e o SQLite deste processo tem FTS5; senão, busca por LIKE.
+    """
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, pool_size: int = 4,
+                 busy_timeout_ms: int = 5000):
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.busy_timeout_ms = busy_timeout_ms
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+        self.fts_enabled = False
+        self.stats = {"store": 0, "retrieve": 0, "list": 0, "search": 0, "delete": 0}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._measured("init"), self.connection() as conn:
+            conn.executescript(SCHEMA)
+            self.fts_enabled = self._fts_migrated(conn) and self.fts5_available(conn)
+
+    @staticmethod
+    def _fts_migrated(conn: sqlite3.Connection) -> bool:
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'memory_entries_fts'"
+                            ).fetchone() is not None
+
+    @staticmethod
+    def fts5_available(conn: sqlite3.Connection) -> bool:
+        """O SQLite deste processo tem FTS5? (tabela de teste no schema temp, não toca o banco)"""
+        try:
+            conn.execute("CREATE VIRTUAL TABLE temp.v6_fts5_probe USING fts5(x)")
+            conn.execute("DROP TABLE temp.v6_fts5_probe")
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def enable_fts(self) -> bool:
+        """
+        Migração explícita: cria índice + FTS5 + triggers e reconstrói a partir das linhas
+        existentes (uma transação). Só rode se todos os writers do banco têm FTS5.
+        """
+        with self.connection() as conn:
+            available = self.fts5_available(conn)
+        if not available:
+            print("⚠️ FTS5 indisponível neste SQLite - banco não migrado, busca por LIKE")
+            return False
+        with self.transaction() as conn:
+            exists = self._fts_migrated(conn)
+            # executescript faria COMMIT no meio: um statement por vez, tudo ou nada
+            for statement in FTS_STATEMENTS:
+                conn.execute(statement)
+            if not exists:
+                conn.execute("INSERT INTO memory_entries_fts(memory_entries_fts) VALUES ('rebuild')")
+        self.fts_enabled = True
+        return True
+
+    def disable_fts(self):
+        """Desfaz a migração (triggers primeiro: writers sem FTS5 voltam a funcionar)"""
+        with self.connection() as conn:
+            conn.executescript(FTS_DROP)
+        self.fts_enabled = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000,
+                               check_same_thread=False, isolation_level=None,
+                               cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.pool_size:
+                self._created += 1
+                return self._connect()
+
+        return self._pool.get()
+
+    def _release(self, conn: sqlite3.Connection):
+        if self._closed:
+            conn.close()
+        else:
+            self._pool.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Empresta uma conexão do pool (devolvida ao sair do bloco)"""
+        if self._closed:
+            raise RuntimeError("V6SQLiteEngine já foi fechado")
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Conexão do pool dentro de BEGIN IMMEDIATE ... COMMIT"""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @contextmanager
+    def _measured(self, op: str):
+        """Duração e ok/erro da operação no registro de métricas (v6_memory_op_ms / _ops_total)"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            MEMORY_OPS.labels(op, "error").inc()
+            raise
+        finally:
+            MEMORY_OP_MS.labels(op).observe((time.perf_counter() - start) * 1000)
+        MEMORY_OPS.labels(op, "ok").inc()
+
+    @staticmethod
+    def _row_to_entry(row) -> Dict:
+        return dict(zip(ENTRY_COLUMNS, row))
+
+    @staticmethod
+    def store_params(key: str, value: Any, namespace: str = "default",
+                     ttl: Optional[int] = None, metadata: Optional[Dict] = None,
+                     now: Optional[int] = None) -> tuple:
+        """Parâmetros de SQL_STORE (usado também por quem grava em lote)"""
+        now = int(time.time()) if now is None else now
+        if not isinstance(value, str):
+            value = json.dumps(value)
+        expires_at = now + int(ttl) if ttl else None
+        metadata_json = json.dumps(metadata) if metadata is not None else None
+        return (key, value, namespace, metadata_json, now, now, now, ttl, expires_at)
+
+    def store(self, key: str, value: Any, namespace: str = "default",
+              ttl: Optional[int] = None, metadata: Optional[Dict] = None) -> bool:
+        """Upsert de uma entrada (value não-string é serializado em JSON)"""
+        params = self.store_params(key, value, namespace, ttl, metadata)
+        with self._measured("store"), self.connection() as conn:
+            conn.execute(SQL_STORE, params)
+        self.stats["store"] += 1
+        return True
+
+    def retrieve(self, key: str, namespace: str = "default") -> Optional[Dict]:
+        """Entrada completa (dict) ou None se ausente/expirada"""
+        now = int(time.time())
+        with self._measured("retrieve"), self.connection() as conn:
+            row = conn.execute(SQL_RETRIEVE, (key, namespace, now)).fetchone()
+            if row is not None:
+                conn.execute(SQL_TOUCH, (now, key, namespace))
+        self.stats["retrieve"] += 1
+        return self._row_to_entry(row) if row is not None else None
+
+    def list(self, namespace: str = "default", limit: int = 1000) -> List[Dict]:
+        """Entradas vivas do namespace, mais recentes primeiro"""
+        with self._measured("list"), self.connection() as conn:
+            rows = conn.execute(SQL_LIST, (namespace, int(time.time()), limit)).fetchall()
+        self.stats["list"] += 1
+        return [self._row_to_entry(row) for row in rows]
+
+    def count(self, namespace: str = "default") -> int:
+        with self.connection() as conn:
+            return conn.execute(SQL_COUNT, (namespace, int(time.time()))).fetchone()[0]
+
+    def list_prefix(self, prefix: str, namespace: str = "default", limit: int = 1000) -> List[Dict]:
+        """Entradas cuja key começa com prefix (range scan; índice namespace+key após enable_fts)"""
+        if not prefix:
+            return self.list(namespace, limit)
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        with self._measured("list"), self.connection() as conn:
+            rows = conn.execute(SQL_LIST_PREFIX, (namespace, prefix, upper,
+                                                  int(time.time()), limit)).fetchall()
+        self.stats["list"] += 1
+        return [self._row_to_entry(row) for row in rows]
+
+    @staticmethod
+    def fts_query(query: str) -> str:
+        """Texto livre -> query FTS5 (termos entre aspas, OR, ranking por BM25)"""
+        terms = re.findall(r"\w+", query.lower())
+        return " OR ".join(f'"{term}"' for term in terms)
+
+    def search(self, query: str, namespace: str = "default", limit: int = 10) -> List[Dict]:
+        """
+        Busca full-text em key/value dentro do namespace, melhores primeiro: BM25 com FTS5
+        (enable_fts), senão LIKE por termo, rankeado por quantos termos casaram
+        """
+        match = self.fts_query(query) if self.fts_enabled else ""
+        terms = [] if match else self.like_terms(query)
+        now = int(time.time())
+        with self._measured("search"), self.connection() as conn:
+            if match:
+                rows = conn.execute(SQL_SEARCH_FTS, (match, namespace, now, limit)).fetchall()
+            elif terms:
+                # Sem FTS5: termos separados (uma task de várias palavras ainda casa)
+                patterns = [pattern for term in terms for pattern in [self._like_pattern(term)] * 2]
+                clause = " + ".join([SQL_TERM_LIKE] * len(terms))
+                sql = SQL_SEARCH_TERMS.format(score=clause, any=clause.replace(" + ", " OR "))
+                rows = conn.execute(sql, (*patterns, namespace, now, *patterns, limit)).fetchall()
+            else:
+                pattern = self._like_pattern(query)
+                rows = conn.execute(SQL_SEARCH, (namespace, now, pattern, pattern, limit)).fetchall()
+        self.stats["search"] += 1
+        results = []
+        for row in rows:
+            entry = self._row_to_entry(row)
+            if len(row) > len(ENTRY_COLUMNS):
+                # BM25 (menor é melhor) ou termos casados no LIKE
+                entry["score"] = -row[-1] if match else row[-1]
+            results.append(entry)
+        return results
+
+    @staticmethod
+    def like_terms(query: str) -> List[str]:
+        """Termos do fallback LIKE: sem repetição; palavras de 1-2 letras ("on", "a") só
+        se não sobrar outra, senão casam como substring em quase todo value JSON"""
+        terms = list(dict.fromkeys(re.findall(r"\w+", query.lower())))
+        return ([term for term in terms if len(term) > 2] or terms)[:MAX_LIKE_TERMS]
+
+    @staticmethod
+    def _like_pattern(text: str) -> str:
+        escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return f"%{escaped}%"
+
+    def hot_entries(self, limit: int = 500, half_life: int = 86400) -> List[Dict]:
+        """Top-N entradas vivas (todos os namespaces) por access_count e recência de accessed_at"""
+        now = int(time.time())
+        with self.connection() as conn:
+            rows = conn.execute(SQL_HOT_ENTRIES, (now, half_life, now, limit)).fetchall()
+        results = []
+        for row in rows:
+            entry = self._row_to_entry(row)
+            entry["heat"] = row[-1]
+            results.append(entry)
+        return results
+
+    def delete(self, key: str, namespace: str = "default") -> bool:
+        with self._measured("delete"), self.connection() as conn:
+            deleted = conn.execute(SQL_DELETE, (key, namespace)).rowcount
+        self.stats["delete"] += 1
+        return deleted > 0
+
+    def purge_expired(self) -> int:
+        """Remove entradas com expires_at vencido; retorna quantas saíram"""
+        with self.connection() as conn:
+            return conn.execute(SQL_PURGE_EXPIRED, (int(time.time()),)).rowcount
+
+    def checkpoint(self):
+        """Checkpoint do WAL (sincroniza o que foi commitado no arquivo principal)"""
+        with self.connection() as conn:
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        """Fecha todas as conexões ociosas do pool"""
+        self._closed = True
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_shared_engines = {}
+_shared_lock = threading.Lock()
+
+
+def get_engine(db_path: str = DEFAULT_DB_PATH) -> V6SQLiteEngine:
+    """Engine compartilhada por caminho (um pool por processo)"""
+    key = os.path.abspath(db_path)
+    with _shared_lock:
+        engine = _shared_engines.get(key)
+        if engine is None or engine._closed:
+            engine = V6SQLiteEngine(db_path)
+            _shared_engines[key] = engine
+        return engine
+
+
+# Script equivalente ao caminho antigo: um interpretador novo por operação
+_SUBPROCESS_OP = """
+import sqlite3, sys, time
+conn = sqlite3.connect(sys.argv[1])
+now = int(time.time())
+if sys.argv[2] == "store":
+    conn.execute(
+        "INSERT INTO memory_entries (key, value, namespace) VALUES (?, ?, 'bench') "
+        "ON CONFLICT(key, namespace) DO UPDATE SET value = excluded.value",
+        (sys.argv[3], sys.argv[4]))
+    conn.commit()
+else:
+    row = conn.execute("SELECT value FROM memory_entries WHERE key = ? AND namespace = 'bench'",
+                       (sys.argv[3],)).fetchone()
+    print(row[0] if row else "null")
+"""
+
+
+def benchmark_engine_vs_subprocess(db_path: str, operations: int = 2000,
+                                   subprocess_operations: int = 50) -> Dict:
+    """
+    📊 ops/sec do engine in-process vs um python3 -c por operação
+    (o caminho antigo de V6ContextPersistence)
+    """
+    engine = V6SQLiteEngine(db_path)
+    payload = json.dumps({"task": "bench", "agents": 25, "confidence": 0.95})
+
+    start = time.perf_counter()
+    for i in range(operations):
+        engine.store(f"bench_{i}", payload, namespace="bench", ttl=3600)
+        engine.retrieve(f"bench_{i}", namespace="bench")
+    engine_secs = time.perf_counter() - start
+    engine.close()
+
+    start = time.perf_counter()
+    for i in range(subprocess_operations):
+        subprocess.run([sys.executable, "-c", _SUBPROCESS_OP, db_path, "store",
+                        f"bench_sp_{i}", payload], capture_output=True, text=True)
+        subprocess.run([sys.executable, "-c", _SUBPROCESS_OP, db_path, "retrieve",
+                        f"bench_sp_{i}"], capture_output=True, text=True)
+    subprocess_secs = time.perf_counter() - start
+
+    engine_ops = (operations * 2) / engine_secs
+    subprocess_ops = (subprocess_operations * 2) / subprocess_secs
+    return {
+        "engine_ops_per_sec": engine_ops,
+        "subprocess_ops_per_sec": subprocess_ops,
+        "engine_ms_per_op": 1000 / engine_ops,
+        "subprocess_ms_per_op": 1000 / subprocess_ops,
+        "speedup": engine_ops / subprocess_ops
+    }
+
+
+def benchmark_fts_search(db_path: str, entries: int = 200_000, queries: int = 500) -> Dict:
+    """
+    🔍 Latência da busca FTS5 (BM25) e do range scan por prefixo de agente
+    com `entries` linhas em knowledge_base/agent_memory
+    """
+    engine = V6SQLiteEngine(db_path)
+    engine.enable_fts()
+    words = ["error", "522", "cloudflare", "timeout", "deploy", "hetzner", "docker",
+             "redis", "cache", "vector", "pdf", "swarm", "agent", "latency", "retry"]
+    vocabulary = 5000
+    now = int(time.time())
+
+    with engine.transaction() as conn:
+        conn.executemany(SQL_STORE, (
+            V6SQLiteEngine.store_params(
+                f"pattern_{i}", {"solution": f"{words[i % 15]} term{i % vocabulary} "
+                                             f"term{(i * 7) % vocabulary} fix"},
+                "knowledge_base", 604800, now=now)
+            for i in range(entries // 2)))
+        conn.executemany(SQL_STORE, (
+            V6SQLiteEngine.store_params(
+                f"agent_agent{i % 500}_general_{i}", {"type": "experience"},
+                "agent_memory", 2592000, now=now)
+            for i in range(entries // 2)))
+
+    start = time.perf_counter()
+    for i in range(queries):
+        engine.search(f"term{(i * 13) % vocabulary} term{(i * 31) % vocabulary}",
+                      namespace="knowledge_base", limit=5)
+    search_ms = (time.perf_counter() - start) * 1000 / queries
+
+    start = time.perf_counter()
+    for i in range(queries):
+        engine.list_prefix(f"agent_agent{i % 500}_", namespace="agent_memory", limit=10)
+    prefix_ms = (time.perf_counter() - start) * 1000 / queries
+
+    engine.close()
+    return {"entries": entries, "fts_enabled": engine.fts_enabled,
+            "search_ms": search_ms, "agent_prefix_ms": prefix_ms}
+
+
+if __name__ == "__main__" and "--migrate-fts" in sys.argv:
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    db_path = args[0] if args else DEFAULT_DB_PATH
+    print(f"🔍 Migrando {db_path}: índice FTS5 + triggers em memory_entries")
+    engine = V6SQLiteEngine(db_path)
+    if engine.enable_fts():
+        print("✅ FTS5 ativo: search usa BM25 em todas as engines que abrirem este banco")
+    engine.close()
+
+elif __name__ == "__main__":
+    import tempfile
+
+    print("🗄️ V6 SQLITE ENGINE - BENCHMARK")
+    print("📊 In-process (pool + WAL) vs python3 -c por operação")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = benchmark_engine_vs_subprocess(os.path.join(tmp, "memory.db"))
+
+    print(f"\n⚡ Engine:      {results['engine_ops_per_sec']:>10.0f} ops/s "
+          f"({results['engine_ms_per_op']:.3f}ms/op)")
+    print(f"🐢 Subprocess:  {results['subprocess_ops_per_sec']:>10.0f} ops/s "
+          f"({results['subprocess_ms_per_op']:.1f}ms/op)")
+    print(f"🚀 Speedup: {results['speedup']:.0f}x")
+
+    print("\n🔍 FTS5 (BM25) + range scan por prefixo de agente")
+    with tempfile.TemporaryDirectory() as tmp:
+        fts = benchmark_fts_search(os.path.join(tmp, "memory.db"))
+
+    print(f"📚 Entradas: {fts['entries']} | FTS5: {'✅' if fts['fts_enabled'] else '❌'}")
+    print(f"⚡ search_knowledge:    {fts['search_ms']:.3f}ms/query")
+    print(f"⚡ get_agent_learnings: {fts['agent_prefix_ms']:.3f}ms/query")
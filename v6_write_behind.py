@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+⏳ V6 WRITE-BEHIND QUEUE - Gravações em lote no memory_entries
+==============================================================
+Sessões, aprendizados e cache agrupados | 1 transação por flush | flush no exit
+O hot path só enfileira: o fsync acontece na thread de background
+Uma fila por engine (get_write_behind) | Lote que sempre falha vai para dead_letters
+"""
+
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Any
+
+from v6_sqlite_engine import SQL_STORE, V6SQLiteEngine
+
+
+class V6WriteBehindQueue:
+    """
+    ⏳ Buffer write-behind sobre V6SQLiteEngine
+    Flush a cada flush_interval_ms ou a cada max_batch entradas, o que vier primeiro.
+    Ordem garantida: um único writer, lotes em ordem FIFO, cada lote em uma transação
+    (ou entra inteiro ou não entra, e nunca antes do lote anterior).
+    Um lote que falha max_attempts vezes seguidas (ex.: constraint) é regravado linha a
+    linha: as que ainda falham vão para dead_letters e o resto da fila segue.
+    Use get_write_behind(engine): uma fila (e uma thread) por engine, fechada no exit.
+    """
+
+    DEAD_LETTER_LIMIT = 1000
+
+    def __init__(self, engine: V6SQLiteEngine, flush_interval_ms: int = 50,
+                 max_batch: int = 256, max_attempts: int = 5):
+        self.engine = engine
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max_batch
+        self.max_attempts = max_attempts
+
+        self._queue = deque()
+        self._pending = {}  # (namespace, key) -> params mais recentes ainda não gravados
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._failures = 0  # falhas seguidas do lote da frente
+        self.dead_letters = deque(maxlen=self.DEAD_LETTER_LIMIT)  # (params, erro)
+        self.stats = {"enqueued": 0, "flushed": 0, "batches": 0, "errors": 0, "dead_letters": 0}
+
+        self._thread = threading.Thread(target=self._run, name="v6-write-behind", daemon=True)
+        self._thread.start()
+
+    def enqueue_store(self, key: str, value: Any, namespace: str = "default",
+                      ttl: Optional[int] = None, metadata: Optional[Dict] = None) -> bool:
+        """Enfileira um upsert; retorna sem tocar no disco"""
+        params = V6SQLiteEngine.store_params(key, value, namespace, ttl, metadata)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("V6WriteBehindQueue já foi fechada")
+            self._queue.append(params)
+            self._pending[(namespace, key)] = params
+            self.stats["enqueued"] += 1
+            if len(self._queue) >= self.max_batch:
+                self._cond.notify()
+        return True
+
+    def pending_value(self, key: str, namespace: str = "default") -> Optional[str]:
+        """Valor (JSON) ainda na fila para key/namespace - leitura das próprias escritas"""
+        with self._cond:
+            params = self._pending.get((namespace, key))
+        return params[1] if params is not None else None
+
+    def pending_count(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def _take_batch(self):
+        with self._cond:
+            batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+        return batch
+
+    def _write_batch(self, batch):
+        written = batch
+        try:
+            with self.engine.transaction() as conn:
+                conn.executemany(SQL_STORE, batch)
+        except Exception:
+            with self._cond:
+                self.stats["errors"] += 1
+                self._failures += 1
+                give_up = self._failures >= self.max_attempts
+                if not give_up:
+                    # Devolve o lote na frente da fila, na mesma ordem, para a próxima tentativa
+                    self._queue.extendleft(reversed(batch))
+            if not give_up:
+                raise
+            written = self._write_rows(batch)
+        self._failures = 0
+
+        with self._cond:
+            for params in batch:
+                pending_key = (params[2], params[0])
+                if self._pending.get(pending_key) is params:
+                    del self._pending[pending_key]
+            self.stats["flushed"] += len(written)
+            self.stats["batches"] += 1
+
+    def _write_rows(self, batch):
+        """Lote desistido: linha a linha (mesma ordem); as que falham vão para dead_letters"""
+        written, dead = [], []
+        for params in batch:
+            try:
+                with self.engine.transaction() as conn:
+                    conn.execute(SQL_STORE, params)
+                written.append(params)
+            except Exception as e:
+                dead.append((params, repr(e)))
+        if dead:
+            with self._cond:
+                self.dead_letters.extend(dead)
+                self.stats["dead_letters"] += len(dead)
+            print(f"☠️  Write-behind: {len(dead)} entrada(s) descartada(s) após {self.max_attempts} "
+                  f"tentativas (ex.: {dead[0][0][2]}/{dead[0][0][0]}: {dead[0][1]}) - ver dead_letters")
+        return written
+
+    def flush(self) -> int:
+        """Grava tudo que está na fila agora (bloqueante); retorna entradas gravadas"""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return written
+                self._write_batch(batch)
+                written += len(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if len(self._queue) < self.max_batch and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+
+            try:
+                self.flush()
+            except Exception as e:
+                if self._failures == 1:  # uma mensagem por sequência de falhas, não uma por intervalo
+                    print(f"❌ Write-behind flush falhou (até {self.max_attempts} tentativas): {e}")
+                time.sleep(self.flush_interval)
+
+            if closed:
+                return
+
+    def close(self):
+        """Flush durável final e parada da thread (close_all faz isso no exit)"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        if self.engine._closed:
+            if self._queue:
+                print(f"⚠️  Write-behind: engine já fechada, {len(self._queue)} entrada(s) não gravada(s)")
+            return
+        while self._queue:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"❌ Write-behind: flush final falhou: {e}")
+        try:
+            self.engine.checkpoint()
+        except Exception as e:
+            print(f"⚠️  Write-behind: checkpoint final falhou: {e}")
+
+
+_queues: Dict[V6SQLiteEngine, V6WriteBehindQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_behind(engine: V6SQLiteEngine, **options) -> V6WriteBehindQueue:
+    """Fila compartilhada da engine (options só valem na criação)"""
+    with _queues_lock:
+        writer = _queues.get(engine)
+        if writer is None or writer._closed:
+            writer = _queues[engine] = V6WriteBehindQueue(engine, **options)
+        return writer
+
+
+@atexit.register
+def close_all():
+    """Drena todas as filas antes de o processo sair"""
+    with _queues_lock:
+        writers = list(_queues.values())
+        _queues.clear()
+    for writer in writers:
+        writer.close()
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    print("⏳ V6 WRITE-BEHIND QUEUE - BENCHMARK")
+    print("📊 Enfileirar (hot path) vs store síncrono")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = V6SQLiteEngine(os.path.join(tmp, "memory.db"))
+        operations = 5000
+
+        start = time.perf_counter()
+        for i in range(operations):
+            engine.store(f"sync_{i}", {"i": i}, namespace="bench", ttl=3600)
+        sync_secs = time.perf_counter() - start
+
+        writer = get_write_behind(engine)
+        start = time.perf_counter()
+        for i in range(operations):
+            writer.enqueue_store(f"wb_{i}", {"i": i}, namespace="bench", ttl=3600)
+        enqueue_secs = time.perf_counter() - start
+        writer.close()
+        total_secs = time.perf_counter() - start
+
+        print(f"\n🐢 Síncrono:      {sync_secs / operations * 1e6:>8.1f}µs/op")
+        print(f"⚡ Enfileirar:    {enqueue_secs / operations * 1e6:>8.1f}µs/op")
+        print(f"💾 Até o disco:   {total_secs:.3f}s em {writer.stats['batches']} transações")
+        print(f"✅ Entradas gravadas via fila: {writer.stats['flushed']}")
+        engine.close()